@@ -1,6 +1,30 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        warmer = os.getenv("FB_QUOTE_WARMER_IN_PROCESS") == "1"
+        stream = os.getenv("FB_QUOTE_STREAM_IN_PROCESS") == "1"
+        if not (warmer or stream):
+            return
+        # Only serving processes: not other management commands, and not the
+        # runserver autoreload parent.
+        if os.path.basename(sys.argv[0]) == "manage.py":
+            if sys.argv[1:2] != ["runserver"] or os.environ.get("RUN_MAIN") != "true":
+                return
+        if stream:
+            from eurocalc.quote_stream import start_quote_stream
+
+            from .market_data import POPULAR
+
+            start_quote_stream(POPULAR)
+        if warmer:
+            from .quote_warmer import start_quote_warmer
+
+            start_quote_warmer()
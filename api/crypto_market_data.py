@@ -5,7 +5,13 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import os
-import requests
+
+from asgiref.sync import sync_to_async
+
+from eurocalc.async_data_sources import AsyncMarketDataSource, gather_with_deadline
+from eurocalc.cache import AsyncCachedMarketDataSource, CachedMarketDataSource
+from eurocalc.data_sources import MarketDataSource
+from eurocalc.http_client import async_http_get, http_get
 
 
 @dataclass(frozen=True)
@@ -66,7 +72,7 @@ def _headers(cfg: AlpacaConfig) -> Dict[str, str]:
 
 
 def _get_json(url: str, cfg: AlpacaConfig, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    resp = requests.get(url, headers=_headers(cfg), params=params or {}, timeout=cfg.timeout_s)
+    resp = http_get(url, headers=_headers(cfg), params=params or {}, timeout=cfg.timeout_s)
     if not resp.ok:
         raise RuntimeError(f"Alpaca request failed: {resp.status_code} {resp.text}")
     payload = resp.json()
@@ -124,7 +130,7 @@ def list_crypto_assets(tradable_only: bool = True, status: str = "active") -> Li
     params: Dict[str, Any] = {"asset_class": "crypto"}
     if status:
         params["status"] = status
-    payload = requests.get(url, headers=_headers(cfg), params=params, timeout=cfg.timeout_s)
+    payload = http_get(url, headers=_headers(cfg), params=params, timeout=cfg.timeout_s)
     if not payload.ok:
         raise RuntimeError(f"Alpaca assets request failed: {payload.status_code} {payload.text}")
     data = payload.json()
@@ -301,8 +307,88 @@ def get_crypto_daily_closes(symbol_pair: str, need: int = 252) -> List[float]:
     return closes[-need_i:]
 
 
-def get_crypto_current_prices(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
-    sym_csv, normalized = _csv_symbols(symbols)
+class AlpacaCryptoDataSource(MarketDataSource):
+    """Alpaca crypto spot prices behind the MarketDataSource interface, so they can share the quote cache."""
+
+    def get_spot(self, symbol: str) -> float:
+        return get_crypto_spot(symbol)
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        _, normalized = _csv_symbols(symbols)
+        fetched = _fetch_crypto_current_prices(normalized)
+        return {sym: float(info["price"]) for sym, info in fetched.items() if info.get("price") is not None}
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        return get_crypto_daily_closes(symbol, need=need)
+
+
+class AsyncAlpacaCryptoDataSource(AsyncMarketDataSource):
+    """Async AlpacaCryptoDataSource: one latest-trades request over aiohttp, per-pair fallbacks on threads."""
+
+    async def get_spot(self, symbol: str) -> float:
+        return await sync_to_async(get_crypto_spot, thread_sensitive=False)(symbol)
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        sym_csv, normalized = _csv_symbols(symbols)
+        cfg = get_alpaca_config()
+        url = f"{cfg.data_base_url}/v1beta3/crypto/{cfg.crypto_loc}/latest/trades"
+        resp = await async_http_get(url, params={"symbols": sym_csv}, headers=_headers(cfg), timeout=cfg.timeout_s)
+        if not resp.ok:
+            raise RuntimeError(f"Alpaca request failed: {resp.status_code} {resp.text}")
+        payload = resp.json()
+        trades_obj = payload.get("trades") if isinstance(payload, dict) else None
+
+        out: Dict[str, float] = {}
+        for sym in normalized:
+            trade = trades_obj.get(sym) if isinstance(trades_obj, dict) else None
+            if isinstance(trade, dict):
+                p = trade.get("p") if trade.get("p") is not None else trade.get("price")
+                if p is not None:
+                    out[sym] = float(p)
+        missing = [sym for sym in normalized if sym not in out]
+        if missing:
+            out.update(await gather_with_deadline(self.get_spot, missing, deadline_s))
+        return out
+
+
+def get_crypto_current_prices(symbols: Iterable[str], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Latest price per pair as {"price", "error"}.
+
+    Served from the shared quote cache (eurocalc.cache) unless use_cache is
+    False; cache misses are fetched in one latest-trades request.
+    """
+    _, normalized = _csv_symbols(symbols)
+    if not use_cache:
+        return _fetch_crypto_current_prices(normalized)
+
+    prices = CachedMarketDataSource(AlpacaCryptoDataSource()).get_spots(normalized)
+    return _crypto_results(normalized, prices)
+
+
+async def aget_crypto_current_prices(symbols: Iterable[str], use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+    """get_crypto_current_prices for async views."""
+    _, normalized = _csv_symbols(symbols)
+    ds: Any = AsyncAlpacaCryptoDataSource()
+    if use_cache:
+        ds = AsyncCachedMarketDataSource(ds)
+    prices = await ds.get_spots(normalized)
+    return _crypto_results(normalized, prices)
+
+
+def _crypto_results(normalized: List[str], prices: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for sym in normalized:
+        price = prices.get(sym)
+        if price is None:
+            results[sym] = {"price": None, "error": f"No price returned for {sym}"}
+        else:
+            results[sym] = {"price": float(price), "error": None}
+    return results
+
+
+def _fetch_crypto_current_prices(normalized: List[str]) -> Dict[str, Dict[str, Any]]:
+    sym_csv = ",".join(normalized)
     cfg = get_alpaca_config()
     url = f"{cfg.data_base_url}/v1beta3/crypto/{cfg.crypto_loc}/latest/trades"
     payload = _get_json(url, cfg, params={"symbols": sym_csv})
@@ -10,6 +10,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST
 
 from .crypto_market_data import (
+    aget_crypto_current_prices,
     get_crypto_current_prices,
     get_crypto_spot,
     list_crypto_assets,
@@ -81,6 +82,26 @@ def crypto_prices(request: HttpRequest) -> JsonResponse:
     return JsonResponse(data)
 
 
+@require_GET
+async def crypto_prices_async(request: HttpRequest) -> JsonResponse:
+    user = await request.auser()
+    if not user or not user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    raw = request.GET.get("symbols", "") or ""
+    symbols = [s.strip() for s in raw.split(",") if s.strip()]
+
+    if not symbols:
+        return JsonResponse({"error": "symbols query param is required"}, status=400)
+
+    try:
+        data = await aget_crypto_current_prices(symbols)
+    except Exception as exc:
+        return JsonResponse({"error": str(exc)}, status=502)
+
+    return JsonResponse(data)
+
+
 @require_GET
 def crypto_positions(request: HttpRequest) -> JsonResponse:
     user, error_response = _get_authenticated_user(request)
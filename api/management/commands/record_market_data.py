@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from eurocalc.data_sources import normalize_symbols
+from eurocalc.registry import get_market_data_source
+from eurocalc.replay_source import MarketFixture, RecordingDataSource
+
+from api.crypto_market_data import AlpacaCryptoDataSource, normalize_crypto_symbol
+from api.market_data import POPULAR
+
+
+class Command(BaseCommand):
+    help = (
+        "Record live provider responses (spots, daily closes, dividend yields, crypto) "
+        "into a .json or .npz fixture. Replay it with FB_REPLAY_FIXTURE=<path>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("out", help="Fixture path (.json or .npz).")
+        parser.add_argument("--symbols", default=",".join(POPULAR), help="Comma-separated stock tickers.")
+        parser.add_argument("--crypto", default="", help="Comma-separated crypto pairs, e.g. BTC/USD,ETH/USD.")
+        parser.add_argument("--closes", type=int, default=252, help="Daily closes to record per symbol.")
+
+    def handle(self, *args, **options):
+        fixture = MarketFixture()
+        stocks = normalize_symbols(options["symbols"].split(","))
+        crypto = [normalize_crypto_symbol(s) for s in options["crypto"].split(",") if s.strip()]
+        need = options["closes"]
+
+        recorder = RecordingDataSource(get_market_data_source(), fixture)
+        self._record(recorder, stocks, need, dividends=True)
+        if crypto:
+            self._record(RecordingDataSource(AlpacaCryptoDataSource(), fixture, crypto=True), crypto, need, dividends=False)
+
+        if not fixture.spots and not fixture.crypto_spots:
+            raise CommandError("Nothing was recorded; check provider credentials.")
+        path = fixture.save(options["out"])
+        self.stdout.write(
+            f"Recorded {len(fixture.spots)} stock and {len(fixture.crypto_spots)} crypto quotes, "
+            f"{len(fixture.daily_closes) + len(fixture.crypto_daily_closes)} close histories to {path}"
+        )
+
+    def _record(self, recorder: RecordingDataSource, symbols, need: int, dividends: bool) -> None:
+        try:
+            recorder.get_spots(symbols)
+        except Exception as e:
+            self.stderr.write(f"spots: {e}")
+        for sym in symbols:
+            calls = [("closes", lambda: recorder.get_daily_closes(sym, need=need))]
+            if dividends:
+                calls.append(("dividend yield", lambda: recorder.get_dividend_yield(sym)))
+            for what, call in calls:
+                try:
+                    call()
+                except Exception as e:
+                    self.stderr.write(f"{sym} {what}: {e}")
@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from api.quote_warmer import QuoteWarmer
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep spot quotes for POPULAR and all held stock/crypto symbols fresh in the "
+        "quote cache, refreshing faster during market hours. The default cache is "
+        "per-process; to warm web workers in place set FB_QUOTE_WARMER_IN_PROCESS=1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Refresh a single time and exit.")
+        parser.add_argument("--interval", type=float, default=None, help="Market-hours stock refresh interval (s).")
+        parser.add_argument("--off-hours-interval", type=float, default=None, help="Off-hours stock refresh interval (s).")
+        parser.add_argument("--crypto-interval", type=float, default=None, help="Crypto refresh interval (s).")
+
+    def handle(self, *args, **options):
+        warmer = QuoteWarmer(
+            market_interval_s=options["interval"],
+            off_hours_interval_s=options["off_hours_interval"],
+            crypto_interval_s=options["crypto_interval"],
+        )
+
+        if options["once"]:
+            for kind, result in warmer.run_once().items():
+                self._report(kind, result)
+            return
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        self.stdout.write("Warming quotes; Ctrl+C to stop.")
+        try:
+            warmer.run_forever(stop, on_refresh=self._report if options["verbosity"] > 1 else None)
+        except KeyboardInterrupt:
+            stop.set()
+
+    def _report(self, kind, result):
+        self.stdout.write(
+            f"{kind}: warmed {result['warmed']}/{result['requested']}"
+            + (f" ({result['errors']} batch error)" if result["errors"] else "")
+        )
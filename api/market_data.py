@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from typing import Iterable, Dict, Any
+from typing import Iterable, Dict, Any, List, Optional, Tuple
 
-from eurocalc.data_sources import CombinedDataSource
+import os
+
+from eurocalc.cache import AsyncCachedMarketDataSource, CachedMarketDataSource
+from eurocalc.data_sources import normalize_symbols
+from eurocalc.quote_stream import get_quote_book, subscribe_quotes
+from eurocalc.registry import get_async_market_data_source, get_market_data_source
 
 # Shared list of "popular" tickers used by both the API layer and the
 # options home view. This replaces BE1.MRKT_WTCH.POPULAR.
@@ -24,9 +29,14 @@ POPULAR = [
 ]
 
 
-def get_current_prices(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+def get_current_prices(
+    symbols: Iterable[str],
+    use_cache: bool = True,
+    deadline_s: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
     """
-    Fetch current prices via eurocalc.data_sources.CombinedDataSource.
+    Fetch current prices via the shared eurocalc.registry data source,
+    behind the shared quote cache in eurocalc.cache.
 
     This is an adapter that mimics the old BE1.MRKT_WTCH.get_current_prices
     signature so the rest of the code does not need to change:
@@ -35,29 +45,91 @@ def get_current_prices(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
 
     It will:
       * Normalize symbols to upper-case.
+      * Serve symbols with a fresh price in the streaming quote book
+        (eurocalc.quote_stream) from memory, unless use_cache=False.
+      * Fetch every other symbol with one MarketDataSource.get_spots call,
+        so sources with a multi-symbol endpoint make a single request.
       * Leave entries present with price=None and an error message if
         a specific symbol fails.
       * Raise RuntimeError if *every* symbol fails due to an upstream error.
+
+    Pass use_cache=False where a quote must be fresh (e.g. filling a trade):
+    it bypasses both the quote cache and the streamed book.
+    deadline_s (default FB_QUOTE_DEADLINE_S) bounds the whole fetch; symbols
+    still outstanding when it runs out come back with an error, the rest are
+    returned as usual.
     """
+    if deadline_s is None:
+        deadline_s = float(os.getenv("FB_QUOTE_DEADLINE_S", "8"))
+
     try:
-        ds = CombinedDataSource()
+        ds = get_market_data_source()
+        if use_cache:
+            ds = CachedMarketDataSource(ds)
     except Exception as exc:
         # Bubble up a clear message if we can't construct the data source at all
         raise RuntimeError(str(exc))
 
-    results: Dict[str, Dict[str, Any]] = {}
+    syms = normalize_symbols(symbols)
+    prices, missing = _streamed_prices(syms) if use_cache else ({}, syms)
+    last_err: Exception | None = None
+
+    try:
+        prices.update(ds.get_spots(missing, deadline_s) if missing else {})
+    except Exception as exc:
+        last_err = exc
+
+    return _price_results(syms, prices, last_err)
+
+
+async def aget_current_prices(
+    symbols: Iterable[str],
+    use_cache: bool = True,
+    deadline_s: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """get_current_prices for async views, on the async data source and the same quote cache."""
+    if deadline_s is None:
+        deadline_s = float(os.getenv("FB_QUOTE_DEADLINE_S", "8"))
+
+    try:
+        ds = get_async_market_data_source()
+        if use_cache:
+            ds = AsyncCachedMarketDataSource(ds)
+    except Exception as exc:
+        raise RuntimeError(str(exc))
+
+    syms = normalize_symbols(symbols)
+    prices, missing = _streamed_prices(syms) if use_cache else ({}, syms)
     last_err: Exception | None = None
 
-    for raw_sym in symbols:
-        sym = (raw_sym or "").strip().upper()
-        if not sym:
-            continue
-        try:
-            price = ds.get_spot(sym)
+    try:
+        prices.update(await ds.get_spots(missing, deadline_s) if missing else {})
+    except Exception as exc:
+        last_err = exc
+
+    return _price_results(syms, prices, last_err)
+
+
+def _streamed_prices(syms: List[str]) -> Tuple[Dict[str, float], List[str]]:
+    """Split syms into fresh streamed prices and the symbols still to fetch (which the stream is asked to carry)."""
+    prices = get_quote_book().prices(syms)
+    missing = [sym for sym in syms if sym not in prices]
+    if missing:
+        subscribe_quotes(missing)
+    return prices, missing
+
+
+def _price_results(
+    syms: List[str], prices: Dict[str, float], last_err: Optional[Exception]
+) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for sym in syms:
+        price = prices.get(sym)
+        if price is not None:
             results[sym] = {"price": float(price), "error": None}
-        except Exception as exc:
-            last_err = exc
-            results[sym] = {"price": None, "error": str(exc)}
+        else:
+            err = str(last_err) if last_err is not None else f"No price returned for {sym}"
+            results[sym] = {"price": None, "error": err}
 
     # If *nothing* succeeded and we saw at least one error, surface that
     if not results and last_err is not None:
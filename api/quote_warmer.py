@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import os
+import threading
+import time
+
+from eurocalc.cache import MARKET_TZ, CachedMarketDataSource, is_market_open
+from eurocalc.data_sources import MarketDataSource, normalize_symbols
+from eurocalc.registry import get_market_data_source
+
+from .crypto_market_data import AlpacaCryptoDataSource
+from .market_data import POPULAR
+from .models import CryptoPosition, Position
+
+
+class QuoteWarmer:
+    """
+    Keeps spot quotes for the hot symbol set fresh in the shared quote cache.
+
+    The hot set is POPULAR plus every symbol currently held in a Position,
+    and every held CryptoPosition pair. Each refresh is a single batch
+    get_spots call per asset class. Stocks refresh every
+    ``market_interval_s`` during the regular session and every
+    ``off_hours_interval_s`` outside it; crypto trades around the clock and
+    always uses ``crypto_interval_s``. Warmed entries are stored with a TTL
+    slightly longer than the refresh interval so readers keep hitting the
+    cache between refreshes.
+    """
+
+    TTL_SLACK = 1.5
+
+    def __init__(
+        self,
+        stock_source: Optional[MarketDataSource] = None,
+        crypto_source: Optional[MarketDataSource] = None,
+        market_interval_s: Optional[float] = None,
+        off_hours_interval_s: Optional[float] = None,
+        crypto_interval_s: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.stocks = CachedMarketDataSource(stock_source or get_market_data_source())
+        self.crypto = CachedMarketDataSource(crypto_source or AlpacaCryptoDataSource())
+        self.market_interval_s = float(
+            market_interval_s if market_interval_s is not None else os.getenv("FB_WARM_INTERVAL_S", "4")
+        )
+        self.off_hours_interval_s = float(
+            off_hours_interval_s if off_hours_interval_s is not None else os.getenv("FB_WARM_OFF_HOURS_INTERVAL_S", "60")
+        )
+        self.crypto_interval_s = float(
+            crypto_interval_s if crypto_interval_s is not None else os.getenv("FB_WARM_CRYPTO_INTERVAL_S", "4")
+        )
+        self.clock = clock
+
+    def hot_symbols(self) -> Tuple[List[str], List[str]]:
+        held = Position.objects.filter(quantity__gt=0).values_list("symbol", flat=True).distinct()
+        stocks = normalize_symbols(list(POPULAR) + list(held))
+        crypto = normalize_symbols(
+            CryptoPosition.objects.filter(quantity__gt=0).values_list("symbol", flat=True).distinct()
+        )
+        return stocks, crypto
+
+    def stock_interval(self) -> float:
+        now = datetime.fromtimestamp(self.clock(), MARKET_TZ)
+        return self.market_interval_s if is_market_open(now) else self.off_hours_interval_s
+
+    def refresh_stocks(self, symbols: List[str], interval_s: float) -> Dict[str, int]:
+        return self._refresh(self.stocks, symbols, interval_s)
+
+    def refresh_crypto(self, symbols: List[str]) -> Dict[str, int]:
+        return self._refresh(self.crypto, symbols, self.crypto_interval_s)
+
+    def _refresh(self, cache: CachedMarketDataSource, symbols: List[str], interval_s: float) -> Dict[str, int]:
+        if not symbols:
+            return {"requested": 0, "warmed": 0, "errors": 0}
+        try:
+            warmed = cache.warm_spots(symbols, ttl_s=interval_s * self.TTL_SLACK)
+        except Exception:
+            return {"requested": len(symbols), "warmed": 0, "errors": 1}
+        return {"requested": len(symbols), "warmed": len(warmed), "errors": 0}
+
+    def run_once(self) -> Dict[str, Dict[str, int]]:
+        stocks, crypto = self.hot_symbols()
+        return {
+            "stocks": self.refresh_stocks(stocks, self.stock_interval()),
+            "crypto": self.refresh_crypto(crypto),
+        }
+
+    def run_forever(
+        self,
+        stop: threading.Event,
+        on_refresh: Optional[Callable[[str, Dict[str, int]], None]] = None,
+    ) -> None:
+        """Refresh each asset class whenever it is due until ``stop`` is set."""
+        next_stock = next_crypto = 0.0
+        while not stop.is_set():
+            now = self.clock()
+            if now >= next_stock or now >= next_crypto:
+                try:
+                    stocks, crypto = self.hot_symbols()
+                except Exception:
+                    stocks, crypto = normalize_symbols(POPULAR), []
+                if now >= next_stock:
+                    interval = self.stock_interval()
+                    result = self.refresh_stocks(stocks, interval)
+                    next_stock = now + interval
+                    if on_refresh is not None:
+                        on_refresh("stocks", result)
+                if now >= next_crypto:
+                    result = self.refresh_crypto(crypto)
+                    next_crypto = now + self.crypto_interval_s
+                    if on_refresh is not None:
+                        on_refresh("crypto", result)
+            stop.wait(max(0.1, min(next_stock, next_crypto) - self.clock()))
+
+
+_warmer_lock = threading.Lock()
+_warmer_thread: Optional[threading.Thread] = None
+_warmer_stop = threading.Event()
+
+
+def start_quote_warmer() -> bool:
+    """
+    Run a QuoteWarmer on a daemon thread in this process (at most one).
+
+    The default quote cache is process-local, so a warmer only helps the
+    process it runs in; this is how web workers warm their own cache. The
+    ``warm_quotes`` management command runs the same loop standalone.
+    """
+    global _warmer_thread
+    with _warmer_lock:
+        if _warmer_thread is not None and _warmer_thread.is_alive():
+            return False
+        _warmer_stop.clear()
+        warmer = QuoteWarmer()
+        _warmer_thread = threading.Thread(
+            target=warmer.run_forever, args=(_warmer_stop,), name="quote-warmer", daemon=True
+        )
+        _warmer_thread.start()
+        return True
+
+
+def stop_quote_warmer() -> None:
+    _warmer_stop.set()
@@ -1,3 +1,125 @@
-from django.test import TestCase
+from datetime import datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from eurocalc.cache import clear_market_data_cache
+from eurocalc.data_sources import MarketDataSource
+from eurocalc.quote_stream import get_quote_book
+
+from .crypto_market_data import get_crypto_current_prices
+from .market_data import POPULAR, get_current_prices
+from .models import CryptoPosition, Portfolio, Position
+from .quote_warmer import QuoteWarmer
+
+
+class BatchOnlySource(MarketDataSource):
+    def __init__(self, prices):
+        self.prices = prices
+        self.batches = []
+
+    def get_spot(self, symbol: str) -> float:
+        raise AssertionError("get_current_prices should use get_spots")
+
+    def get_spots(self, symbols, deadline_s=None):
+        symbols = list(symbols)
+        self.batches.append(symbols)
+        return {s: self.prices[s] for s in symbols if s in self.prices}
+
+
+class GetCurrentPricesTests(SimpleTestCase):
+    def setUp(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+
+    def test_popular_board_is_one_batch(self):
+        src = BatchOnlySource({s: 100.0 + i for i, s in enumerate(POPULAR)})
+        with mock.patch("api.market_data.get_market_data_source", return_value=src):
+            out = get_current_prices(POPULAR)
+        self.assertEqual(len(src.batches), 1)
+        self.assertEqual(out["AAPL"], {"price": 100.0, "error": None})
+
+    def test_missing_symbols_report_errors(self):
+        src = BatchOnlySource({"AAPL": 1.0})
+        with mock.patch("api.market_data.get_market_data_source", return_value=src):
+            out = get_current_prices([" aapl", "ZZZZ", "AAPL"], use_cache=False)
+        self.assertEqual(list(out), ["AAPL", "ZZZZ"])
+        self.assertIsNone(out["ZZZZ"]["price"])
+        self.assertIn("ZZZZ", out["ZZZZ"]["error"])
+
+    def test_streamed_quotes_skip_upstream(self):
+        book = get_quote_book()
+        self.addCleanup(book.clear)
+        book.apply({"T": "t", "S": "AAPL", "p": 5.0})
+        src = BatchOnlySource({"MSFT": 2.0})
+        with mock.patch("api.market_data.get_market_data_source", return_value=src):
+            out = get_current_prices(["AAPL", "MSFT"])
+        self.assertEqual(out["AAPL"], {"price": 5.0, "error": None})
+        self.assertEqual(src.batches, [["MSFT"]])
+
+    def test_fresh_quotes_bypass_the_stream(self):
+        book = get_quote_book()
+        self.addCleanup(book.clear)
+        book.apply({"T": "t", "S": "AAPL", "p": 5.0})
+        src = BatchOnlySource({"AAPL": 6.0})
+        with mock.patch("api.market_data.get_market_data_source", return_value=src):
+            out = get_current_prices(["AAPL"], use_cache=False)
+        self.assertEqual(out["AAPL"], {"price": 6.0, "error": None})
+        self.assertEqual(src.batches, [["AAPL"]])
+
+    def test_cached_quotes_skip_upstream(self):
+        src = BatchOnlySource({"AAPL": 1.0, "MSFT": 2.0})
+        with mock.patch("api.market_data.get_market_data_source", return_value=src):
+            get_current_prices(["AAPL"])
+            get_current_prices(["AAPL", "MSFT"])
+        self.assertEqual(src.batches, [["AAPL"], ["MSFT"]])
+
+
+class QuoteWarmerTests(TestCase):
+    def setUp(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        user = get_user_model().objects.create_user(username="warmer", password="x")
+        portfolio = Portfolio.objects.create(user=user, initial_cash=1000, cash_balance=1000)
+        Position.objects.create(portfolio=portfolio, symbol="ZZZ", quantity=5, avg_cost=10)
+        Position.objects.create(portfolio=portfolio, symbol="OLD", quantity=0, avg_cost=10)
+        CryptoPosition.objects.create(portfolio=portfolio, symbol="BTC/USD", quantity=1, avg_cost=10)
+
+    def test_hot_set_is_popular_plus_held(self):
+        warmer = QuoteWarmer(stock_source=BatchOnlySource({}), crypto_source=BatchOnlySource({}))
+        stocks, crypto = warmer.hot_symbols()
+        self.assertEqual(stocks, POPULAR + ["ZZZ"])
+        self.assertEqual(crypto, ["BTC/USD"])
+
+    def test_warmed_quotes_are_served_from_cache(self):
+        stocks = BatchOnlySource({s: 1.0 for s in POPULAR + ["ZZZ"]})
+        crypto = BatchOnlySource({"BTC/USD": 60000.0})
+        warmer = QuoteWarmer(stock_source=stocks, crypto_source=crypto, market_interval_s=60, off_hours_interval_s=60)
+        result = warmer.run_once()
+        self.assertEqual(result["stocks"]["warmed"], len(POPULAR) + 1)
+        self.assertEqual(len(stocks.batches), 1)
+        self.assertEqual(crypto.batches, [["BTC/USD"]])
+
+        upstream = BatchOnlySource({})
+        with mock.patch("api.market_data.get_market_data_source", return_value=upstream):
+            out = get_current_prices(["ZZZ", "AAPL"])
+        self.assertEqual(out["ZZZ"], {"price": 1.0, "error": None})
+        self.assertEqual(upstream.batches, [])
+        self.assertEqual(get_crypto_current_prices(["BTCUSD"])["BTC/USD"]["price"], 60000.0)
+
+    def test_refresh_rate_follows_market_hours(self):
+        et = ZoneInfo("America/New_York")
+        session = datetime(2026, 10, 16, 11, 0, tzinfo=et).timestamp()
+        saturday = datetime(2026, 10, 17, 11, 0, tzinfo=et).timestamp()
+        warmer = QuoteWarmer(
+            stock_source=BatchOnlySource({}),
+            crypto_source=BatchOnlySource({}),
+            market_interval_s=4,
+            off_hours_interval_s=60,
+            clock=lambda: session,
+        )
+        self.assertEqual(warmer.stock_interval(), 4)
+        warmer.clock = lambda: saturday
+        self.assertEqual(warmer.stock_interval(), 60)
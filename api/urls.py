@@ -6,6 +6,7 @@ app_name = "api"
 
 urlpatterns = [
     path("prices", views.prices, name="prices"),
+    path("market-data/cache/", views.market_data_cache_stats, name="market_data_cache_stats"),
 
 
     path("assistant/american/", views.american_assistant, name="assistant_american"),
@@ -26,4 +27,9 @@ urlpatterns = [
     path("crypto/positions/", crypto_views.crypto_positions, name="crypto_positions"),
     path("crypto/trades/", crypto_views.crypto_trades, name="crypto_trades"),
     path("crypto/trade/", crypto_views.crypto_trade, name="crypto_trade"),
+
+
+    path("async/prices", views.prices_async, name="prices_async"),
+    path("async/portfolio/summary/", views.portfolio_summary_async, name="portfolio_summary_async"),
+    path("async/crypto/prices/", crypto_views.crypto_prices_async, name="crypto_prices_async"),
 ]
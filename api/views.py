@@ -1,13 +1,18 @@
 from __future__ import annotations
 from .models import Portfolio, Position, Trade, CryptoPosition
-from .market_data import get_current_prices, POPULAR
-from .crypto_market_data import get_crypto_current_prices
+from .market_data import aget_current_prices, get_current_prices, POPULAR
+from .crypto_market_data import aget_crypto_current_prices, get_crypto_current_prices
 from optnstrdr.models import OptionPosition
+from eurocalc.cache import get_cache_stats
+from eurocalc.provider_health import get_provider_health
+import asyncio
 import json
 import os
 from typing import Dict, List, Any
 from decimal import Decimal
 
+from asgiref.sync import sync_to_async
+
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -29,6 +34,19 @@ def prices(request: HttpRequest) -> JsonResponse:
     return JsonResponse(data)
 
 
+@require_GET
+async def prices_async(request: HttpRequest) -> JsonResponse:
+    raw = request.GET.get("symbols", "")
+    symbols = [s.strip().upper() for s in raw.split(",") if s.strip()] or POPULAR
+    data = await aget_current_prices(symbols)
+    return JsonResponse(data)
+
+
+@require_GET
+def market_data_cache_stats(request: HttpRequest) -> JsonResponse:
+    return JsonResponse({"cache": get_cache_stats(), "providers": get_provider_health().snapshot()})
+
+
 def _parse_messages(payload: Dict[str, Any]) -> List[Dict[str, str]]:
     raw_messages = payload.get("messages")
     single_message = payload.get("message")
@@ -202,7 +220,79 @@ def portfolio_summary(request: HttpRequest) -> JsonResponse:
     if error_response is not None:
         return error_response
 
-    portfolio_id_raw = request.GET.get("portfolio_id")
+    holdings = _load_summary_holdings(user, request.GET.get("portfolio_id"))
+    if isinstance(holdings, JsonResponse):
+        return holdings
+
+    market_data: Dict[str, Dict[str, Any]] = {}
+    market_error: str | None = None
+    symbols = [p.symbol for p in holdings["positions"]]
+    if symbols:
+        try:
+            market_data = get_current_prices(symbols)
+        except RuntimeError as exc:
+            market_error = str(exc)
+            market_data = {}
+
+    crypto_market_data: Dict[str, Dict[str, Any]] = {}
+    crypto_market_error: str | None = None
+    crypto_symbols = [p.symbol for p in holdings["crypto_positions"]]
+    if crypto_symbols:
+        try:
+            crypto_market_data = get_crypto_current_prices(crypto_symbols)
+        except Exception as exc:
+            crypto_market_error = str(exc)
+            crypto_market_data = {}
+
+    return JsonResponse(
+        _portfolio_summary_payload(holdings, market_data, market_error, crypto_market_data, crypto_market_error)
+    )
+
+
+@require_GET
+async def portfolio_summary_async(request: HttpRequest) -> JsonResponse:
+    """
+    GET /api/async/portfolio/summary/
+
+    Same response as portfolio_summary. Stock and crypto quotes are fetched
+    concurrently on the event loop; only the ORM work runs on a thread.
+    """
+    user = await request.auser()
+    if not user or not user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+
+    holdings = await sync_to_async(_load_summary_holdings)(user, request.GET.get("portfolio_id"))
+    if isinstance(holdings, JsonResponse):
+        return holdings
+
+    async def stock_quotes():
+        symbols = [p.symbol for p in holdings["positions"]]
+        if not symbols:
+            return {}, None
+        try:
+            return await aget_current_prices(symbols), None
+        except RuntimeError as exc:
+            return {}, str(exc)
+
+    async def crypto_quotes():
+        symbols = [p.symbol for p in holdings["crypto_positions"]]
+        if not symbols:
+            return {}, None
+        try:
+            return await aget_crypto_current_prices(symbols), None
+        except Exception as exc:
+            return {}, str(exc)
+
+    (market_data, market_error), (crypto_market_data, crypto_market_error) = await asyncio.gather(
+        stock_quotes(), crypto_quotes()
+    )
+    return JsonResponse(
+        _portfolio_summary_payload(holdings, market_data, market_error, crypto_market_data, crypto_market_error)
+    )
+
+
+def _load_summary_holdings(user, portfolio_id_raw: str | None):
+    """The portfolio and its stock, option and crypto positions, or an error JsonResponse."""
     if portfolio_id_raw:
         try:
             portfolio_id = int(portfolio_id_raw)
@@ -220,23 +310,26 @@ def portfolio_summary(request: HttpRequest) -> JsonResponse:
     else:
         portfolio = _get_or_create_default_portfolio(user)
 
-    positions = Position.objects.filter(portfolio=portfolio)
-    symbols = [p.symbol for p in positions]
-
-    market_data: Dict[str, Dict[str, Any]] = {}
-    market_error: str | None = None
-
-    if symbols:
-        try:
-            market_data = get_current_prices(symbols)
-        except RuntimeError as exc:
-            market_error = str(exc)
-            market_data = {}
-
+    return {
+        "portfolio": portfolio,
+        "positions": list(Position.objects.filter(portfolio=portfolio)),
+        "option_positions": list(OptionPosition.objects.filter(portfolio=portfolio).select_related("contract")),
+        "crypto_positions": list(CryptoPosition.objects.filter(portfolio=portfolio)),
+    }
+
+
+def _portfolio_summary_payload(
+    holdings: Dict[str, Any],
+    market_data: Dict[str, Dict[str, Any]],
+    market_error: str | None,
+    crypto_market_data: Dict[str, Dict[str, Any]],
+    crypto_market_error: str | None,
+) -> Dict[str, Any]:
+    portfolio = holdings["portfolio"]
     positions_payload: List[Dict[str, Any]] = []
     total_positions_value = Decimal("0")
 
-    for pos in positions:
+    for pos in holdings["positions"]:
         info = market_data.get(pos.symbol) or {}
         price_val = info.get("price")
 
@@ -264,9 +357,8 @@ def portfolio_summary(request: HttpRequest) -> JsonResponse:
         )
 
     options_total_value = Decimal("0")
-    option_positions_qs = OptionPosition.objects.filter(portfolio=portfolio).select_related("contract")
 
-    for opt_pos in option_positions_qs:
+    for opt_pos in holdings["option_positions"]:
         qty = opt_pos.quantity
         cost = opt_pos.avg_cost
         mult_int = opt_pos.contract.multiplier or 0
@@ -275,22 +367,10 @@ def portfolio_summary(request: HttpRequest) -> JsonResponse:
 
     total_positions_value += options_total_value
 
-    crypto_positions_qs = CryptoPosition.objects.filter(portfolio=portfolio)
-    crypto_symbols = [p.symbol for p in crypto_positions_qs]
-
-    crypto_market_data: Dict[str, Dict[str, Any]] = {}
-    crypto_market_error: str | None = None
     crypto_positions_value = Decimal("0")
     crypto_unrealized_pl = Decimal("0")
 
-    if crypto_symbols:
-        try:
-            crypto_market_data = get_crypto_current_prices(crypto_symbols)
-        except Exception as exc:
-            crypto_market_error = str(exc)
-            crypto_market_data = {}
-
-    for cpos in crypto_positions_qs:
+    for cpos in holdings["crypto_positions"]:
         info = crypto_market_data.get(cpos.symbol) or {}
         price_val = info.get("price")
         if price_val is None:
@@ -302,26 +382,24 @@ def portfolio_summary(request: HttpRequest) -> JsonResponse:
 
     total_equity = portfolio.cash_balance + total_positions_value + crypto_positions_value
 
-    return JsonResponse(
-        {
-            "portfolio": {
-                "id": portfolio.id,
-                "name": portfolio.name,
-                "currency": portfolio.currency,
-                "initial_cash": float(portfolio.initial_cash),
-                "cash_balance": float(portfolio.cash_balance),
-                "positions_value": float(total_positions_value),
-                "crypto_positions_value": float(crypto_positions_value),
-                "crypto_unrealized_pl": float(crypto_unrealized_pl),
-                "total_equity": float(total_equity),
-                "is_default": bool(portfolio.is_default),
-                "created_at": portfolio.created_at.isoformat(),
-            },
-            "positions": positions_payload,
-            "market_error": market_error,
-            "crypto_market_error": crypto_market_error,
-        }
-    )
+    return {
+        "portfolio": {
+            "id": portfolio.id,
+            "name": portfolio.name,
+            "currency": portfolio.currency,
+            "initial_cash": float(portfolio.initial_cash),
+            "cash_balance": float(portfolio.cash_balance),
+            "positions_value": float(total_positions_value),
+            "crypto_positions_value": float(crypto_positions_value),
+            "crypto_unrealized_pl": float(crypto_unrealized_pl),
+            "total_equity": float(total_equity),
+            "is_default": bool(portfolio.is_default),
+            "created_at": portfolio.created_at.isoformat(),
+        },
+        "positions": positions_payload,
+        "market_error": market_error,
+        "crypto_market_error": crypto_market_error,
+    }
 
 
 @csrf_exempt
@@ -448,7 +526,7 @@ def execute_trade(request: HttpRequest) -> JsonResponse:
         if price <= 0:
             return JsonResponse({"ok": False, "error": "price must be positive"}, status=400)
     else:
-        market_data = get_current_prices([symbol]).get(symbol) or {}
+        market_data = get_current_prices([symbol], use_cache=False).get(symbol) or {}
         price_val = market_data.get("price")
         if price_val is None:
             return JsonResponse(
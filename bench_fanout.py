@@ -0,0 +1,92 @@
+"""
+Benchmark for per-symbol quote fan-out.
+Starts a local fake quote server with fixed latency and compares sequential
+get_spot calls with the pooled MarketDataSource.get_spots fan-out.
+
+    python bench_fanout.py [--latency-ms 50] [--deadline-s 2]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from eurocalc.data_sources import MarketDataSource
+from eurocalc.http_client import http_get
+
+
+def start_fake_upstream(latency_s: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_s)
+            symbol = parse_qs(urlparse(self.path).query).get("symbol", ["X"])[0]
+            body = json.dumps({"symbol": symbol, "price": 100.0 + len(symbol)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class PerSymbolSource(MarketDataSource):
+    """A source with no batch endpoint: one HTTP round trip per symbol."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def get_spot(self, symbol: str) -> float:
+        resp = http_get(f"{self.base_url}/price", params={"symbol": symbol}, timeout=10)
+        return float(resp.json()["price"])
+
+    def get_dividend_yield(self, symbol: str) -> float:
+        return 0.0
+
+
+def run_benchmark(latency_ms: float = 50.0, deadline_s: float = 2.0):
+    server = start_fake_upstream(latency_ms / 1000.0)
+    src = PerSymbolSource(f"http://127.0.0.1:{server.server_address[1]}")
+    src.get_spot("WARM")
+
+    print("=" * 70)
+    print(f"QUOTE FAN-OUT BENCHMARK (upstream latency {latency_ms:.0f} ms)")
+    print("=" * 70)
+    print(f"{'symbols':>8} {'sequential (s)':>16} {'fan-out (s)':>14} {'speedup':>9} {'priced':>8}")
+    print("-" * 70)
+    try:
+        for n in (1, 2, 4, 8, 16, 32, 64):
+            symbols = [f"SYM{i}" for i in range(n)]
+
+            t0 = time.perf_counter()
+            for sym in symbols:
+                src.get_spot(sym)
+            seq = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            out = src.get_spots(symbols, deadline_s=deadline_s)
+            par = time.perf_counter() - t0
+
+            print(f"{n:>8} {seq:>16.3f} {par:>14.3f} {seq / par:>8.1f}x {len(out):>5}/{n}")
+    finally:
+        server.shutdown()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--deadline-s", type=float, default=2.0)
+    args = parser.parse_args()
+    run_benchmark(args.latency_ms, args.deadline_s)
@@ -0,0 +1,91 @@
+"""
+Offline benchmark for the single-option pricing endpoints.
+Replays a recorded market data fixture (see `manage.py record_market_data`)
+with injected provider latency, so runs are reproducible and need no network.
+Without --fixture a synthetic one is generated.
+
+    python bench_pricing.py [--fixture fx.npz] [--latency-ms 80] [--requests 200] [--cold]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import django
+import numpy as np
+
+
+def synthetic_fixture(path: str, symbols):
+    from eurocalc.replay_source import MarketFixture
+
+    rng = np.random.default_rng(0)
+    fixture = MarketFixture()
+    for i, sym in enumerate(symbols):
+        closes = 100.0 + 20.0 * i + np.cumsum(rng.normal(0.0, 1.0, 400))
+        fixture.spots[sym] = float(closes[-1])
+        fixture.daily_closes[sym] = closes.tolist()
+        fixture.dividend_yields[sym] = 0.01
+    return fixture.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default=None)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cold", action="store_true", help="Clear the quote cache before every request.")
+    args = parser.parse_args()
+
+    symbols = ["AAPL", "MSFT", "NVDA", "SPY"]
+    tmp = tempfile.TemporaryDirectory()
+    fixture = args.fixture or str(synthetic_fixture(os.path.join(tmp.name, "bench.npz"), symbols))
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tmp.name, "bench.sqlite3"))
+    os.environ["FB_BAR_STORE_DIR"] = os.path.join(tmp.name, "bars")
+    os.environ["FB_REPLAY_FIXTURE"] = fixture
+    os.environ["FB_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FB_REPLAY_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["FB_REPLAY_ERROR_RATE"] = str(args.error_rate)
+    django.setup()
+
+    from django.test import RequestFactory
+
+    from eurocalc.cache import clear_market_data_cache
+    from eurocalc.registry import get_market_data_source
+    from eurocalc.views import american_price_api, euro_price_api
+
+    factory = RequestFactory()
+    expiry = (date.today() + timedelta(days=45)).isoformat()
+    replay = get_market_data_source()
+    syms = sorted(replay.fixture.spots)
+
+    for name, view in (("euro", euro_price_api), ("american", american_price_api)):
+        clear_market_data_cache()
+        timings, errors = [], 0
+        for i in range(args.requests):
+            if args.cold:
+                clear_market_data_cache()
+            sym = syms[i % len(syms)]
+            strike = round(replay.fixture.spots[sym] * (0.9 + 0.01 * (i % 20)), 2)
+            request = factory.get("/", {"symbol": sym, "strike": str(strike), "expiry": expiry})
+            t0 = time.perf_counter()
+            response = view(request)
+            timings.append((time.perf_counter() - t0) * 1000.0)
+            errors += response.status_code != 200
+        timings.sort()
+        print(
+            f"{name:9s} n={len(timings)} errors={errors} "
+            f"p50={statistics.median(timings):7.2f}ms p95={timings[int(0.95 * (len(timings) - 1))]:7.2f}ms "
+            f"upstream_calls={replay.calls}"
+        )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
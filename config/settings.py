@@ -90,6 +90,25 @@ STATICFILES_DIRS = [
     # (optional) BASE_DIR / "static",  # only if this folder exists
 ]
 
+# On-disk daily bar store used by eurocalc.bar_store
+MARKET_DATA_BAR_DIR = os.getenv("FB_BAR_STORE_DIR", str(BASE_DIR / "var" / "bars"))
+
+# Market data cache (eurocalc.cache). "memory" keeps it per process; set
+# FB_MARKET_DATA_CACHE=market_data to share quotes, closes and dividend
+# yields across workers and restarts through the cache alias below (a file
+# cache by default; point FB_MARKET_DATA_CACHE_BACKEND/LOCATION at redis or
+# memcached when workers span hosts).
+MARKET_DATA_CACHE = os.getenv("FB_MARKET_DATA_CACHE", "memory")
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "market_data": {
+        "BACKEND": os.getenv("FB_MARKET_DATA_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("FB_MARKET_DATA_CACHE_LOCATION", str(BASE_DIR / "var" / "market_data_cache")),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
 # Cookies for local HTTP dev
 SESSION_COOKIE_SECURE = False
 CSRF_COOKIE_SECURE = False
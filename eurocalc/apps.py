@@ -1,6 +1,24 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
 
 
 class EurocalcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eurocalc'
+
+    def ready(self):
+        if os.getenv("FB_MC_POOL_WARM") != "1":
+            return
+        # Only serving processes: not other management commands, and not the
+        # runserver autoreload parent.
+        if os.path.basename(sys.argv[0]) == "manage.py":
+            if sys.argv[1:2] != ["runserver"] or os.environ.get("RUN_MAIN") != "true":
+                return
+        from .monte_carlo import warm_process_pool
+
+        # Spawning and importing in the workers takes seconds; do it beside
+        # startup rather than in front of it.
+        threading.Thread(target=warm_process_pool, name="mc-pool-warm", daemon=True).start()
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+import asyncio
+import math
+import os
+
+from asgiref.sync import sync_to_async
+
+from .data_sources import (
+    AlpacaDataSource,
+    MarketDataSource,
+    TwelveDataDataSource,
+    latest_quote_prices,
+    latest_trade_prices,
+    normalize_symbols,
+    snapshot_price,
+)
+from .http_client import async_http_get
+from .provider_health import ProviderHealth, SymbolError, UpstreamHTTPError, get_provider_health
+
+V = TypeVar("V")
+
+
+async def gather_with_deadline(
+    fn: Callable[[str], Awaitable[Any]],
+    keys: Iterable[str],
+    deadline_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Await ``fn(key)`` for every key concurrently and return the successes.
+
+    Keys that raise, or are still pending when ``deadline_s`` runs out
+    (pending ones are cancelled), are left out — the async counterpart of
+    ``eurocalc.fanout.fan_out``.
+    """
+    tasks = {asyncio.ensure_future(fn(key)): key for key in keys}
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks, timeout=deadline_s)
+    for task in pending:
+        task.cancel()
+    out: Dict[str, Any] = {}
+    for task in done:
+        if task.exception() is None:
+            out[tasks[task]] = task.result()
+    return out
+
+
+async def hedged_async(calls: Sequence[Callable[[], Awaitable[V]]], delay_s: float) -> V:
+    """
+    Await the first successful result of ``calls``, tried in order — the
+    async counterpart of ``eurocalc.fanout.hedged``.
+
+    ``calls[0]`` starts immediately. Whenever ``delay_s`` passes without an
+    answer, or an in-flight call fails, the next call is started alongside
+    the ones still running. Losing calls are cancelled. Raises the last
+    error if every call fails.
+    """
+    if not calls:
+        raise RuntimeError("No calls to hedge")
+    pending = set()
+    started = 0
+    last_err: Optional[Exception] = None
+    try:
+        while True:
+            if started < len(calls):
+                pending.add(asyncio.ensure_future(calls[started]()))
+                started += 1
+            if not pending:
+                break
+            timeout = delay_s if started < len(calls) else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_err = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_err is not None:
+        raise last_err
+    raise RuntimeError("No calls to hedge")
+
+
+class AsyncMarketDataSource(ABC):
+    """Coroutine twin of MarketDataSource, for async views."""
+
+    @abstractmethod
+    async def get_spot(self, symbol: str) -> float:
+        raise NotImplementedError
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        results = await gather_with_deadline(self.get_spot, normalize_symbols(symbols), deadline_s)
+        return {sym: float(px) for sym, px in results.items()}
+
+    async def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        raise NotImplementedError
+
+    async def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return None
+
+
+class ThreadedAsyncDataSource(AsyncMarketDataSource):
+    """
+    Runs a synchronous MarketDataSource on worker threads.
+
+    Used for providers without an async client (yfinance, AlphaVantage) and
+    for the bar-store backed daily closes, so the event loop never blocks.
+    When ``quote_source`` is given it answers ``get_spot``/``get_spots``
+    instead of ``source``, so quotes can come from only the providers that
+    have no async client while history still uses every provider.
+    """
+
+    def __init__(self, source: MarketDataSource, quote_source: Optional[MarketDataSource] = None):
+        self.source = source
+        self.quote_source = quote_source if quote_source is not None else source
+        self.provider_name = getattr(source, "provider_name", None) or type(source).__name__
+
+    async def get_spot(self, symbol: str) -> float:
+        return await sync_to_async(self.quote_source.get_spot, thread_sensitive=False)(symbol)
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        return await sync_to_async(self.quote_source.get_spots, thread_sensitive=False)(list(symbols), deadline_s)
+
+    async def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        return await sync_to_async(self.source.get_daily_closes, thread_sensitive=False)(symbol, need=need)
+
+    async def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return await sync_to_async(self.source.get_dividend_yield, thread_sensitive=False)(symbol)
+
+
+class AsyncAlpacaDataSource(AsyncMarketDataSource):
+    """Alpaca stock quotes over aiohttp; same endpoints and parsing as AlpacaDataSource."""
+
+    def __init__(self, **kwargs: Any):
+        self.config = AlpacaDataSource(**kwargs)
+
+    async def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        cfg = self.config
+        resp = await async_http_get(
+            f"{cfg.base_url}{path}", params=params or {}, headers=cfg._headers(), timeout=cfg.timeout_s
+        )
+        if not resp.ok:
+            raise UpstreamHTTPError(f"Alpaca request failed: {resp.status_code} {resp.text}", resp.status_code)
+        try:
+            payload = resp.json()
+        except Exception as e:
+            raise RuntimeError("Alpaca returned non-JSON response.") from e
+        if not isinstance(payload, dict):
+            raise RuntimeError("Alpaca returned unexpected JSON shape.")
+        return payload
+
+    async def get_spot(self, symbol: str) -> float:
+        sym = (symbol or "").strip().upper()
+        if not sym:
+            raise ValueError("symbol is required")
+        out = await self.get_spots([sym])
+        if sym not in out:
+            raise SymbolError(f"Alpaca returned no latest price for {sym}.")
+        return out[sym]
+
+    async def _snapshot_price(self, sym: str) -> float:
+        price = snapshot_price(await self._get_json(f"/v2/stocks/{sym}/snapshot", params={"feed": self.config.feed}))
+        if price is None:
+            raise SymbolError(f"Alpaca returned no snapshot price for {sym}.")
+        return float(price)
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        if not syms:
+            return {}
+        feed = self.config.feed
+        out = latest_trade_prices(
+            await self._get_json("/v2/stocks/trades/latest", params={"symbols": ",".join(syms), "feed": feed}),
+            syms,
+        )
+        missing = [sym for sym in syms if sym not in out]
+        if missing:
+            try:
+                q_payload = await self._get_json(
+                    "/v2/stocks/quotes/latest", params={"symbols": ",".join(missing), "feed": feed}
+                )
+            except Exception:
+                q_payload = {}
+            out.update(latest_quote_prices(q_payload, missing))
+        missing = [sym for sym in syms if sym not in out]
+        if missing:
+            out.update(await gather_with_deadline(self._snapshot_price, missing, deadline_s))
+        return out
+
+
+class AsyncTwelveDataDataSource(AsyncMarketDataSource):
+    """TwelveData /price over aiohttp."""
+
+    def __init__(self, key: Optional[str] = None):
+        self.config = TwelveDataDataSource(key=key)
+
+    async def _price_json(self, symbols: List[str]) -> Any:
+        resp = await async_http_get(
+            f"{self.config.base}/price", params={"symbol": ",".join(symbols), "apikey": self.config.key}, timeout=10
+        )
+        if not resp.ok:
+            raise UpstreamHTTPError(f"TwelveData price failed: {resp.status_code} {resp.text}", resp.status_code)
+        return resp.json()
+
+    async def get_spot(self, symbol: str) -> float:
+        j = await self._price_json([symbol])
+        if not isinstance(j, dict) or "price" not in j:
+            raise SymbolError(f"TwelveData price missing for {symbol}: {j}")
+        return float(j["price"])
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        if len(syms) <= 1:
+            return await super().get_spots(syms, deadline_s)
+        j = await self._price_json(syms)
+        out: Dict[str, float] = {}
+        for sym in syms:
+            entry = j.get(sym) if isinstance(j, dict) else None
+            if isinstance(entry, dict) and "price" in entry:
+                try:
+                    out[sym] = float(entry["price"])
+                except Exception:
+                    continue
+        return out
+
+
+class AsyncCombinedDataSource(AsyncMarketDataSource):
+    """
+    Async counterpart of CombinedDataSource: providers are tried in the order
+    ProviderHealth ranks them, skipping open circuit breakers, and every call
+    feeds the same process-wide statistics. ``get_spot`` is hedged exactly
+    like ``CombinedDataSource.get_spot`` (``hedge_delay_s``, default
+    FB_HEDGE_DELAY_S).
+    """
+
+    def __init__(
+        self,
+        sources: List[AsyncMarketDataSource],
+        health: Optional[ProviderHealth] = None,
+        hedge_delay_s: Optional[float] = None,
+    ):
+        if not sources:
+            raise RuntimeError("No market data sources configured")
+        self._sources = list(sources)
+        self.health = health if health is not None else get_provider_health()
+        if hedge_delay_s is None:
+            hedge_delay_s = float(os.getenv("FB_HEDGE_DELAY_S", "1.0"))
+        self.hedge_delay_s = hedge_delay_s
+
+    async def _first(self, method: str, fn: Callable[[AsyncMarketDataSource], Awaitable[Any]], accept) -> Any:
+        last_err: Optional[Exception] = None
+        for src in self.health.order(self._sources, method):
+            try:
+                value = await self.health.acall(src, method, lambda src=src: fn(src))
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                last_err = e
+                continue
+            if accept(value):
+                return value
+        if last_err is not None:
+            raise last_err
+        return None
+
+    async def get_spot(self, symbol: str) -> float:
+        sources = self.health.order(self._sources, "get_spot")
+        calls = [
+            lambda src=src: self.health.acall(src, "get_spot", lambda: self._valid_spot(src, symbol))
+            for src in sources
+        ]
+        if self.hedge_delay_s > 0 and len(calls) > 1:
+            delay = self.hedge_delay_s
+            p95 = self.health.p95(sources[0], "get_spot")
+            if p95 is not None:
+                delay = min(delay, max(p95, 0.01))
+            return await hedged_async(calls, delay)
+        last_err: Optional[Exception] = None
+        for call in calls:
+            try:
+                return await call()
+            except Exception as e:
+                last_err = e
+                continue
+        if last_err is not None:
+            raise last_err
+        raise RuntimeError("No market data sources available")
+
+    @staticmethod
+    async def _valid_spot(src: AsyncMarketDataSource, symbol: str) -> float:
+        px = float(await src.get_spot(symbol))
+        if not math.isfinite(px) or px <= 0:
+            raise SymbolError(f"{type(src).__name__} returned invalid spot {px} for {symbol}")
+        return px
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        out: Dict[str, float] = {}
+        last_err: Optional[Exception] = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_s if deadline_s is not None else None
+        for src in self.health.order(self._sources, "get_spots"):
+            missing = [sym for sym in syms if sym not in out]
+            if not missing:
+                break
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+            try:
+                fetched = await self.health.acall(
+                    src, "get_spots", lambda src=src: asyncio.wait_for(src.get_spots(missing, remaining), remaining)
+                )
+                out.update(fetched)
+            except Exception as e:
+                last_err = e
+                continue
+        if not out and syms and last_err is not None:
+            raise last_err
+        return out
+
+    async def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        closes = await self._first(
+            "get_daily_closes", lambda src: src.get_daily_closes(symbol, need=need), lambda c: bool(c)
+        )
+        if closes is None:
+            raise RuntimeError("No market data sources available")
+        return list(closes)
+
+    async def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return await self._first("get_dividend_yield", lambda src: src.get_dividend_yield(symbol), lambda y: y is not None)
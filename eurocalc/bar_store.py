@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import logging
+import os
+import threading
+
+import numpy as np
+
+from .cache import MARKET_CLOSE, MARKET_TZ
+from .data_sources import MarketDataSource
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype([("date", "datetime64[D]"), ("close", "f8")])
+
+# A re-fetched overlapping bar that moved by more than this fraction means the
+# provider re-adjusted history (split, special dividend) and the file is rebuilt.
+ADJUSTMENT_TOLERANCE = 1e-3
+
+# (store root, symbol) -> session already verified against the provider.
+# Process-wide because views build a BarStoreDataSource per request.
+_checked_sessions: Dict[Tuple[str, str], date] = {}
+_checked_lock = threading.Lock()
+
+# (store root, symbol) -> lock serializing that symbol's backfills and writes.
+_symbol_locks: Dict[Tuple[str, str], threading.RLock] = {}
+
+
+def _symbol_lock(root: Path, symbol: str) -> threading.RLock:
+    with _checked_lock:
+        return _symbol_locks.setdefault((str(root), symbol), threading.RLock())
+
+
+def last_completed_session(now: Optional[datetime] = None) -> date:
+    """Most recent weekday whose regular session has closed (holidays are not modelled)."""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now_et.date()
+    if now_et.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def _default_root() -> Path:
+    root = os.getenv("FB_BAR_STORE_DIR")
+    if not root:
+        try:
+            from django.conf import settings
+            root = getattr(settings, "MARKET_DATA_BAR_DIR", None)
+        except Exception:
+            root = None
+    return Path(root or Path.home() / ".cache" / "financebuddy" / "bars")
+
+
+class DailyBarStore:
+    """
+    One ``<SYMBOL>.npy`` file per symbol holding a sorted (date, close) record array.
+
+    Reads load the whole file and keep no mapping open, so a later write can
+    always replace it; writes go to a temporary file that atomically
+    replaces the old one, so concurrent readers in other workers never see a
+    half-written file.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else _default_root()
+
+    def _path(self, symbol: str) -> Path:
+        safe = (symbol or "").strip().upper().replace("/", "_")
+        if not safe:
+            raise ValueError("symbol is required")
+        return self.root / f"{safe}.npy"
+
+    def lock(self, symbol: str) -> threading.RLock:
+        """Process-wide lock for ``symbol`` in this store, shared by every instance on the same root."""
+        return _symbol_lock(self.root, self._path(symbol).stem)
+
+    def read(self, symbol: str) -> np.ndarray:
+        path = self._path(symbol)
+        if not path.exists():
+            return np.empty(0, dtype=BAR_DTYPE)
+        try:
+            return np.load(path)
+        except (OSError, ValueError):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+    def last_date(self, symbol: str) -> Optional[date]:
+        bars = self.read(symbol)
+        if len(bars) == 0:
+            return None
+        return bars["date"][-1].item()
+
+    def write(self, symbol: str, bars: np.ndarray) -> None:
+        path = self._path(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(bars, dtype=BAR_DTYPE))
+        os.replace(tmp, path)
+
+    def merge(self, symbol: str, new_bars: List[Tuple[date, float]], replace: bool = False) -> np.ndarray:
+        incoming = np.array([(np.datetime64(d, "D"), c) for d, c in new_bars], dtype=BAR_DTYPE)
+        with self.lock(symbol):
+            existing = np.empty(0, dtype=BAR_DTYPE) if replace else self.read(symbol)
+            if len(incoming):
+                combined = np.concatenate([existing[~np.isin(existing["date"], incoming["date"])], incoming])
+                combined = combined[np.argsort(combined["date"], kind="stable")]
+                self.write(symbol, combined)
+            else:
+                combined = existing
+        return combined
+
+
+class BarStoreDataSource(MarketDataSource):
+    """
+    Serves ``get_daily_closes`` from a DailyBarStore and only asks the wrapped
+    source for sessions after the last stored date. Every other method is
+    forwarded unchanged.
+    """
+
+    def __init__(self, source: MarketDataSource, store: Optional[DailyBarStore] = None):
+        self.source = source
+        self.store = store or DailyBarStore()
+
+    def __getattr__(self, name: str):
+        return getattr(self.source, name)
+
+    def get_spot(self, symbol: str) -> float:
+        return self.source.get_spot(symbol)
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        return self.source.get_spots(symbols, deadline_s)
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        return self.source.get_cash_dividends(symbol)
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return self.source.get_dividend_yield(symbol)
+
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        return self.source.get_daily_bars(symbol, start)
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        sym = (symbol or "").strip().upper()
+        if not sym:
+            raise ValueError("symbol is required")
+        need_i = int(need)
+        if need_i <= 0:
+            raise ValueError("need must be > 0")
+
+        # One backfill per symbol at a time across every instance; a waiter
+        # re-reads and usually finds the file already up to date.
+        with self.store.lock(sym):
+            bars = self.store.read(sym)
+            try:
+                bars = self._backfill(sym, bars, need_i)
+            except NotImplementedError:
+                return list(self.source.get_daily_closes(sym, need=need_i))
+            except Exception:
+                if len(bars) < need_i:
+                    logger.warning("bar backfill failed for %s; using get_daily_closes", sym, exc_info=True)
+                    return list(self.source.get_daily_closes(sym, need=need_i))
+                logger.warning("bar backfill failed for %s; serving stored bars", sym, exc_info=True)
+
+        if len(bars) < need_i:
+            # No provider had enough bar history; closes may still be available.
+            return list(self.source.get_daily_closes(sym, need=need_i))
+        return [float(c) for c in bars["close"][-need_i:]]
+
+    def _backfill(self, sym: str, bars: np.ndarray, need: int) -> np.ndarray:
+        session = last_completed_session()
+        history_start = session - timedelta(days=int(need * 1.5) + 10)
+        checked_key = (str(self.store.root), sym)
+
+        def completed(fetched: List[Tuple[date, float]]) -> List[Tuple[date, float]]:
+            # Today's bar is still moving until the close; never store it as a daily close.
+            return [(d, c) for d, c in fetched if d <= session]
+
+        if len(bars) < need:
+            fetched = self.source.get_daily_bars(sym, history_start)
+            return self.store.merge(sym, completed(fetched), replace=True)
+
+        last = bars["date"][-1].item()
+        with _checked_lock:
+            already_checked = _checked_sessions.get(checked_key) == session
+        if last >= session or already_checked:
+            return bars
+
+        # Re-fetch the last stored session too, to detect re-adjusted history.
+        fetched = self.source.get_daily_bars(sym, last)
+        overlap = [c for d, c in fetched if d == last]
+        stored_close = float(bars["close"][-1])
+        if overlap and abs(overlap[0] - stored_close) > ADJUSTMENT_TOLERANCE * stored_close:
+            fetched = self.source.get_daily_bars(sym, history_start)
+            return self.store.merge(sym, completed(fetched), replace=True)
+        with _checked_lock:
+            _checked_sessions[checked_key] = session
+        return self.store.merge(sym, [(d, c) for d, c in completed(fetched) if d > last])
@@ -0,0 +1,617 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import asyncio
+import hashlib
+import math
+import os
+import pickle
+import struct
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from .data_sources import MarketDataSource, normalize_symbols
+from .single_flight import SingleFlight
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """True during the 09:30-16:00 America/New_York weekday session (holidays are not modelled)."""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now_et.weekday() < 5 and MARKET_OPEN <= now_et.time() < MARKET_CLOSE
+
+
+def seconds_until_market_close(now: Optional[datetime] = None) -> float:
+    """Seconds until the next 16:00 America/New_York close on a weekday (holidays are not modelled)."""
+    now_et = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    close = datetime.combine(now_et.date(), MARKET_CLOSE, tzinfo=MARKET_TZ)
+    if now_et >= close:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+    return max(1.0, (close - now_et).total_seconds())
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    stale_until: float
+
+
+class MarketDataCacheBackend:
+    """
+    Key/value store for CacheEntry objects, keyed by (method, symbol, ...) tuples.
+
+    ``ttl_s`` on ``set`` is how long the entry is worth keeping at all
+    (freshness plus stale grace); stores with their own expiry use it to
+    evict, and freshness is always judged from the entry itself.
+    """
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[Tuple]) -> Dict[Tuple, CacheEntry]:
+        out: Dict[Tuple, CacheEntry] = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                out[key] = entry
+        return out
+
+    def set(self, key: Tuple, entry: CacheEntry, ttl_s: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(MarketDataCacheBackend):
+    """Thread-safe, process-local key/value store for CacheEntry objects."""
+
+    def __init__(self):
+        self._data: Dict[Tuple, CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: Tuple, entry: CacheEntry, ttl_s: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_ENTRY_HEADER = struct.Struct("<cdd")
+
+
+def encode_entry(entry: CacheEntry) -> bytes:
+    """
+    Compact binary form of a CacheEntry: a kind byte and the two expiry
+    times, then the value. Floats are 8 bytes, close histories are raw
+    little-endian float64 arrays; anything else falls back to pickle.
+    """
+    value = entry.value
+    if value is None:
+        kind, payload = b"n", b""
+    elif isinstance(value, (float, int)) and not isinstance(value, bool):
+        kind, payload = b"f", struct.pack("<d", float(value))
+    else:
+        arr = np.asarray(value) if isinstance(value, (list, tuple, np.ndarray)) else None
+        if arr is not None and arr.ndim == 1 and arr.dtype.kind in "fiu":
+            kind, payload = b"a", arr.astype("<f8").tobytes()
+        else:
+            kind, payload = b"p", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _ENTRY_HEADER.pack(kind, entry.expires_at, entry.stale_until) + payload
+
+
+def decode_entry(blob: bytes) -> CacheEntry:
+    kind, expires_at, stale_until = _ENTRY_HEADER.unpack_from(blob)
+    payload = memoryview(blob)[_ENTRY_HEADER.size:]
+    if kind == b"n":
+        value: Any = None
+    elif kind == b"f":
+        value = struct.unpack("<d", payload)[0]
+    elif kind == b"a":
+        value = np.frombuffer(payload, dtype="<f8").tolist()
+    elif kind == b"p":
+        value = pickle.loads(payload)
+    else:
+        raise ValueError(f"Unknown cache entry kind {kind!r}")
+    return CacheEntry(value=value, expires_at=expires_at, stale_until=stale_until)
+
+
+class DjangoCacheBackend(MarketDataCacheBackend):
+    """
+    Market data cache on a Django cache alias (file-based, database,
+    memcached or redis), so every worker process -- and every restart --
+    shares the same quotes, closes and dividend yields.
+
+    Entries are stored with encode_entry and expire from the cache after
+    their TTL plus grace. ``clear()`` clears the whole alias, so give market
+    data its own alias (settings.CACHES["market_data"]).
+    """
+
+    KEY_PREFIX = "md1"
+
+    def __init__(self, alias: str = "market_data"):
+        from django.core.cache import caches
+
+        self.alias = alias
+        self.cache = caches[alias]
+
+    def _key(self, key: Tuple) -> str:
+        raw = ":".join([self.KEY_PREFIX] + [str(part) for part in key])
+        if len(raw) > 200 or any(ch.isspace() or ord(ch) < 33 for ch in raw):
+            return f"{self.KEY_PREFIX}:h:{hashlib.sha1(raw.encode()).hexdigest()}"
+        return raw
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        blob = self.cache.get(self._key(key))
+        return decode_entry(blob) if blob is not None else None
+
+    def get_many(self, keys: List[Tuple]) -> Dict[Tuple, CacheEntry]:
+        by_name = {self._key(key): key for key in keys}
+        found = self.cache.get_many(list(by_name))
+        return {by_name[name]: decode_entry(blob) for name, blob in found.items()}
+
+    def set(self, key: Tuple, entry: CacheEntry, ttl_s: Optional[float] = None) -> None:
+        timeout = None if ttl_s is None else max(1, math.ceil(ttl_s))
+        self.cache.set(self._key(key), encode_entry(entry), timeout=timeout)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class CacheStats:
+    FIELDS = ("hits", "stale_hits", "misses", "coalesced", "refreshes", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def incr(self, method: str, field: str) -> None:
+        with self._lock:
+            per = self._counts.setdefault(method, dict.fromkeys(self.FIELDS, 0))
+            per[field] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {m: dict(c) for m, c in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_default_backend: Optional[MarketDataCacheBackend] = None
+_default_backend_lock = threading.Lock()
+_default_stats = CacheStats()
+_default_flight = SingleFlight()
+_refresh_pool: Optional[ThreadPoolExecutor] = None
+_refresh_pool_lock = threading.Lock()
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+
+def _get_refresh_pool() -> ThreadPoolExecutor:
+    global _refresh_pool
+    with _refresh_pool_lock:
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="md-refresh")
+        return _refresh_pool
+
+
+def get_default_backend() -> MarketDataCacheBackend:
+    """
+    The process-wide cache backend: in-memory, unless settings.MARKET_DATA_CACHE
+    (FB_MARKET_DATA_CACHE) names a Django cache alias to share across workers.
+    """
+    global _default_backend
+    if _default_backend is None:
+        with _default_backend_lock:
+            if _default_backend is None:
+                alias = os.getenv("FB_MARKET_DATA_CACHE")
+                if alias is None:
+                    try:
+                        from django.conf import settings
+                        alias = getattr(settings, "MARKET_DATA_CACHE", None)
+                    except Exception:
+                        alias = None
+                if alias and alias != "memory":
+                    _default_backend = DjangoCacheBackend(alias)
+                else:
+                    _default_backend = InMemoryCacheBackend()
+    return _default_backend
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    return _default_stats.snapshot()
+
+
+def clear_market_data_cache() -> None:
+    get_default_backend().clear()
+    _default_stats.reset()
+
+
+class CachedMarketDataSource(MarketDataSource):
+    """
+    TTL cache in front of any MarketDataSource.
+
+    Each method has its own freshness window: spot quotes for a few seconds,
+    daily closes until the next market close, dividend yields and the
+    corporate-actions ledger for a day.
+    Once an entry expires it is still served for a grace period while a
+    background refresh runs (stale-while-revalidate). Entries live in a
+    process-wide backend by default, so per-request wrappers share them.
+    Misses go through a process-wide SingleFlight keyed on (method, symbol,
+    args), so a burst of identical lookups makes one upstream call.
+    Any method not handled here is forwarded to the wrapped source.
+    """
+
+    def __init__(
+        self,
+        source: MarketDataSource,
+        backend: Optional[MarketDataCacheBackend] = None,
+        stats: Optional[CacheStats] = None,
+        flight: Optional[SingleFlight] = None,
+        spot_ttl_s: Optional[float] = None,
+        spot_grace_s: Optional[float] = None,
+        dividend_ttl_s: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.source = source
+        self.backend = backend if backend is not None else get_default_backend()
+        self.stats = stats if stats is not None else _default_stats
+        self.flight = flight if flight is not None else _default_flight
+        self.spot_ttl_s = float(spot_ttl_s if spot_ttl_s is not None else os.getenv("FB_SPOT_CACHE_TTL_S", "5"))
+        self.spot_grace_s = float(spot_grace_s if spot_grace_s is not None else os.getenv("FB_SPOT_CACHE_GRACE_S", "30"))
+        self.dividend_ttl_s = float(
+            dividend_ttl_s if dividend_ttl_s is not None else os.getenv("FB_DIVIDEND_CACHE_TTL_S", "86400")
+        )
+        self.clock = clock
+
+    def __getattr__(self, name: str):
+        return getattr(self.source, name)
+
+    def get_spot(self, symbol: str) -> float:
+        sym = (symbol or "").strip().upper()
+        return self._cached(
+            ("get_spot", sym),
+            lambda: float(self.source.get_spot(sym)),
+            self.spot_ttl_s,
+            self.spot_grace_s,
+        )
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        out, missing, stale = self._lookup_spots(symbols)
+        if stale:
+            self._refresh_in_background(("get_spot",) + tuple(stale), lambda: self._fetch_spots(stale))
+        if missing:
+            try:
+                fetched = self._coalesced(
+                    "get_spot", ("get_spots",) + tuple(missing), lambda: self._fetch_spots(missing, deadline_s)
+                )
+                out.update(fetched)
+            except Exception:
+                self.stats.incr("get_spot", "errors")
+                if not out:
+                    raise
+        return out
+
+    def _lookup_spots(self, symbols: Iterable[str]) -> Tuple[Dict[str, float], List[str], List[str]]:
+        """One backend round trip for a batch: (cached prices, missing symbols, stale symbols)."""
+        syms = normalize_symbols(symbols)
+        entries = self.backend.get_many([("get_spot", sym) for sym in syms])
+        out: Dict[str, float] = {}
+        missing: List[str] = []
+        stale: List[str] = []
+        now = self.clock()
+        for sym in syms:
+            entry = entries.get(("get_spot", sym))
+            if entry is not None and now < entry.expires_at:
+                self.stats.incr("get_spot", "hits")
+                out[sym] = entry.value
+            elif entry is not None and now < entry.stale_until:
+                self.stats.incr("get_spot", "stale_hits")
+                out[sym] = entry.value
+                stale.append(sym)
+            else:
+                self.stats.incr("get_spot", "misses")
+                missing.append(sym)
+        return out, missing, stale
+
+    def _fetch_spots(self, symbols: List[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        fetched = self.source.get_spots(symbols, deadline_s)
+        for sym, price in fetched.items():
+            self._store(("get_spot", sym), float(price), self.spot_ttl_s, self.spot_grace_s)
+        return fetched
+
+    def warm_spots(self, symbols: Iterable[str], ttl_s: Optional[float] = None) -> Dict[str, float]:
+        """
+        Fetch ``symbols`` in one batch and store them regardless of what is cached.
+
+        ``ttl_s`` lets a background refresher keep entries fresh for its own
+        refresh interval; it never shortens the configured spot TTL.
+        """
+        syms = normalize_symbols(symbols)
+        if not syms:
+            return {}
+        ttl = max(self.spot_ttl_s, float(ttl_s or 0.0))
+        try:
+            fetched = self.source.get_spots(syms)
+        except Exception:
+            self.stats.incr("get_spot", "errors")
+            raise
+        for sym, price in fetched.items():
+            self._store(("get_spot", sym), float(price), ttl, self.spot_grace_s)
+            self.stats.incr("get_spot", "refreshes")
+        return fetched
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        sym = (symbol or "").strip().upper()
+        ttl = seconds_until_market_close()
+        closes = self._cached(
+            ("get_daily_closes", sym, int(need)),
+            lambda: list(self.source.get_daily_closes(sym, need=need)),
+            ttl,
+            ttl,
+        )
+        return list(closes)
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        """The per-symbol corporate-actions ledger, refreshed on the dividend TTL (a day by default)."""
+        sym = (symbol or "").strip().upper()
+        return list(
+            self._cached(
+                ("get_cash_dividends", sym),
+                lambda: list(self.source.get_cash_dividends(sym)),
+                self.dividend_ttl_s,
+                self.dividend_ttl_s,
+            )
+        )
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        sym = (symbol or "").strip().upper()
+        return self._cached(
+            ("get_dividend_yield", sym),
+            lambda: self.source.get_dividend_yield(sym),
+            self.dividend_ttl_s,
+            self.dividend_ttl_s,
+        )
+
+    def _store(self, key: Tuple, value: Any, ttl: float, grace: float) -> None:
+        now = self.clock()
+        self.backend.set(key, CacheEntry(value=value, expires_at=now + ttl, stale_until=now + ttl + grace), ttl + grace)
+
+    def _cached(self, key: Tuple, fetch: Callable[[], Any], ttl: float, grace: float) -> Any:
+        method = key[0]
+        entry = self.backend.get(key)
+        now = self.clock()
+        if entry is not None and now < entry.expires_at:
+            self.stats.incr(method, "hits")
+            return entry.value
+        if entry is not None and now < entry.stale_until:
+            self.stats.incr(method, "stale_hits")
+            self._refresh_in_background(key, lambda: self._store(key, fetch(), ttl, grace))
+            return entry.value
+
+        self.stats.incr(method, "misses")
+
+        def fetch_and_store() -> Any:
+            value = fetch()
+            self._store(key, value, ttl, grace)
+            return value
+
+        try:
+            return self._coalesced(method, key, fetch_and_store)
+        except Exception:
+            self.stats.incr(method, "errors")
+            raise
+
+    def _coalesced(self, method: str, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        value, shared = self.flight.do(key, fetch)
+        if shared:
+            self.stats.incr(method, "coalesced")
+        return value
+
+    def _refresh_in_background(self, key: Tuple, refresh: Callable[[], Any]) -> None:
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+                self.stats.incr(key[0], "refreshes")
+            except Exception:
+                self.stats.incr(key[0], "errors")
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        _get_refresh_pool().submit(run)
+
+
+_async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+_background_tasks: set = set()
+
+
+class AsyncCachedMarketDataSource:
+    """
+    CachedMarketDataSource for an AsyncMarketDataSource.
+
+    Reads and writes the same backend, TTLs and stats as the sync cache, so
+    quotes fetched (or warmed) on either side serve both. Misses are
+    coalesced per event loop; stale entries are refreshed by a background
+    task on the running loop. Backends other than InMemoryCacheBackend do
+    blocking I/O (and the database cache must not be touched from the event
+    loop at all), so their calls run through ``sync_to_async``.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        backend: Optional[MarketDataCacheBackend] = None,
+        stats: Optional[CacheStats] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.source = source
+        self._sync = CachedMarketDataSource(source, backend=backend, stats=stats, clock=clock)
+        self.backend = self._sync.backend
+        self.stats = self._sync.stats
+        self._blocking = not isinstance(self.backend, InMemoryCacheBackend)
+
+    async def _off_loop(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._blocking:
+            return fn(*args)
+        from asgiref.sync import sync_to_async
+
+        # Cache clients are not bound to a thread; keep them off Django's single
+        # sync thread so cache I/O neither serializes nor waits on ORM work.
+        return await sync_to_async(fn, thread_sensitive=False)(*args)
+
+    async def get_spot(self, symbol: str) -> float:
+        sym = (symbol or "").strip().upper()
+        ttl, grace = self._sync.spot_ttl_s, self._sync.spot_grace_s
+
+        async def fetch() -> float:
+            return float(await self.source.get_spot(sym))
+
+        return await self._cached(("get_spot", sym), fetch, ttl, grace)
+
+    async def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        out, missing, stale = await self._off_loop(self._sync._lookup_spots, symbols)
+        if stale:
+            self._refresh_in_background(("get_spot",) + tuple(stale), lambda: self._fetch_spots(stale))
+        if missing:
+            try:
+                out.update(
+                    await self._coalesced(
+                        "get_spot", ("get_spots",) + tuple(missing), lambda: self._fetch_spots(missing, deadline_s)
+                    )
+                )
+            except Exception:
+                self.stats.incr("get_spot", "errors")
+                if not out:
+                    raise
+        return out
+
+    async def _fetch_spots(self, symbols: List[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        fetched = await self.source.get_spots(symbols, deadline_s)
+        for sym, price in fetched.items():
+            await self._off_loop(
+                self._sync._store, ("get_spot", sym), float(price), self._sync.spot_ttl_s, self._sync.spot_grace_s
+            )
+        return fetched
+
+    async def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        sym = (symbol or "").strip().upper()
+        ttl = seconds_until_market_close()
+
+        async def fetch() -> List[float]:
+            return list(await self.source.get_daily_closes(sym, need=need))
+
+        return list(await self._cached(("get_daily_closes", sym, int(need)), fetch, ttl, ttl))
+
+    async def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        sym = (symbol or "").strip().upper()
+        ttl = self._sync.dividend_ttl_s
+
+        async def fetch() -> Optional[float]:
+            return await self.source.get_dividend_yield(sym)
+
+        return await self._cached(("get_dividend_yield", sym), fetch, ttl, ttl)
+
+    async def _cached(self, key: Tuple, fetch: Callable[[], Awaitable[Any]], ttl: float, grace: float) -> Any:
+        method = key[0]
+        entry = await self._off_loop(self.backend.get, key)
+        now = self._sync.clock()
+        if entry is not None and now < entry.expires_at:
+            self.stats.incr(method, "hits")
+            return entry.value
+        if entry is not None and now < entry.stale_until:
+            self.stats.incr(method, "stale_hits")
+
+            async def refresh() -> None:
+                await self._off_loop(self._sync._store, key, await fetch(), ttl, grace)
+
+            self._refresh_in_background(key, refresh)
+            return entry.value
+
+        self.stats.incr(method, "misses")
+
+        async def fetch_and_store() -> Any:
+            value = await fetch()
+            await self._off_loop(self._sync._store, key, value, ttl, grace)
+            return value
+
+        try:
+            return await self._coalesced(method, key, fetch_and_store)
+        except Exception:
+            self.stats.incr(method, "errors")
+            raise
+
+    async def _coalesced(self, method: str, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        inflight = _async_inflight.setdefault(loop, {})
+        fut = inflight.get(key)
+        if fut is not None:
+            self.stats.incr(method, "coalesced")
+            return await asyncio.shield(fut)
+
+        fut = loop.create_future()
+        inflight[key] = fut
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            fut.set_result(value)
+            return value
+        finally:
+            inflight.pop(key, None)
+
+    def _refresh_in_background(self, key: Tuple, refresh: Callable[[], Awaitable[Any]]) -> None:
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        async def run() -> None:
+            try:
+                await refresh()
+                self.stats.incr(key[0], "refreshes")
+            except Exception:
+                self.stats.incr(key[0], "errors")
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from calendar import Calendar
-from typing import Optional, Callable, List
-from datetime import date
+from dataclasses import dataclass
+from typing import Optional, Callable, Dict, List
+from datetime import date, timedelta
 import math
 import os
+import time
 
+import numpy as np
 
-from .data_sources import MarketDataSource, CombinedDataSource
+from .data_sources import MarketDataSource
+from .fanout import run_calls
+from .market_context import MarketContext
+from .quote_stream import QuoteBook, get_quote_book, subscribe_quotes
+from .registry import get_market_data_source
 
 
 class SpotPriceCalculator:
@@ -15,9 +22,11 @@ class SpotPriceCalculator:
         self,
         market_ticker_func: Optional[Callable[[str], float]] = None,
         data_source: Optional[MarketDataSource] = None,
+        book: Optional[QuoteBook] = None,
     ):
         self.ticker = market_ticker_func
-        self.ds = data_source or CombinedDataSource()
+        self.ds = data_source or get_market_data_source()
+        self.book = book if book is not None else get_quote_book()
 
     def compute(self, symbol: str) -> float:
         if self.ticker:
@@ -25,6 +34,14 @@ class SpotPriceCalculator:
             if px is None or px <= 0:
                 raise ValueError(f"Invalid spot for {symbol}: {px}")
             return float(px)
+        # A fresh streamed price is a memory read; otherwise go to the data
+        # source and ask the stream (if running) to start carrying the symbol.
+        px = self.book.price(symbol)
+        if px is not None:
+            if isinstance(self.ds, MarketContext):
+                self.ds.remember(("spot", symbol.strip().upper()), px)
+            return px
+        subscribe_quotes([symbol])
         return float(self.ds.get_spot(symbol))
 
 
@@ -47,7 +64,7 @@ class RiskFreeRateCalculator:
 
 class FundamentalsDividendYieldCalculator:
     def __init__(self, data_source: Optional[MarketDataSource] = None, default_if_missing: float = 0.0):
-        self.ds = data_source or CombinedDataSource()
+        self.ds = data_source or get_market_data_source()
         self._default = float(default_if_missing)
 
     def compute(self, symbol: str, as_of: Optional[date] = None, expiry: Optional[date] = None) -> float:
@@ -74,7 +91,7 @@ class HistoricalVolatilityCalculator:
         floor: float = 0.01,
         cap: float = 5.0,
     ):
-        self.ds = data_source or CombinedDataSource()
+        self.ds = data_source or get_market_data_source()
         self.lookback = int(lookback_days)
         self.floor = float(floor)
         self.cap = float(cap)
@@ -158,6 +175,180 @@ class ImpliedVolatilityCalculator:
         return float(max(min_vol, iv))
 
 
+class BatchImpliedVolatilityCalculator:
+    """
+    QuantLib-free implied volatility solver.
+
+    Each element starts from the Corrado-Miller rational guess and is refined
+    with Halley steps on vega, falling back to bisection whenever a step leaves
+    the current bracket. Elements that do not converge are handed to
+    ``ImpliedVolatilityCalculator`` when ``use_fallback`` is set.
+    """
+
+    def __init__(
+        self,
+        tol: float = 1e-10,
+        max_iterations: int = 50,
+        min_vol: float = 1e-6,
+        max_vol: float = 4.0,
+        use_fallback: bool = True,
+        fallback: Optional[ImpliedVolatilityCalculator] = None,
+    ):
+        self.tol = float(tol)
+        self.max_iterations = int(max_iterations)
+        self.min_vol = float(min_vol)
+        self.max_vol = float(max_vol)
+        self.use_fallback = use_fallback
+        self._fallback = fallback
+
+    @property
+    def fallback(self) -> ImpliedVolatilityCalculator:
+        if self._fallback is None:
+            self._fallback = ImpliedVolatilityCalculator()
+        return self._fallback
+
+    def compute(
+        self,
+        *,
+        market_price: float,
+        symbol: str,
+        side: str,
+        strike: float,
+        expiry: date,
+        as_of: Optional[date],
+        spot: float,
+        rate: float,
+        dividend_yield: float,
+        **_,
+    ) -> float:
+        as_of_eff = as_of or date.today()
+        if expiry <= as_of_eff:
+            raise ValueError("expiry must be after as_of for IV solve")
+        T = (expiry - as_of_eff).days / 365.0
+        out = self.compute_batch(
+            market_price, spot, strike, rate, dividend_yield, T, side, as_of=as_of_eff, expiry=expiry
+        )
+        if not out["converged"]:
+            raise ValueError(f"implied volatility solve failed for {symbol}")
+        return float(out["sigma"])
+
+    def compute_batch(self, price, S, K, r, q, T, side, *, as_of: Optional[date] = None, expiry=None) -> dict:
+        """
+        Solve implied volatility for broadcastable arrays of option prices.
+
+        Returns ``sigma`` (NaN where unsolved), ``converged`` and
+        ``used_fallback`` boolean arrays, and per-element ``iterations``.
+        ``expiry`` (a date or array of dates) is only used by the QuantLib
+        fallback; without it the expiry is reconstructed from ``T`` on an
+        Actual/365 basis.
+        """
+        price, S, K, r, q, T = _broadcast_inputs(price, S, K, r, q, T)
+        if np.any(S <= 0) or np.any(K <= 0) or np.any(T <= 0):
+            raise ValueError("S, K, T must be positive.")
+        shape = S.shape
+        is_call = _side_mask(side, shape).reshape(-1)
+        price, S, K, r, q, T = (a.reshape(-1) for a in (price, S, K, r, q, T))
+        sides = np.where(is_call, "CALL", "PUT")
+
+        sqrt_t = np.sqrt(T)
+        disc_r = np.exp(-r * T)
+        F = S * np.exp((r - q) * T)
+
+        # Work on the out-of-the-money side in forward terms: it is the better
+        # conditioned problem and put-call parity maps the price across.
+        otm_call = K >= F
+        target = price / disc_r + (otm_call.astype(float) - is_call.astype(float)) * (F - K)
+        phi = np.where(otm_call, 1.0, -1.0)
+
+        def forward_price(vol):
+            vst = vol * sqrt_t
+            d1 = (np.log(F / K) + 0.5 * vst * vst) / vst
+            d2 = d1 - vst
+            return phi * (F * _N_array(phi * d1) - K * _N_array(phi * d2))
+
+        sigma = np.full(S.shape, np.nan)
+        converged = np.zeros(S.shape, dtype=bool)
+        iterations = np.zeros(S.shape, dtype=int)
+
+        lo = np.full(S.shape, self.min_vol)
+        hi = np.full(S.shape, self.max_vol)
+        p_lo = forward_price(lo)
+        p_hi = forward_price(hi)
+        active = np.isfinite(target) & (target > p_lo) & (target < p_hi)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            m = F - K
+            c = np.where(otm_call, target, target + m)
+            half = c - 0.5 * m
+            guess = (math.sqrt(2.0 * math.pi) / (F + K)) * (half + np.sqrt(np.maximum(half * half - m * m / math.pi, 0.0)))
+            guess = guess / sqrt_t
+            guess = np.where(np.isfinite(guess) & (guess > lo) & (guess < hi), guess, 0.5 * (lo + hi))
+        sigma[active] = guess[active]
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for it in range(1, self.max_iterations + 1):
+                idx = np.flatnonzero(active)
+                if idx.size == 0:
+                    break
+                vol, st, fwd, strike, p = sigma[idx], sqrt_t[idx], F[idx], K[idx], phi[idx]
+                vst = vol * st
+                d1 = (np.log(fwd / strike) + 0.5 * vst * vst) / vst
+                d2 = d1 - vst
+                f = p * (fwd * _N_array(p * d1) - strike * _N_array(p * d2)) - target[idx]
+                vega = fwd * _phi_array(d1) * st
+
+                lo[idx] = np.where(f < 0.0, vol, lo[idx])
+                hi[idx] = np.where(f > 0.0, vol, hi[idx])
+
+                newton = f / vega
+                halley_den = 1.0 - 0.5 * newton * d1 * d2 / vol
+                step = np.where(halley_den > 0.5, newton / halley_den, newton)
+                nxt = vol - step
+                done = (np.abs(step) < self.tol) | (np.abs(f) <= self.tol * target[idx]) | (hi[idx] - lo[idx] < self.tol)
+                bisect = ~done & ~((nxt > lo[idx]) & (nxt < hi[idx]))
+                nxt = np.where(bisect, 0.5 * (lo[idx] + hi[idx]), nxt)
+
+                sigma[idx] = nxt
+                iterations[idx] = it
+                converged[idx[done]] = True
+                active[idx[done]] = False
+
+        sigma[converged] = np.maximum(sigma[converged], self.min_vol)
+        sigma[~converged] = np.nan
+
+        used_fallback = np.zeros(S.shape, dtype=bool)
+        if self.use_fallback:
+            as_of_eff = as_of or date.today()
+            expiries = np.broadcast_to(np.asarray(expiry, dtype=object), shape).reshape(-1) if expiry is not None else None
+            for i in np.flatnonzero(~converged):
+                exp_i = expiries[i] if expiries is not None else as_of_eff + timedelta(days=int(round(T[i] * 365.0)))
+                try:
+                    sigma[i] = self.fallback.compute(
+                        market_price=float(price[i]),
+                        symbol="",
+                        side=str(sides[i]),
+                        strike=float(K[i]),
+                        expiry=exp_i,
+                        as_of=as_of_eff,
+                        spot=float(S[i]),
+                        rate=float(r[i]),
+                        dividend_yield=float(q[i]),
+                        min_vol=self.min_vol,
+                        max_vol=self.max_vol,
+                    )
+                except Exception:
+                    continue
+                converged[i] = True
+                used_fallback[i] = True
+
+        return {
+            "sigma": sigma.reshape(shape),
+            "converged": converged.reshape(shape),
+            "used_fallback": used_fallback.reshape(shape),
+            "iterations": iterations.reshape(shape),
+        }
+
+
 class YearFractionCalculator:
     def __init__(self, use_quantlib: bool = False):
         self.use_quantlib = use_quantlib
@@ -185,6 +376,102 @@ def _N(x: float) -> float:
     return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
 
 
+# Cephes rational approximations for erf/erfc, accurate to double precision.
+# numpy has no erf ufunc and scipy is not a dependency, so the batch pricers
+# evaluate these polynomials directly.
+_ERF_T = np.array([
+    9.60497373987051638749e0,
+    9.00260197203842689217e1,
+    2.23200534594684319226e3,
+    7.00332514112805075473e3,
+    5.55923013010394962768e4,
+])
+_ERF_U = np.array([
+    1.0,
+    3.35617141647503099647e1,
+    5.21357949780152679795e2,
+    4.59432382970980127987e3,
+    2.26290000613890934246e4,
+    4.92673942608635921086e4,
+])
+_ERFC_P = np.array([
+    2.46196981473530512524e-10,
+    5.64189564831068821977e-1,
+    7.46321056442269912687e0,
+    4.86371970985681366614e1,
+    1.96520832956077098242e2,
+    5.26445194995477358631e2,
+    9.34528527171957607540e2,
+    1.02755188689515710272e3,
+    5.57535335369399327526e2,
+])
+_ERFC_Q = np.array([
+    1.0,
+    1.32281951154744992508e1,
+    8.67072140885989742329e1,
+    3.54937778887819891062e2,
+    9.75708501743205489753e2,
+    1.82390916687909736289e3,
+    2.24633760818710981792e3,
+    1.65666309194161350182e3,
+    5.57535340817727675546e2,
+])
+_ERFC_R = np.array([
+    5.64189583547755073984e-1,
+    1.27536670759978104416e0,
+    5.01905042251180477414e0,
+    6.16021097993053585195e0,
+    7.40974269950448939160e0,
+    2.97886665372100240670e0,
+])
+_ERFC_S = np.array([
+    1.0,
+    2.26052863220117276590e0,
+    9.39603524938001434673e0,
+    1.20489539808096656605e1,
+    1.70814450747565897222e1,
+    9.60896809063285878198e0,
+    3.36907645100081516050e0,
+])
+
+
+def _erfc_array(a: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    x = np.abs(a)
+    z = x * x
+    with np.errstate(over="ignore", under="ignore", invalid="ignore"):
+        near = 1.0 - a * np.polyval(_ERF_T, z) / np.polyval(_ERF_U, z)
+        e = np.exp(-z)
+        tail = np.where(
+            x < 8.0,
+            e * np.polyval(_ERFC_P, x) / np.polyval(_ERFC_Q, x),
+            e * np.polyval(_ERFC_R, x) / np.polyval(_ERFC_S, x),
+        )
+    tail = np.where(a < 0.0, 2.0 - tail, tail)
+    return np.where(x < 1.0, near, tail)
+
+
+def _phi_array(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _N_array(x: np.ndarray) -> np.ndarray:
+    return 0.5 * _erfc_array(-np.asarray(x, dtype=float) / math.sqrt(2.0))
+
+
+def _side_mask(side, shape: tuple) -> np.ndarray:
+    """Return a boolean CALL mask broadcast to ``shape`` from a side string or array of sides."""
+    sides = np.char.upper(np.char.strip(np.asarray(side, dtype=str)))
+    bad = ~np.isin(sides, ("CALL", "PUT"))
+    if np.any(bad):
+        raise ValueError("side must be 'CALL' or 'PUT'")
+    return np.broadcast_to(sides == "CALL", shape)
+
+
+def _broadcast_inputs(*arrays) -> List[np.ndarray]:
+    return [np.array(a, dtype=float) for a in np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in arrays])]
+
+
 class D1D2Calculator:
     def compute(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> tuple[float, float]:
         if S <= 0 or K <= 0 or sigma <= 0 or T <= 0:
@@ -195,37 +482,151 @@ class D1D2Calculator:
         d2 = d1 - sigma * math.sqrt(T)
         return d1, d2
 
+    def compute_batch(self, S, K, r, q, sigma, T) -> tuple[np.ndarray, np.ndarray]:
+        S, K, r, q, sigma, T = _broadcast_inputs(S, K, r, q, sigma, T)
+        if np.any(S <= 0) or np.any(K <= 0) or np.any(sigma <= 0) or np.any(T <= 0):
+            raise ValueError("S, K, sigma, T must be positive.")
+        vol_sqrt_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
+        return d1, d2
+
+
+@dataclass(frozen=True)
+class BSTerms:
+    """
+    Black-Scholes intermediate terms for one contract, computed once and
+    shared by every pricer and Greek that needs them.
+    """
+
+    S: float
+    K: float
+    r: float
+    q: float
+    sigma: float
+    T: float
+    sqrt_T: float
+    d1: float
+    d2: float
+    disc_r: float
+    disc_q: float
+    Nd1: float
+    Nd2: float
+    N_minus_d1: float
+    N_minus_d2: float
+    nd1: float
+
+    @classmethod
+    def compute(
+        cls,
+        S: float,
+        K: float,
+        r: float,
+        q: float,
+        sigma: float,
+        T: float,
+        d1: Optional[float] = None,
+        d2: Optional[float] = None,
+    ) -> "BSTerms":
+        """Pass ``d1``/``d2`` when they are already known (e.g. from VariablesAssembler) to skip recomputing them."""
+        if d1 is None or d2 is None:
+            d1, d2 = D1D2Calculator().compute(S, K, r, q, sigma, T)
+        elif S <= 0 or K <= 0 or sigma <= 0 or T <= 0:
+            raise ValueError("S, K, sigma, T must be positive.")
+        return cls(
+            S=S,
+            K=K,
+            r=r,
+            q=q,
+            sigma=sigma,
+            T=T,
+            sqrt_T=math.sqrt(T),
+            d1=d1,
+            d2=d2,
+            disc_r=math.exp(-r * T),
+            disc_q=math.exp(-q * T),
+            Nd1=_N(d1),
+            Nd2=_N(d2),
+            N_minus_d1=_N(-d1),
+            N_minus_d2=_N(-d2),
+            nd1=_phi(d1),
+        )
+
+    def fair_value(self, side: str) -> float:
+        if side.upper() == "CALL":
+            return self.S * self.disc_q * self.Nd1 - self.K * self.disc_r * self.Nd2
+        return self.K * self.disc_r * self.N_minus_d2 - self.S * self.disc_q * self.N_minus_d1
+
 
 class GreeksCalculator:
     def compute(self, S: float, K: float, r: float, q: float, sigma: float, T: float, side: str) -> dict:
+        return self.from_terms(BSTerms.compute(S, K, r, q, sigma, T), side)
+
+    def from_terms(self, t: BSTerms, side: str, fair_value: Optional[float] = None) -> dict:
+        """Price and Greeks from precomputed terms; ``fair_value`` skips re-pricing when it is already known."""
         side_u = side.upper()
-        d1, d2 = D1D2Calculator().compute(S, K, r, q, sigma, T)
-        Nd1, Nd2 = _N(d1), _N(d2)
-        nd1 = _phi(d1)
-        disc_r = math.exp(-r * T)
-        disc_q = math.exp(-q * T)
+        S, K, r, q, sigma = t.S, t.K, t.r, t.q, t.sigma
+        fair = fair_value if fair_value is not None else t.fair_value(side_u)
 
         if side_u == "CALL":
-            fair = S * disc_q * Nd1 - K * disc_r * Nd2
-            delta = disc_q * Nd1
+            delta = t.disc_q * t.Nd1
             theta = (
-                -(S * disc_q * nd1 * sigma) / (2.0 * math.sqrt(T))
-                - r * K * disc_r * Nd2
-                + q * S * disc_q * Nd1
+                -(S * t.disc_q * t.nd1 * sigma) / (2.0 * t.sqrt_T)
+                - r * K * t.disc_r * t.Nd2
+                + q * S * t.disc_q * t.Nd1
             )
-            rho = K * T * disc_r * Nd2
+            rho = K * t.T * t.disc_r * t.Nd2
         else:
-            fair = K * disc_r * _N(-d2) - S * disc_q * _N(-d1)
-            delta = -disc_q * _N(-d1)
+            delta = -t.disc_q * t.N_minus_d1
             theta = (
-                -(S * disc_q * nd1 * sigma) / (2.0 * math.sqrt(T))
-                + r * K * disc_r * _N(-d2)
-                - q * S * disc_q * _N(-d1)
+                -(S * t.disc_q * t.nd1 * sigma) / (2.0 * t.sqrt_T)
+                + r * K * t.disc_r * t.N_minus_d2
+                - q * S * t.disc_q * t.N_minus_d1
             )
-            rho = -K * T * disc_r * _N(-d2)
+            rho = -K * t.T * t.disc_r * t.N_minus_d2
+
+        gamma = (t.disc_q * t.nd1) / (S * sigma * t.sqrt_T)
+        vega = S * t.disc_q * t.nd1 * t.sqrt_T
+
+        return {
+            "fair_value": fair,
+            "delta": delta,
+            "gamma": gamma,
+            "theta": theta,
+            "vega": vega,
+            "rho": rho,
+        }
 
-        gamma = (disc_q * nd1) / (S * sigma * math.sqrt(T))
-        vega = S * disc_q * nd1 * math.sqrt(T)
+    def compute_batch(self, S, K, r, q, sigma, T, side) -> dict:
+        """
+        Vectorized counterpart of ``compute``.
+
+        Every numeric argument may be a scalar or an array; they are broadcast
+        against each other. ``side`` is either a single "CALL"/"PUT" string or
+        an array of them. Returns the same keys as ``compute`` with ndarray values.
+        """
+        S, K, r, q, sigma, T = _broadcast_inputs(S, K, r, q, sigma, T)
+        is_call = _side_mask(side, S.shape)
+        d1, d2 = D1D2Calculator().compute_batch(S, K, r, q, sigma, T)
+
+        sqrt_t = np.sqrt(T)
+        disc_r = np.exp(-r * T)
+        disc_q = np.exp(-q * T)
+        nd1 = _phi_array(d1)
+        sign = np.where(is_call, 1.0, -1.0)
+        Nd1 = _N_array(sign * d1)
+        Nd2 = _N_array(sign * d2)
+
+        fair = sign * (S * disc_q * Nd1 - K * disc_r * Nd2)
+        delta = sign * disc_q * Nd1
+        theta = (
+            -(S * disc_q * nd1 * sigma) / (2.0 * sqrt_t)
+            - sign * r * K * disc_r * Nd2
+            + sign * q * S * disc_q * Nd1
+        )
+        rho = sign * K * T * disc_r * Nd2
+        gamma = (disc_q * nd1) / (S * sigma * sqrt_t)
+        vega = S * disc_q * nd1 * sqrt_t
 
         return {
             "fair_value": fair,
@@ -242,7 +643,18 @@ class BAWAmericanOptionCalculator:
         self.max_iterations = max_iterations
         self.tolerance = tolerance
 
-    def compute(self, S: float, K: float, r: float, q: float, sigma: float, T: float, side: str) -> dict:
+    def compute(
+        self,
+        S: float,
+        K: float,
+        r: float,
+        q: float,
+        sigma: float,
+        T: float,
+        side: str,
+        european_price: Optional[float] = None,
+    ) -> dict:
+        """``european_price`` may be passed in when the caller has already priced the European twin."""
         if S <= 0 or K <= 0 or sigma <= 0 or T <= 0:
             raise ValueError("S, K, sigma, T must be positive.")
 
@@ -250,9 +662,8 @@ class BAWAmericanOptionCalculator:
         if side_u not in ("CALL", "PUT"):
             raise ValueError("side must be 'CALL' or 'PUT'")
 
-        euro_calc = GreeksCalculator()
-        euro_result = euro_calc.compute(S, K, r, q, sigma, T, side_u)
-        european_price = euro_result["fair_value"]
+        if european_price is None:
+            european_price = BSTerms.compute(S, K, r, q, sigma, T).fair_value(side_u)
 
         if side_u == "CALL":
             if q <= 1e-10:
@@ -306,63 +717,158 @@ class BAWAmericanOptionCalculator:
             "critical_price": critical_price,
         }
 
+    def compute_batch(self, S, K, r, q, sigma, T, side) -> dict:
+        """
+        Vectorized counterpart of ``compute``.
+
+        Arguments broadcast like ``GreeksCalculator.compute_batch``. The
+        critical-price Newton iteration runs for every element at once and
+        converged elements drop out of the update. Elements where ``compute``
+        would report ``critical_price=None`` carry NaN instead.
+        """
+        S, K, r, q, sigma, T = _broadcast_inputs(S, K, r, q, sigma, T)
+        if np.any(S <= 0) or np.any(K <= 0) or np.any(sigma <= 0) or np.any(T <= 0):
+            raise ValueError("S, K, sigma, T must be positive.")
+        is_call = _side_mask(side, S.shape)
+
+        european = GreeksCalculator().compute_batch(S, K, r, q, sigma, T, side)["fair_value"]
+        phi = np.where(is_call, 1.0, -1.0)
+
+        no_div_call = is_call & (q <= 1e-10)
+        expiring = ~no_div_call & (T < 1e-10)
+        solve = ~(no_div_call | expiring)
+
+        american = european.copy()
+        critical = np.full(S.shape, np.nan)
+
+        if np.any(solve):
+            am_s, crit_s = self._baw_batch(
+                S[solve], K[solve], r[solve], q[solve], sigma[solve], T[solve], phi[solve], european[solve]
+            )
+            american[solve] = am_s
+            critical[solve] = crit_s
+
+        premium = american - european
+        bad = solve & ~(np.isfinite(american) & np.isfinite(premium))
+        negative = solve & ~bad & (premium < 0.0)
+        reset = bad | negative
+        american[reset] = european[reset]
+        premium[reset] = 0.0
+        critical[bad] = np.nan
+        with np.errstate(invalid="ignore"):
+            critical[~np.isfinite(critical) | (critical <= 0.0)] = np.nan
+
+        premium[no_div_call] = 0.0
+        intrinsic = np.maximum(phi * (S - K), 0.0)
+        american[expiring] = intrinsic[expiring]
+        premium[expiring] = intrinsic[expiring] - european[expiring]
+        critical[expiring] = K[expiring]
+
+        return {
+            "american_price": american,
+            "european_price": european,
+            "early_exercise_premium": premium,
+            "critical_price": critical,
+        }
+
+    def _baw_batch(self, S, K, r, q, sigma, T, phi, european) -> tuple[np.ndarray, np.ndarray]:
+        # phi is +1 for calls and -1 for puts; the call/put formulas of
+        # _baw_call/_baw_put collapse into one expression in terms of it.
+        sqrt_t = np.sqrt(T)
+        vol_sqrt_t = sigma * sqrt_t
+        disc_q = np.exp(-q * T)
+        disc_r = np.exp(-r * T)
+        M = 2.0 * r / (sigma * sigma)
+        N = 2.0 * (r - q) / (sigma * sigma)
+        K_factor = 1.0 - disc_r
+        q_i = 0.5 * (-(N - 1.0) + phi * np.sqrt((N - 1.0) * (N - 1.0) + 4.0 * M / K_factor))
+        drift = (r - q + 0.5 * sigma * sigma) * T
+
+        S_star = K + (K / (q_i - 1.0)) * (1.0 - disc_q * _N_array(phi * (drift / vol_sqrt_t)))
+
+        active = np.ones(S.shape, dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for _ in range(self.max_iterations):
+                idx = np.flatnonzero(active)
+                if idx.size == 0:
+                    break
+                x = S_star[idx]
+                p, qi, dq, vst = phi[idx], q_i[idx], disc_q[idx], vol_sqrt_t[idx]
+                d1 = (np.log(x / K[idx]) + drift[idx]) / vst
+                d2 = d1 - vst
+                euro_x = p * (x * dq * _N_array(p * d1) - K[idx] * disc_r[idx] * _N_array(p * d2))
+                exercise = 1.0 - dq * _N_array(p * d1)
+                diff = p * (x - K[idx]) - (euro_x + p * exercise * x / qi)
+                done = ~(np.abs(diff) >= self.tolerance)
+                d_diff = p * (exercise * (1.0 - 1.0 / qi) + dq * _phi_array(d1) / vst)
+                step = np.flatnonzero(~done)
+                S_star[idx[step]] = x[step] - diff[step] / d_diff[step]
+                active[idx[done]] = False
+
+            A = phi * (S_star / q_i) * (1.0 - disc_q * _N_array(phi * (np.log(S_star / K) + drift) / vol_sqrt_t))
+            hold = phi * (S_star - S) > 0.0
+            american = np.where(hold, european + A * (S / S_star) ** q_i, phi * (S - K))
+        return american, S_star
+
     def _baw_call(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> tuple[float, float]:
+        disc_q = math.exp(-q * T)
+        disc_r = math.exp(-r * T)
+        vol_sqrt_t = sigma * math.sqrt(T)
         M = 2.0 * r / (sigma * sigma)
         N = 2.0 * (r - q) / (sigma * sigma)
-        K_factor = 1.0 - math.exp(-r * T)
+        K_factor = 1.0 - disc_r
 
         q2 = 0.5 * (-(N - 1.0) + math.sqrt((N - 1.0) * (N - 1.0) + 4.0 * M / K_factor))
 
-        S_star_seed = K + (K / (q2 - 1.0)) * (1.0 - math.exp(-q * T) * _N(self._d1(K, K, r, q, sigma, T)))
+        S_star_seed = K + (K / (q2 - 1.0)) * (1.0 - disc_q * _N(self._d1(K, K, r, q, sigma, T)))
 
         S_star = S_star_seed
         for _ in range(self.max_iterations):
             d1 = self._d1(S_star, K, r, q, sigma, T)
+            Nd1 = _N(d1)
             LHS = S_star - K
-            RHS = self._european_call(S_star, K, r, q, sigma, T) + (1.0 - math.exp(-q * T) * _N(d1)) * S_star / q2
+            RHS = self._european_call(S_star, K, r, q, sigma, T, disc_r, disc_q) + (1.0 - disc_q * Nd1) * S_star / q2
             diff = LHS - RHS
             if abs(diff) < self.tolerance:
                 break
-            d_diff = (
-                (1.0 - math.exp(-q * T) * _N(d1)) * (1.0 - 1.0 / q2)
-                + math.exp(-q * T) * _phi(d1) / (sigma * math.sqrt(T))
-            )
+            d_diff = (1.0 - disc_q * Nd1) * (1.0 - 1.0 / q2) + disc_q * _phi(d1) / vol_sqrt_t
             S_star = S_star - diff / d_diff
 
         if S < S_star:
-            A2 = (S_star / q2) * (1.0 - math.exp(-q * T) * _N(self._d1(S_star, K, r, q, sigma, T)))
-            american_call = self._european_call(S, K, r, q, sigma, T) + A2 * (S / S_star) ** q2
+            A2 = (S_star / q2) * (1.0 - disc_q * _N(self._d1(S_star, K, r, q, sigma, T)))
+            american_call = self._european_call(S, K, r, q, sigma, T, disc_r, disc_q) + A2 * (S / S_star) ** q2
         else:
             american_call = S - K
 
         return american_call, S_star
 
     def _baw_put(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> tuple[float, float]:
+        disc_q = math.exp(-q * T)
+        disc_r = math.exp(-r * T)
+        vol_sqrt_t = sigma * math.sqrt(T)
         M = 2.0 * r / (sigma * sigma)
         N = 2.0 * (r - q) / (sigma * sigma)
-        K_factor = 1.0 - math.exp(-r * T)
+        K_factor = 1.0 - disc_r
 
         q1 = 0.5 * (-(N - 1.0) - math.sqrt((N - 1.0) * (N - 1.0) + 4.0 * M / K_factor))
 
-        S_star_seed = K - (K / (1.0 - q1)) * (1.0 - math.exp(-q * T) * _N(-self._d1(K, K, r, q, sigma, T)))
+        S_star_seed = K - (K / (1.0 - q1)) * (1.0 - disc_q * _N(-self._d1(K, K, r, q, sigma, T)))
 
         S_star = S_star_seed
         for _ in range(self.max_iterations):
             d1 = self._d1(S_star, K, r, q, sigma, T)
+            N_minus_d1 = _N(-d1)
             LHS = K - S_star
-            RHS = self._european_put(S_star, K, r, q, sigma, T) - (1.0 - math.exp(-q * T) * _N(-d1)) * S_star / q1
+            RHS = self._european_put(S_star, K, r, q, sigma, T, disc_r, disc_q) - (1.0 - disc_q * N_minus_d1) * S_star / q1
             diff = LHS - RHS
             if abs(diff) < self.tolerance:
                 break
-            d_diff = (
-                -(1.0 - math.exp(-q * T) * _N(-d1)) * (1.0 - 1.0 / q1)
-                - math.exp(-q * T) * _phi(d1) / (sigma * math.sqrt(T))
-            )
+            d_diff = -(1.0 - disc_q * N_minus_d1) * (1.0 - 1.0 / q1) - disc_q * _phi(d1) / vol_sqrt_t
             S_star = S_star - diff / d_diff
 
         if S > S_star:
-            A1 = -(S_star / q1) * (1.0 - math.exp(-q * T) * _N(-self._d1(S_star, K, r, q, sigma, T)))
-            american_put = self._european_put(S, K, r, q, sigma, T) + A1 * (S / S_star) ** q1
+            A1 = -(S_star / q1) * (1.0 - disc_q * _N(-self._d1(S_star, K, r, q, sigma, T)))
+            american_put = self._european_put(S, K, r, q, sigma, T, disc_r, disc_q) + A1 * (S / S_star) ** q1
         else:
             american_put = K - S
 
@@ -371,18 +877,459 @@ class BAWAmericanOptionCalculator:
     def _d1(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> float:
         return (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * math.sqrt(T))
 
-    def _european_call(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> float:
+    def _european_call(
+        self, S: float, K: float, r: float, q: float, sigma: float, T: float, disc_r: float, disc_q: float
+    ) -> float:
         d1 = self._d1(S, K, r, q, sigma, T)
         d2 = d1 - sigma * math.sqrt(T)
-        return S * math.exp(-q * T) * _N(d1) - K * math.exp(-r * T) * _N(d2)
+        return S * disc_q * _N(d1) - K * disc_r * _N(d2)
 
-    def _european_put(self, S: float, K: float, r: float, q: float, sigma: float, T: float) -> float:
+    def _european_put(
+        self, S: float, K: float, r: float, q: float, sigma: float, T: float, disc_r: float, disc_q: float
+    ) -> float:
         d1 = self._d1(S, K, r, q, sigma, T)
         d2 = d1 - sigma * math.sqrt(T)
-        return K * math.exp(-r * T) * _N(-d2) - S * math.exp(-q * T) * _N(-d1)
+        return K * disc_r * _N(-d2) - S * disc_q * _N(-d1)
+
+
+class BinomialTreeAmericanOptionCalculator:
+    """
+    American pricer on a recombining binomial tree; a drop-in alternative to
+    ``BAWAmericanOptionCalculator`` (same ``compute`` signature and result).
+
+    ``method`` is "LR" (Leisen-Reimer, the default; step counts are rounded up
+    to odd) or "CRR" (Cox-Ross-Rubinstein). Each backward-induction step is one
+    NumPy slice operation over the whole layer. With ``richardson=True`` the
+    tree is run at ``steps`` and about ``2 * steps`` and the two prices are
+    extrapolated assuming an O(1/n) error. That suits LR, whose convergence
+    is smooth; CRR oscillates between odd and even step counts, so
+    extrapolating it is not recommended.
+
+    ``critical_price`` is not reported (always None).
+    """
+
+    METHODS = ("LR", "CRR")
+
+    def __init__(self, steps: int = 201, method: str = "LR", richardson: bool = True):
+        method_u = method.upper()
+        if method_u not in self.METHODS:
+            raise ValueError(f"method must be one of {', '.join(self.METHODS)}")
+        if steps < 1:
+            raise ValueError("steps must be positive")
+        self.steps = int(steps)
+        self.method = method_u
+        self.richardson = richardson
+
+    def compute(
+        self,
+        S: float,
+        K: float,
+        r: float,
+        q: float,
+        sigma: float,
+        T: float,
+        side: str,
+        european_price: Optional[float] = None,
+    ) -> dict:
+        """``european_price`` may be passed in when the caller has already priced the European twin."""
+        if S <= 0 or K <= 0 or sigma <= 0 or T <= 0:
+            raise ValueError("S, K, sigma, T must be positive.")
+
+        side_u = side.upper()
+        if side_u not in ("CALL", "PUT"):
+            raise ValueError("side must be 'CALL' or 'PUT'")
+
+        if european_price is None:
+            european_price = BSTerms.compute(S, K, r, q, sigma, T).fair_value(side_u)
+
+        if side_u == "CALL" and q <= 1e-10:
+            american_price = european_price
+        else:
+            american_price = self.tree_price(S, K, r, q, sigma, T, side_u)
+
+        early_exercise_premium = american_price - european_price
+        if early_exercise_premium < 0.0:
+            american_price = european_price
+            early_exercise_premium = 0.0
+
+        return {
+            "american_price": american_price,
+            "european_price": european_price,
+            "early_exercise_premium": early_exercise_premium,
+            "critical_price": None,
+        }
+
+    def tree_price(self, S: float, K: float, r: float, q: float, sigma: float, T: float, side: str) -> float:
+        """American price from the tree alone (with extrapolation when enabled)."""
+        n1 = self._steps(self.steps)
+        coarse = self._induct(S, K, r, q, sigma, T, side, n1)
+        if not self.richardson:
+            return coarse
+        n2 = self._steps(2 * n1)
+        fine = self._induct(S, K, r, q, sigma, T, side, n2)
+        return (n2 * fine - n1 * coarse) / (n2 - n1)
+
+    def _steps(self, n: int) -> int:
+        return n + 1 if self.method == "LR" and n % 2 == 0 else n
+
+    def _lattice(self, S: float, K: float, r: float, q: float, sigma: float, T: float, n: int) -> tuple[float, float, float]:
+        dt = T / n
+        growth = math.exp((r - q) * dt)
+        if self.method == "CRR":
+            u = math.exp(sigma * math.sqrt(dt))
+            d = 1.0 / u
+            p = (growth - d) / (u - d)
+        else:
+            d1 = (math.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * math.sqrt(T))
+            d2 = d1 - sigma * math.sqrt(T)
+            p = _peizer_pratt(d2, n)
+            u = growth * _peizer_pratt(d1, n) / p
+            d = (growth - p * u) / (1.0 - p)
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"{n} tree steps are too few for these inputs; increase steps.")
+        return u, d, p
+
+    def _induct(self, S: float, K: float, r: float, q: float, sigma: float, T: float, side: str, n: int) -> float:
+        u, d, p = self._lattice(S, K, r, q, sigma, T, n)
+        disc = math.exp(-r * T / n)
+        p_up, p_down = disc * p, disc * (1.0 - p)
+        sign = 1.0 if side == "CALL" else -1.0
+
+        # Node j of layer i is S * u**(i - j) * d**j, so the spots of layer
+        # i - 1 are the first i entries of layer i divided by u.
+        j = np.arange(n + 1, dtype=float)
+        spots = S * u ** (n - j) * d ** j
+        values = np.maximum(sign * (spots - K), 0.0)
+        down = np.empty(n)
+        for i in range(n, 0, -1):
+            np.multiply(values[1 : i + 1], p_down, out=down[:i])
+            values[:i] *= p_up
+            values[:i] += down[:i]
+            spots[:i] /= u
+            np.subtract(spots[:i], K, out=down[:i])
+            down[:i] *= sign
+            np.maximum(values[:i], down[:i], out=values[:i])
+        return float(values[0])
+
+
+def _peizer_pratt(z: float, n: int) -> float:
+    """Peizer-Pratt method 2 inversion used by the Leisen-Reimer tree."""
+    x = z / (n + 1.0 / 3.0 + 0.1 / (n + 1.0))
+    return 0.5 + math.copysign(0.5, z) * math.sqrt(1.0 - math.exp(-x * x * (n + 1.0 / 6.0)))
+
+
+@dataclass(frozen=True)
+class FDSolution:
+    """
+    Value grid from one finite-difference solve.
+
+    ``values[k]`` holds option values at every node of ``spots`` for time to
+    expiry ``taus[k]``; ``theta[k]`` is the calendar-time derivative taken
+    from the time step that ended on that layer. Delta and gamma come from
+    central differences in log-spot on the same layer, so a single solve
+    answers every spot and every stored expiry without repricing.
+    """
+
+    spots: np.ndarray
+    taus: np.ndarray
+    values: np.ndarray
+    theta: np.ndarray
+    payoff: np.ndarray
+
+    def delta(self) -> np.ndarray:
+        return self._dv_dx() / self.spots
+
+    def gamma(self) -> np.ndarray:
+        dx = math.log(self.spots[1] / self.spots[0])
+        v = self.values
+        d2v = np.full(v.shape, np.nan)
+        d2v[:, 1:-1] = (v[:, 2:] - 2.0 * v[:, 1:-1] + v[:, :-2]) / (dx * dx)
+        return (d2v - self._dv_dx()) / (self.spots * self.spots)
+
+    def _dv_dx(self) -> np.ndarray:
+        dx = math.log(self.spots[1] / self.spots[0])
+        dv = np.full(self.values.shape, np.nan)
+        dv[:, 1:-1] = (self.values[:, 2:] - self.values[:, :-2]) / (2.0 * dx)
+        return dv
+
+    def on(self, S) -> Dict[str, np.ndarray]:
+        """
+        Fair value and Greeks at spots ``S`` on every stored layer, shaped
+        (layers, len(S)) and interpolated linearly in log-spot.
+        """
+        x = np.log(np.atleast_1d(np.asarray(S, dtype=float)))
+        grid = np.log(self.spots)
+        return {
+            key: np.array([np.interp(x, grid, row) for row in arr])
+            for key, arr in (
+                ("fair_value", self.values),
+                ("delta", self.delta()),
+                ("gamma", self.gamma()),
+                ("theta", self.theta),
+            )
+        }
+
+    def critical_price(self, layer: int = -1) -> Optional[float]:
+        """Grid spot nearest the early-exercise boundary on ``layer``, or None if nothing is exercised."""
+        exercised = (self.payoff > 0.0) & (self.values[layer] <= self.payoff + 1e-10)
+        exercised[[0, -1]] = False
+        idx = np.flatnonzero(exercised)
+        if idx.size == 0:
+            return None
+        # Puts are exercised below the boundary, calls above it.
+        put = self.payoff[0] > self.payoff[-1]
+        return float(self.spots[idx[-1]] if put else self.spots[idx[0]])
+
+
+class CrankNicolsonAmericanOptionCalculator:
+    """
+    American pricer solving the Black-Scholes PDE on a uniform log-spot grid;
+    an alternative to ``BAWAmericanOptionCalculator`` with the same
+    ``compute`` signature. Its result also carries delta, gamma and theta
+    read off the solved grid.
+
+    Time stepping is Crank-Nicolson after two fully implicit half steps
+    (Rannacher start-up, which keeps gamma smooth near the strike). The
+    early-exercise constraint is applied with the Brennan-Schwartz
+    algorithm: each step is a single tridiagonal solve whose back
+    substitution starts inside the exercise region and projects onto the
+    payoff as it goes. That is exact for vanilla puts and calls, so no
+    PSOR iteration is needed. The grid spans ``width`` standard deviations
+    of log-spot either side of the spot.
+    """
+
+    def __init__(self, space_steps: int = 200, time_steps: int = 100, width: float = 5.0):
+        if space_steps < 4 or time_steps < 2 or width <= 0:
+            raise ValueError("space_steps >= 4, time_steps >= 2 and width > 0 are required")
+        self.space_steps = int(space_steps) + int(space_steps) % 2
+        self.time_steps = int(time_steps)
+        self.width = float(width)
+
+    def compute(
+        self,
+        S: float,
+        K: float,
+        r: float,
+        q: float,
+        sigma: float,
+        T: float,
+        side: str,
+        european_price: Optional[float] = None,
+    ) -> dict:
+        """``european_price`` may be passed in when the caller has already priced the European twin."""
+        solution = self.solve(S, K, r, q, sigma, T, side)
+        if european_price is None:
+            european_price = BSTerms.compute(S, K, r, q, sigma, T).fair_value(side.upper())
+
+        # The grid is centred on S, so its middle node is the spot itself.
+        mid = self.space_steps // 2
+        american_price = float(solution.values[-1, mid])
+        early_exercise_premium = american_price - european_price
+        if early_exercise_premium < 0.0:
+            american_price = european_price
+            early_exercise_premium = 0.0
+
+        return {
+            "american_price": american_price,
+            "european_price": european_price,
+            "early_exercise_premium": early_exercise_premium,
+            "critical_price": solution.critical_price(),
+            "delta": float(solution.delta()[-1, mid]),
+            "gamma": float(solution.gamma()[-1, mid]),
+            "theta": float(solution.theta[-1, mid]),
+        }
+
+    def solve(
+        self,
+        S: float,
+        K: float,
+        r: float,
+        q: float,
+        sigma: float,
+        T: float,
+        side: str,
+        layers: int = 1,
+        cover: Optional[tuple] = None,
+    ) -> FDSolution:
+        """
+        Solve backwards from expiry to ``T`` and keep ``layers`` evenly spaced
+        time-to-expiry layers (the last one at ``T``). Since the coefficients
+        do not depend on time, layer k is also the solution for an option
+        expiring in ``taus[k]``. ``cover=(lo, hi)`` widens the grid to include
+        those spots.
+        """
+        if S <= 0 or K <= 0 or sigma <= 0 or T <= 0:
+            raise ValueError("S, K, sigma, T must be positive.")
+        side_u = side.upper()
+        if side_u not in ("CALL", "PUT"):
+            raise ValueError("side must be 'CALL' or 'PUT'")
+        if layers < 1:
+            raise ValueError("layers must be positive")
+
+        M = self.space_steps
+        half_width = self.width * sigma * math.sqrt(T)
+        if cover is not None:
+            lo, hi = cover
+            if lo <= 0 or hi <= 0:
+                raise ValueError("cover must be positive spots")
+            half_width = max(half_width, 1.1 * abs(math.log(S / lo)), 1.1 * abs(math.log(hi / S)))
+        dx = 2.0 * half_width / M
+        spots = S * np.exp((np.arange(M + 1) - M // 2) * dx)
+
+        per_layer = -(-self.time_steps // layers)
+        n_steps = per_layer * layers
+        dt = T / n_steps
+
+        sign = 1.0 if side_u == "CALL" else -1.0
+        payoff = np.maximum(sign * (spots - K), 0.0)
+
+        # L V = a V_xx + b V_x - r V with central differences.
+        a = 0.5 * sigma * sigma
+        b = r - q - a
+        lo_c = a / (dx * dx) - b / (2.0 * dx)
+        mid_c = -2.0 * a / (dx * dx) - r
+        up_c = a / (dx * dx) + b / (2.0 * dx)
+
+        def edges(tau: float) -> tuple[float, float]:
+            s_lo, s_hi = spots[0], spots[-1]
+            if sign > 0:
+                return 0.0, max(s_hi * math.exp(-q * tau) - K * math.exp(-r * tau), s_hi - K)
+            return max(K * math.exp(-r * tau) - s_lo * math.exp(-q * tau), K - s_lo), 0.0
+
+        # One factorization per (theta, step size): the Rannacher half steps
+        # and the Crank-Nicolson steps.
+        solvers: Dict[tuple, _BrennanSchwartz] = {}
+
+        def step(v: np.ndarray, tau: float, h: float, theta_w: float) -> np.ndarray:
+            explicit = (1.0 - theta_w) * h
+            rhs = v[1:-1] + explicit * (lo_c * v[:-2] + mid_c * v[1:-1] + up_c * v[2:])
+            v_lo, v_hi = edges(tau + h)
+            rhs[0] += theta_w * h * lo_c * v_lo
+            rhs[-1] += theta_w * h * up_c * v_hi
+            solver = solvers.get((theta_w, h))
+            if solver is None:
+                sub, diag, sup = -theta_w * h * lo_c, 1.0 - theta_w * h * mid_c, -theta_w * h * up_c
+                # Put exercise happens at low spots: factor the reversed grid
+                # so back substitution still starts inside the exercise region.
+                solver = _BrennanSchwartz(sub, diag, sup, M - 1) if sign > 0 else _BrennanSchwartz(sup, diag, sub, M - 1)
+                solvers[(theta_w, h)] = solver
+            out = np.empty_like(v)
+            out[0], out[-1] = v_lo, v_hi
+            if sign > 0:
+                out[1:-1] = solver.solve(rhs, payoff[1:-1])
+            else:
+                out[1:-1] = solver.solve(rhs[::-1], payoff[-2:0:-1])[::-1]
+            return out
+
+        values = np.empty((layers, M + 1))
+        theta = np.empty((layers, M + 1))
+        v = payoff.copy()
+        tau = 0.0
+        for n in range(n_steps):
+            prev = v
+            if n == 0:
+                v = step(v, tau, 0.5 * dt, 1.0)
+                v = step(v, tau + 0.5 * dt, 0.5 * dt, 1.0)
+            else:
+                v = step(v, tau, dt, 0.5)
+            tau += dt
+            if (n + 1) % per_layer == 0:
+                k = (n + 1) // per_layer - 1
+                values[k] = v
+                theta[k] = -(v - prev) / dt
+
+        taus = T * np.arange(1, layers + 1) / layers
+        return FDSolution(spots=spots, taus=taus, values=values, theta=theta, payoff=payoff)
+
+
+class _BrennanSchwartz:
+    """
+    Projected solver for the constant-coefficient tridiagonal system
+    ``sub*x[i-1] + diag*x[i] + sup*x[i+1] = rhs[i]`` subject to
+    ``x >= payoff``, for an exercise region at the high-index end.
+
+    The Thomas pivots and ``c'`` coefficients depend only on the matrix, so
+    they are computed once per grid. The forward sweep is linear in ``rhs``
+    and is applied as one banded NumPy product, truncated where its weights
+    fall below rounding. Only the back substitution, whose projection onto the payoff
+    is sequential, remains a scalar loop.
+    """
+
+    def __init__(self, sub: float, diag: float, sup: float, n: int):
+        pivots = np.empty(n)
+        c = np.empty(n)
+        c_prev = 0.0
+        for i in range(n):
+            pivots[i] = diag - sub * c_prev
+            c_prev = sup / pivots[i]
+            c[i] = c_prev
+        self.c = c.tolist()
+
+        # d[i] = (rhs[i] - sub*d[i-1]) / pivots[i], unrolled into weights.
+        ratio = -sub / pivots
+        weights = [1.0 / pivots]
+        cutoff = np.finfo(float).eps * 1e-2 * float(np.abs(weights[0]).max())
+        for k in range(1, n):
+            w = np.zeros(n)
+            w[k:] = weights[-1][k - 1:-1] * ratio[k:]
+            if float(np.abs(w).max()) <= cutoff:
+                break
+            weights.append(w)
+        # Column j of row i weights rhs[i - (band - 1 - j)], matching a
+        # sliding window over rhs padded with band - 1 leading zeros.
+        self.band = len(weights)
+        self.weights = np.ascontiguousarray(np.array(weights[::-1]).T)
+
+    def solve(self, rhs: np.ndarray, payoff: np.ndarray) -> np.ndarray:
+        padded = np.concatenate([np.zeros(self.band - 1), rhs])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.band)
+        d = np.einsum("ij,ij->i", self.weights, windows)
+        c_l, d_l, pay_l = self.c, d.tolist(), payoff.tolist()
+        n = len(d_l)
+        x = [0.0] * n
+        nxt = 0.0
+        for i in range(n - 1, -1, -1):
+            nxt = max(d_l[i] - c_l[i] * nxt, pay_l[i])
+            x[i] = nxt
+        return np.array(x)
+
+
+AMERICAN_ENGINES: Dict[str, Callable[[], object]] = {
+    "baw": BAWAmericanOptionCalculator,
+    "lr": lambda: BinomialTreeAmericanOptionCalculator(method="LR"),
+    "crr": lambda: BinomialTreeAmericanOptionCalculator(method="CRR", steps=1000, richardson=False),
+    "cn": CrankNicolsonAmericanOptionCalculator,
+    "lsm": lambda: _monte_carlo_engine(),
+}
+
+
+def _monte_carlo_engine():
+    # Imported here: eurocalc.monte_carlo depends on this module.
+    from .monte_carlo import LongstaffSchwartzCalculator
+
+    return LongstaffSchwartzCalculator()
+
+
+def american_calculator(engine: str = "baw"):
+    """American pricer registered under ``engine`` (see AMERICAN_ENGINES)."""
+    name = (engine or "baw").strip().lower()
+    if name not in AMERICAN_ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(AMERICAN_ENGINES)}")
+    return AMERICAN_ENGINES[name]()
 
 
 class VariablesAssembler:
+    """
+    Gathers the pricing inputs for one contract.
+
+    With ``concurrent=True`` the spot, rate, dividend yield and (historical)
+    volatility lookups run in parallel under one deadline (``deadline_s``,
+    default FB_ASSEMBLY_DEADLINE_S), so a request waits for the slowest
+    upstream call instead of their sum; an implied vol solve runs afterwards
+    since it needs the other inputs. Either way the result carries per-input
+    wall times in ``timings_ms``.
+    """
+
     def __init__(
         self,
         spot_calc: SpotPriceCalculator,
@@ -390,12 +1337,38 @@ class VariablesAssembler:
         div_calc,
         vol_calc,
         T_calc: YearFractionCalculator,
+        concurrent: bool = False,
+        deadline_s: Optional[float] = None,
     ):
         self.spot_calc = spot_calc
         self.rate_calc = rate_calc
         self.div_calc = div_calc
         self.vol_calc = vol_calc
         self.T_calc = T_calc
+        self.concurrent = concurrent
+        self.deadline_s = float(deadline_s if deadline_s is not None else os.getenv("FB_ASSEMBLY_DEADLINE_S", "10"))
+
+    def _gather(self, calls: Dict[str, Callable[[], float]], timings: Dict[str, float]) -> Dict[str, float]:
+        def timed(name: str, fn: Callable[[], float]) -> Callable[[], float]:
+            def run() -> float:
+                t0 = time.perf_counter()
+                try:
+                    return fn()
+                finally:
+                    timings[name] = round((time.perf_counter() - t0) * 1000.0, 3)
+            return run
+
+        if not self.concurrent:
+            return {name: timed(name, fn)() for name, fn in calls.items()}
+
+        results, errors = run_calls({name: timed(name, fn) for name, fn in calls.items()}, self.deadline_s)
+        timed_out = [name for name in calls if isinstance(errors.get(name), TimeoutError)]
+        if timed_out:
+            raise RuntimeError(f"Timed out after {self.deadline_s}s waiting for: {', '.join(timed_out)}")
+        for name in calls:
+            if name in errors:
+                raise errors[name]
+        return results
 
     def build(
         self,
@@ -411,14 +1384,24 @@ class VariablesAssembler:
         if side_u not in ("CALL", "PUT"):
             raise ValueError("side must be 'CALL' or 'PUT'")
         as_of_eff = as_of or date.today()
+        implied = isinstance(self.vol_calc, (ImpliedVolatilityCalculator, BatchImpliedVolatilityCalculator))
+        if implied and market_option_price is None:
+            raise ValueError("market_option_price is required for implied volatility")
+
+        t_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        calls: Dict[str, Callable[[], float]] = {
+            "spot": lambda: self.spot_calc.compute(symbol),
+            "rate": lambda: self.rate_calc.compute(as_of_eff, expiry),
+            "dividend_yield": lambda: self.div_calc.compute(symbol, as_of_eff, expiry),
+        }
+        if not implied:
+            calls["volatility"] = lambda: self.vol_calc.compute(symbol, as_of_eff, expiry)
+        values = self._gather(calls, timings)
+        S, r, q = values["spot"], values["rate"], values["dividend_yield"]
 
-        S = self.spot_calc.compute(symbol)
-        r = self.rate_calc.compute(as_of_eff, expiry)
-        q = self.div_calc.compute(symbol, as_of_eff, expiry)
-
-        if isinstance(self.vol_calc, ImpliedVolatilityCalculator):
-            if market_option_price is None:
-                raise ValueError("market_option_price is required for implied volatility")
+        if implied:
+            t0 = time.perf_counter()
             sigma = self.vol_calc.compute(
                 market_price=float(market_option_price),
                 symbol=symbol,
@@ -430,11 +1413,13 @@ class VariablesAssembler:
                 rate=r,
                 dividend_yield=q,
             )
+            timings["volatility"] = round((time.perf_counter() - t0) * 1000.0, 3)
         else:
-            sigma = self.vol_calc.compute(symbol, as_of_eff, expiry)
+            sigma = values["volatility"]
 
         T = self.T_calc.compute(as_of_eff, expiry)
         d1, d2 = D1D2Calculator().compute(S, float(strike), r, q, sigma, T)
+        timings["total"] = round((time.perf_counter() - t_start) * 1000.0, 3)
 
         return {
             "S": S,
@@ -449,4 +1434,56 @@ class VariablesAssembler:
             "symbol": symbol,
             "as_of": as_of_eff,
             "expiry": expiry,
+            "timings_ms": dict(timings),
+        }
+
+    def build_chain(
+        self,
+        *,
+        symbol: str,
+        sides: List[str],
+        strikes: List[float],
+        expiries: List[date],
+        as_of: Optional[date] = None,
+    ) -> dict:
+        """
+        Assemble inputs for a whole strike x expiry grid.
+
+        Spot, dividend yield and volatility are fetched once for the symbol;
+        rate and year fraction are evaluated per expiry. The grid is laid out
+        expiry-major, then side, then strike, as flat arrays ready for the
+        ``compute_batch`` pricers.
+        """
+        if isinstance(self.vol_calc, (ImpliedVolatilityCalculator, BatchImpliedVolatilityCalculator)):
+            raise ValueError("implied volatility is not supported for chain pricing")
+        sides_u = [s.upper() for s in sides]
+        if not sides_u or any(s not in ("CALL", "PUT") for s in sides_u):
+            raise ValueError("side must be 'CALL' or 'PUT'")
+        if not strikes or not expiries:
+            raise ValueError("at least one strike and one expiry are required")
+        as_of_eff = as_of or date.today()
+
+        S = self.spot_calc.compute(symbol)
+        q = self.div_calc.compute(symbol, as_of_eff, max(expiries))
+        sigma = self.vol_calc.compute(symbol, as_of_eff, max(expiries))
+
+        n_strikes = len(strikes)
+        per_expiry = len(sides_u) * n_strikes
+        r = np.repeat([self.rate_calc.compute(as_of_eff, e) for e in expiries], per_expiry)
+        T = np.repeat([self.T_calc.compute(as_of_eff, e) for e in expiries], per_expiry)
+        K = np.tile(np.asarray(strikes, dtype=float), len(sides_u) * len(expiries))
+        side_arr = np.tile(np.repeat(sides_u, n_strikes), len(expiries))
+        expiry_arr = [e for e in expiries for _ in range(per_expiry)]
+
+        return {
+            "S": S,
+            "q": q,
+            "sigma": sigma,
+            "symbol": symbol,
+            "as_of": as_of_eff,
+            "K": K,
+            "r": r,
+            "T": T,
+            "side": side_arr,
+            "expiry": expiry_arr,
         }
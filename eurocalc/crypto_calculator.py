@@ -3,12 +3,13 @@ from typing import Optional, List
 from datetime import date
 import math
 
-from .data_sources import MarketDataSource, CombinedDataSource
+from .data_sources import MarketDataSource
+from .registry import get_market_data_source
 
 
 class CryptoSpotCalculator:
     def __init__(self, data_source: Optional[MarketDataSource] = None):
-        self.ds = data_source or CombinedDataSource()
+        self.ds = data_source or get_market_data_source()
 
     def compute(self, symbol: str) -> float:
         return float(self.ds.get_crypto_spot(symbol))
@@ -22,7 +23,7 @@ class CryptoVolatilityCalculator:
         floor: float = 0.10,
         cap: float = 3.0,
     ):
-        self.ds = data_source or CombinedDataSource()
+        self.ds = data_source or get_market_data_source()
         self.lookback = lookback_days
         self.floor = floor
         self.cap = cap
@@ -2,29 +2,175 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, date
-from typing import List, Optional, Any, Dict
+from typing import Callable, Iterable, List, Optional, Any, Dict, Tuple
 
 import os
 import math
-import requests
+import threading
+import time
 import numpy as np
 import pandas as pd
 import yfinance as yf
 from alpha_vantage.timeseries import TimeSeries
 
+from .fanout import fan_out, hedged
+from .http_client import http_get
+from .provider_health import (
+    ProviderHealth,
+    ProviderUnavailableError,
+    SymbolError,
+    UpstreamHTTPError,
+    get_provider_health,
+)
+
+
+def normalize_symbols(symbols: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    seen = set()
+    for raw in symbols:
+        sym = (raw or "").strip().upper()
+        if sym and sym not in seen:
+            seen.add(sym)
+            out.append(sym)
+    return out
+
 
 class MarketDataSource(ABC):
     @abstractmethod
     def get_spot(self, symbol: str) -> float:
         raise NotImplementedError
 
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        """
+        Spot prices for several symbols at once, keyed by upper-cased symbol.
+
+        Symbols that could not be priced, or were still in flight when
+        ``deadline_s`` ran out, are left out of the result. Sources with a
+        multi-symbol endpoint override this; the default fans the per-symbol
+        ``get_spot`` calls out over the shared bounded pool.
+        """
+        results, _errors = fan_out(self.get_spot, normalize_symbols(symbols), deadline_s)
+        return {sym: float(px) for sym, px in results.items()}
+
     def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
         raise NotImplementedError
 
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        """Return (session date, close) pairs from ``start`` onwards, oldest first."""
+        raise NotImplementedError
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        """(ex-date, cash per share) for dividends over roughly the last 13 months, oldest first."""
+        raise NotImplementedError
+
     def get_dividend_yield(self, symbol: str) -> Optional[float]:
         return None
 
 
+def trailing_dividend_yield(
+    dividends: Iterable[Tuple[date, float]], price: float, today: Optional[date] = None
+) -> float:
+    """Cash paid per share over the 365 days to ``today``, divided by ``price``."""
+    if price <= 0:
+        return 0.0
+    today = today or date.today()
+    cutoff = today - timedelta(days=365)
+    total_cash = sum(amt for ex_dt, amt in dividends if cutoff <= ex_dt <= today and amt > 0)
+    if total_cash <= 0:
+        return 0.0
+    return float(total_cash) / float(price)
+
+
+def cash_dividends(payload: Dict[str, Any], sym: str) -> List[Tuple[date, float]]:
+    """(ex-date, amount) pairs from an Alpaca /v1/corporate-actions payload, oldest first."""
+    actions: List[Dict[str, Any]] = []
+    ca = payload.get("corporate_actions")
+    if isinstance(ca, dict):
+        raw = ca.get(sym)
+        if isinstance(raw, list):
+            actions = [a for a in raw if isinstance(a, dict)]
+    elif isinstance(ca, list):
+        actions = [a for a in ca if isinstance(a, dict)]
+    else:
+        data = payload.get("data")
+        if isinstance(data, list):
+            actions = [a for a in data if isinstance(a, dict)]
+
+    out: List[Tuple[date, float]] = []
+    for a in actions:
+        ex_str = a.get("ex_date") or a.get("exDate") or a.get("effective_date") or a.get("effectiveDate")
+        if not isinstance(ex_str, str) or not ex_str:
+            continue
+        try:
+            ex_dt = date.fromisoformat(ex_str[:10])
+        except Exception:
+            continue
+
+        amt = None
+        for k in ("cash", "per_share_amount", "rate", "amount", "cash_amount", "net_amount"):
+            v = a.get(k)
+            if v is None:
+                continue
+            try:
+                amt = float(v)
+                break
+            except Exception:
+                continue
+
+        if amt is not None and amt > 0:
+            out.append((ex_dt, amt))
+    return sorted(out)
+
+
+def latest_trade_prices(payload: Dict[str, Any], syms: List[str]) -> Dict[str, float]:
+    """Prices from an Alpaca /v2/stocks/trades/latest payload."""
+    out: Dict[str, float] = {}
+    trades = payload.get("trades")
+    if isinstance(trades, dict):
+        for sym in syms:
+            trade = trades.get(sym)
+            if isinstance(trade, dict):
+                price = trade.get("p")
+                if price is None:
+                    price = trade.get("price")
+                if price is not None:
+                    out[sym] = float(price)
+    return out
+
+
+def latest_quote_prices(payload: Dict[str, Any], syms: List[str]) -> Dict[str, float]:
+    """Mid (or one-sided) prices from an Alpaca /v2/stocks/quotes/latest payload."""
+    out: Dict[str, float] = {}
+    quotes = payload.get("quotes")
+    if isinstance(quotes, dict):
+        for sym in syms:
+            quote = quotes.get(sym)
+            if not isinstance(quote, dict):
+                continue
+            bid = quote.get("bp") if quote.get("bp") is not None else quote.get("bid_price")
+            ask = quote.get("ap") if quote.get("ap") is not None else quote.get("ask_price")
+            if bid is not None and ask is not None:
+                out[sym] = (float(bid) + float(ask)) / 2.0
+            elif ask is not None:
+                out[sym] = float(ask)
+            elif bid is not None:
+                out[sym] = float(bid)
+    return out
+
+
+def snapshot_price(payload: Dict[str, Any]) -> Optional[Any]:
+    """Latest trade, else today's close, from an Alpaca /v2/stocks/{sym}/snapshot payload."""
+    price = None
+    latest_trade = payload.get("latestTrade")
+    if isinstance(latest_trade, dict):
+        price = latest_trade.get("p")
+    if price is None:
+        daily_bar = payload.get("dailyBar")
+        if isinstance(daily_bar, dict):
+            price = daily_bar.get("c")
+    return price
+
+
 class AlpacaDataSource(MarketDataSource):
     def __init__(
         self,
@@ -48,9 +194,9 @@ class AlpacaDataSource(MarketDataSource):
 
     def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
-        resp = requests.get(url, headers=self._headers(), params=params or {}, timeout=self.timeout_s)
+        resp = http_get(url, headers=self._headers(), params=params or {}, timeout=self.timeout_s)
         if not resp.ok:
-            raise RuntimeError(f"Alpaca request failed: {resp.status_code} {resp.text}")
+            raise UpstreamHTTPError(f"Alpaca request failed: {resp.status_code} {resp.text}", resp.status_code)
         try:
             payload = resp.json()
         except Exception as e:
@@ -108,25 +254,56 @@ class AlpacaDataSource(MarketDataSource):
                     price = float(bid)
 
         if price is None:
-            s_payload = self._get_json(
-                f"/v2/stocks/{sym}/snapshot",
-                params={"feed": self.feed},
-            )
-            latest_trade = s_payload.get("latestTrade")
-            if isinstance(latest_trade, dict):
-                price = latest_trade.get("p")
-            if price is None:
-                daily_bar = s_payload.get("dailyBar")
-                if isinstance(daily_bar, dict):
-                    price = daily_bar.get("c")
+            price = self._snapshot_price(sym)
 
         if price is None:
-            raise RuntimeError(f"Alpaca returned no latest price for {sym}.")
+            raise SymbolError(f"Alpaca returned no latest price for {sym}.")
 
         try:
             return float(price)
         except Exception as e:
-            raise RuntimeError(f"Alpaca returned invalid price for {sym}.") from e
+            raise SymbolError(f"Alpaca returned invalid price for {sym}.") from e
+
+    def _snapshot_price(self, sym: str) -> Optional[Any]:
+        s_payload = self._get_json(
+            f"/v2/stocks/{sym}/snapshot",
+            params={"feed": self.feed},
+        )
+        return snapshot_price(s_payload)
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        out: Dict[str, float] = {}
+        if not syms:
+            return out
+
+        payload = self._get_json(
+            "/v2/stocks/trades/latest",
+            params={"symbols": ",".join(syms), "feed": self.feed},
+        )
+        out.update(latest_trade_prices(payload, syms))
+
+        missing = [sym for sym in syms if sym not in out]
+        if missing:
+            try:
+                q_payload = self._get_json(
+                    "/v2/stocks/quotes/latest",
+                    params={"symbols": ",".join(missing), "feed": self.feed},
+                )
+            except Exception:
+                q_payload = {}
+            out.update(latest_quote_prices(q_payload, missing))
+
+        for sym in syms:
+            if sym in out:
+                continue
+            try:
+                price = self._snapshot_price(sym)
+                if price is not None:
+                    out[sym] = float(price)
+            except Exception:
+                continue
+        return out
 
     def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
         sym = (symbol or "").strip().upper()
@@ -140,6 +317,21 @@ class AlpacaDataSource(MarketDataSource):
         start_dt = end_dt - timedelta(days=max(30, need_i * 3))
         limit = min(max(need_i * 2, need_i + 50), 1000)
 
+        closes = [c for _d, c in self._daily_bars(sym, start_dt, end_dt, limit)]
+
+        if len(closes) < need_i:
+            raise SymbolError(f"Alpaca returned insufficient bars for {sym}: {len(closes)}/{need_i}")
+
+        return closes[-need_i:]
+
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        sym = (symbol or "").strip().upper()
+        if not sym:
+            raise ValueError("symbol is required")
+        start_dt = datetime(start.year, start.month, start.day)
+        return self._daily_bars(sym, start_dt, datetime.utcnow(), 10000)
+
+    def _daily_bars(self, sym: str, start_dt: datetime, end_dt: datetime, limit: int) -> List[Tuple[date, float]]:
         payload = self._get_json(
             "/v2/stocks/bars",
             params={
@@ -163,95 +355,46 @@ class AlpacaDataSource(MarketDataSource):
         elif isinstance(bars_obj, list):
             bars_list = [b for b in bars_obj if isinstance(b, dict) and (b.get("S") == sym or b.get("symbol") == sym)]
 
-        closes: List[float] = []
+        bars: List[Tuple[date, float]] = []
         for b in bars_list:
             c = b.get("c")
             if c is None:
                 c = b.get("close")
             if c is None:
                 continue
+            t = b.get("t") or b.get("timestamp") or ""
             try:
-                closes.append(float(c))
+                bars.append((date.fromisoformat(str(t)[:10]), float(c)))
             except Exception:
                 continue
+        return bars
 
-        if len(closes) < need_i:
-            raise RuntimeError(f"Alpaca returned insufficient bars for {sym}: {len(closes)}/{need_i}")
-
-        return closes[-need_i:]
-
-    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
         sym = (symbol or "").strip().upper()
         if not sym:
             raise ValueError("symbol is required")
 
-        price = self.get_spot(sym)
-        if price <= 0:
-            return 0.0
-
         today = date.today()
-        start = today - timedelta(days=400)
-        end = today + timedelta(days=30)
-
         payload = self._get_json(
             "/v1/corporate-actions",
             params={
                 "symbols": sym,
                 "types": "cash_dividend",
-                "start": start.isoformat(),
-                "end": end.isoformat(),
+                "start": (today - timedelta(days=400)).isoformat(),
+                "end": (today + timedelta(days=30)).isoformat(),
             },
         )
+        return cash_dividends(payload, sym)
 
-        actions: List[Dict[str, Any]] = []
-        ca = payload.get("corporate_actions")
-        if isinstance(ca, dict):
-            raw = ca.get(sym)
-            if isinstance(raw, list):
-                actions = [a for a in raw if isinstance(a, dict)]
-        elif isinstance(ca, list):
-            actions = [a for a in ca if isinstance(a, dict)]
-        else:
-            data = payload.get("data")
-            if isinstance(data, list):
-                actions = [a for a in data if isinstance(a, dict)]
-
-        cutoff = today - timedelta(days=365)
-        total_cash = 0.0
-
-        for a in actions:
-            ex_str = a.get("ex_date") or a.get("exDate") or a.get("effective_date") or a.get("effectiveDate")
-            ex_dt: Optional[date] = None
-            if isinstance(ex_str, str) and ex_str:
-                try:
-                    ex_dt = date.fromisoformat(ex_str[:10])
-                except Exception:
-                    ex_dt = None
-            if ex_dt is not None and ex_dt < cutoff:
-                continue
-            if ex_dt is not None and ex_dt > today:
-                continue
-
-            amt = None
-            for k in ("cash", "per_share_amount", "rate", "amount", "cash_amount", "net_amount"):
-                v = a.get(k)
-                if v is None:
-                    continue
-                try:
-                    amt = float(v)
-                    break
-                except Exception:
-                    continue
-
-            if amt is None:
-                continue
-            if amt > 0:
-                total_cash += amt
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        sym = (symbol or "").strip().upper()
+        if not sym:
+            raise ValueError("symbol is required")
 
-        if total_cash <= 0:
+        price = self.get_spot(sym)
+        if price <= 0:
             return 0.0
-
-        return float(total_cash) / float(price)
+        return trailing_dividend_yield(self.get_cash_dividends(sym), price)
 
 
 class AlphaVantageDataSource(MarketDataSource):
@@ -267,7 +410,7 @@ class AlphaVantageDataSource(MarketDataSource):
             px = float(data["05. price"].iloc[0])
             return px
         except Exception as e:
-            raise RuntimeError(f"AlphaVantage quote parse failed for {symbol}") from e
+            raise SymbolError(f"AlphaVantage quote parse failed for {symbol}") from e
 
     def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
         data, _meta = self.ts.get_daily(symbol=symbol, outputsize="compact")
@@ -277,10 +420,10 @@ class AlphaVantageDataSource(MarketDataSource):
             for k in keys:
                 closes.append(float(data.loc[k]["4. close"]))
             if len(closes) < int(need):
-                raise RuntimeError(f"AlphaVantage returned only {len(closes)} bars for {symbol}")
+                raise SymbolError(f"AlphaVantage returned only {len(closes)} bars for {symbol}")
             return closes[-int(need) :]
         except Exception as e:
-            raise RuntimeError(f"AlphaVantage daily parse failed for {symbol}") from e
+            raise SymbolError(f"AlphaVantage daily parse failed for {symbol}") from e
 
 
 class TwelveDataDataSource(MarketDataSource):
@@ -293,14 +436,33 @@ class TwelveDataDataSource(MarketDataSource):
     def get_spot(self, symbol: str) -> float:
         url = f"{self.base}/price"
         params = {"symbol": symbol, "apikey": self.key}
-        r = requests.get(url, params=params, timeout=10)
+        r = http_get(url, params=params, timeout=10)
         if not r.ok:
-            raise RuntimeError(f"TwelveData price failed: {r.status_code} {r.text}")
+            raise UpstreamHTTPError(f"TwelveData price failed: {r.status_code} {r.text}", r.status_code)
         j = r.json()
         if "price" not in j:
-            raise RuntimeError(f"TwelveData price missing for {symbol}: {j}")
+            raise SymbolError(f"TwelveData price missing for {symbol}: {j}")
         return float(j["price"])
 
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        if len(syms) <= 1:
+            return super().get_spots(syms, deadline_s)
+        url = f"{self.base}/price"
+        r = http_get(url, params={"symbol": ",".join(syms), "apikey": self.key}, timeout=10)
+        if not r.ok:
+            raise UpstreamHTTPError(f"TwelveData price failed: {r.status_code} {r.text}", r.status_code)
+        j = r.json()
+        out: Dict[str, float] = {}
+        for sym in syms:
+            entry = j.get(sym) if isinstance(j, dict) else None
+            if isinstance(entry, dict) and "price" in entry:
+                try:
+                    out[sym] = float(entry["price"])
+                except Exception:
+                    continue
+        return out
+
     def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
         url = f"{self.base}/time_series"
         params = {
@@ -311,9 +473,9 @@ class TwelveDataDataSource(MarketDataSource):
             "order": "asc",
             "format": "JSON",
         }
-        r = requests.get(url, params=params, timeout=10)
+        r = http_get(url, params=params, timeout=10)
         if not r.ok:
-            raise RuntimeError(f"TwelveData time_series failed: {r.status_code} {r.text}")
+            raise UpstreamHTTPError(f"TwelveData time_series failed: {r.status_code} {r.text}", r.status_code)
         j = r.json()
         vals = j.get("values") or []
         closes: List[float] = []
@@ -328,9 +490,33 @@ class TwelveDataDataSource(MarketDataSource):
             except Exception:
                 continue
         if len(closes) < int(need):
-            raise RuntimeError(f"TwelveData returned only {len(closes)} bars for {symbol}")
+            raise SymbolError(f"TwelveData returned only {len(closes)} bars for {symbol}")
         return closes[-int(need) :]
 
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        url = f"{self.base}/time_series"
+        params = {
+            "symbol": symbol,
+            "interval": "1day",
+            "start_date": start.isoformat(),
+            "outputsize": 5000,
+            "apikey": self.key,
+            "order": "asc",
+            "format": "JSON",
+        }
+        r = http_get(url, params=params, timeout=10)
+        if not r.ok:
+            raise UpstreamHTTPError(f"TwelveData time_series failed: {r.status_code} {r.text}", r.status_code)
+        bars: List[Tuple[date, float]] = []
+        for v in r.json().get("values") or []:
+            if not isinstance(v, dict):
+                continue
+            try:
+                bars.append((date.fromisoformat(str(v.get("datetime"))[:10]), float(v.get("close"))))
+            except Exception:
+                continue
+        return bars
+
 
 class YFinanceDataSource(MarketDataSource):
     def get_spot(self, symbol: str) -> float:
@@ -339,7 +525,7 @@ class YFinanceDataSource(MarketDataSource):
         if px is None:
             hist = t.history(period="1d", interval="1m")
             if hist is None or hist.empty:
-                raise RuntimeError(f"yfinance returned no data for {symbol}")
+                raise SymbolError(f"yfinance returned no data for {symbol}")
             px = float(hist["Close"].iloc[-1])
         return float(px)
 
@@ -347,12 +533,24 @@ class YFinanceDataSource(MarketDataSource):
         t = yf.Ticker(symbol)
         hist = t.history(period="2y", interval="1d")
         if hist is None or hist.empty:
-            raise RuntimeError(f"yfinance returned no daily bars for {symbol}")
+            raise SymbolError(f"yfinance returned no daily bars for {symbol}")
         closes = [float(x) for x in hist["Close"].tolist() if x is not None and not (isinstance(x, float) and math.isnan(x))]
         if len(closes) < int(need):
-            raise RuntimeError(f"yfinance returned only {len(closes)} bars for {symbol}")
+            raise SymbolError(f"yfinance returned only {len(closes)} bars for {symbol}")
         return closes[-int(need) :]
 
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        t = yf.Ticker(symbol)
+        hist = t.history(start=start.isoformat(), interval="1d")
+        if hist is None or hist.empty:
+            return []
+        bars: List[Tuple[date, float]] = []
+        for ts, x in zip(hist.index, hist["Close"].tolist()):
+            if x is None or (isinstance(x, float) and math.isnan(x)):
+                continue
+            bars.append((ts.date(), float(x)))
+        return bars
+
     def get_dividend_yield(self, symbol: str) -> Optional[float]:
         t = yf.Ticker(symbol)
         info = getattr(t, "info", None)
@@ -367,33 +565,153 @@ class YFinanceDataSource(MarketDataSource):
             return None
 
 
+class SnapshotDataSource(MarketDataSource):
+    """
+    In-memory source over values fetched up front (e.g. concurrently by an
+    async view), so the synchronous calculators can run without I/O.
+
+    A value may be an exception captured during the prefetch; reading it
+    re-raises it, exactly as the live call would have.
+    """
+
+    def __init__(
+        self,
+        spots: Optional[Dict[str, Any]] = None,
+        dividend_yields: Optional[Dict[str, Any]] = None,
+        daily_closes: Optional[Dict[str, Any]] = None,
+    ):
+        self.spots = {k.upper(): v for k, v in (spots or {}).items()}
+        self.dividend_yields = {k.upper(): v for k, v in (dividend_yields or {}).items()}
+        self.daily_closes = {k.upper(): v for k, v in (daily_closes or {}).items()}
+
+    @staticmethod
+    def _read(values: Dict[str, Any], symbol: str, what: str) -> Any:
+        sym = (symbol or "").strip().upper()
+        if sym not in values:
+            raise RuntimeError(f"No prefetched {what} for {sym}")
+        value = values[sym]
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    def get_spot(self, symbol: str) -> float:
+        return float(self._read(self.spots, symbol, "spot"))
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        return list(self._read(self.daily_closes, symbol, "daily closes"))[-int(need):]
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return self._read(self.dividend_yields, symbol, "dividend yield")
+
+
+class LazyDataSource(MarketDataSource):
+    """
+    Builds the wrapped provider on first use and reuses it afterwards.
+
+    If construction fails (typically a missing API key) the error is kept and
+    every call raises ProviderUnavailableError instead of retrying the build.
+    """
+
+    def __init__(self, factory: Callable[[], MarketDataSource], provider_name: Optional[str] = None):
+        self._factory = factory
+        self.provider_name = provider_name or getattr(factory, "__name__", "provider")
+        self._source: Optional[MarketDataSource] = None
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> MarketDataSource:
+        if self._source is None and self._error is None:
+            with self._lock:
+                if self._source is None and self._error is None:
+                    try:
+                        self._source = self._factory()
+                    except Exception as exc:
+                        self._error = exc
+        if self._source is None:
+            raise ProviderUnavailableError(f"{self.provider_name} unavailable: {self._error}")
+        return self._source
+
+    def get_spot(self, symbol: str) -> float:
+        return self.resolve().get_spot(symbol)
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        return self.resolve().get_spots(symbols, deadline_s)
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        return self.resolve().get_daily_closes(symbol, need=need)
+
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        return self.resolve().get_daily_bars(symbol, start)
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        return self.resolve().get_cash_dividends(symbol)
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        return self.resolve().get_dividend_yield(symbol)
+
+
 class CombinedDataSource(MarketDataSource):
-    def __init__(self):
-        self._sources: List[MarketDataSource] = []
-        try:
-            self._sources.append(AlpacaDataSource())
-        except Exception:
-            pass
-        try:
-            self._sources.append(AlphaVantageDataSource())
-        except Exception:
-            pass
-        try:
-            self._sources.append(TwelveDataDataSource())
-        except Exception:
-            pass
-        try:
-            self._sources.append(YFinanceDataSource())
-        except Exception:
-            pass
+    """
+    Tries each configured provider in turn.
+
+    With no explicit ``sources`` the four built-in providers are wrapped in
+    LazyDataSource, so each is only constructed when it is first tried and
+    unconfigured ones are skipped. Share one instance through
+    ``eurocalc.registry.get_market_data_source`` rather than building one per
+    request.
+
+    The order is decided per call by ``health`` (the process-wide
+    ProviderHealth by default): providers are ranked by live latency and
+    success rate for the method being called, and ones with an open circuit
+    breaker are skipped.
+
+    ``get_spot`` is hedged: if the current provider has not answered within
+    ``hedge_delay_s`` (FB_HEDGE_DELAY_S, default 1.0), or within its measured
+    p95 if that is shorter, the next one is started in parallel and the first
+    valid price wins. A delay of 0 or less turns hedging off and restores the
+    strictly sequential fallback.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[List[MarketDataSource]] = None,
+        hedge_delay_s: Optional[float] = None,
+        health: Optional[ProviderHealth] = None,
+    ):
+        self.health = health if health is not None else get_provider_health()
+        if hedge_delay_s is None:
+            hedge_delay_s = float(os.getenv("FB_HEDGE_DELAY_S", "1.0"))
+        self.hedge_delay_s = hedge_delay_s
+        if sources is None:
+            sources = [
+                LazyDataSource(AlpacaDataSource),
+                LazyDataSource(AlphaVantageDataSource),
+                LazyDataSource(TwelveDataDataSource),
+                LazyDataSource(YFinanceDataSource),
+            ]
+        self._sources: List[MarketDataSource] = list(sources)
         if not self._sources:
             raise RuntimeError("No market data sources configured")
 
+    def _call(self, src: MarketDataSource, method: str, fn: Callable[[], Any]) -> Any:
+        return self.health.call(src, method, fn)
+
     def get_spot(self, symbol: str) -> float:
+        sources = self.health.order(self._sources, "get_spot")
+        calls = [
+            lambda src=src: self._call(src, "get_spot", lambda: self._valid_spot(src, symbol))
+            for src in sources
+        ]
+        if self.hedge_delay_s > 0 and len(calls) > 1:
+            delay = self.hedge_delay_s
+            p95 = self.health.p95(sources[0], "get_spot")
+            if p95 is not None:
+                delay = min(delay, max(p95, 0.01))
+            return hedged(calls, delay)
         last_err: Optional[Exception] = None
-        for src in self._sources:
+        for call in calls:
             try:
-                return float(src.get_spot(symbol))
+                return call()
             except Exception as e:
                 last_err = e
                 continue
@@ -401,14 +719,44 @@ class CombinedDataSource(MarketDataSource):
             raise last_err
         raise RuntimeError("No market data sources available")
 
+    @staticmethod
+    def _valid_spot(src: MarketDataSource, symbol: str) -> float:
+        px = float(src.get_spot(symbol))
+        if not math.isfinite(px) or px <= 0:
+            raise SymbolError(f"{type(src).__name__} returned invalid spot {px} for {symbol}")
+        return px
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        out: Dict[str, float] = {}
+        last_err: Optional[Exception] = None
+        deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        for src in self.health.order(self._sources, "get_spots"):
+            missing = [sym for sym in syms if sym not in out]
+            if not missing:
+                break
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            try:
+                out.update(self._call(src, "get_spots", lambda: src.get_spots(missing, remaining)))
+            except Exception as e:
+                last_err = e
+                continue
+        if not out and syms and last_err is not None:
+            raise last_err
+        return out
+
     def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
         last_err: Optional[Exception] = None
-        for src in self._sources:
+        for src in self.health.order(self._sources, "get_daily_closes"):
             fn = getattr(src, "get_daily_closes", None)
             if fn is None:
                 continue
             try:
-                closes = fn(symbol, need=need)
+                closes = self._call(src, "get_daily_closes", lambda: fn(symbol, need=need))
                 if closes:
                     return list(closes)
             except Exception as e:
@@ -418,14 +766,48 @@ class CombinedDataSource(MarketDataSource):
             raise last_err
         raise RuntimeError("No market data sources available")
 
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        last_err: Optional[Exception] = None
+        implemented = False
+        for src in self.health.order(self._sources, "get_daily_bars"):
+            try:
+                bars = self._call(src, "get_daily_bars", lambda: src.get_daily_bars(symbol, start))
+                implemented = True
+                if bars:
+                    return list(bars)
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                last_err = e
+                continue
+        if last_err is not None:
+            raise last_err
+        if not implemented:
+            raise NotImplementedError("No provider serves daily bars")
+        return []
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        last_err: Optional[Exception] = None
+        for src in self.health.order(self._sources, "get_cash_dividends"):
+            try:
+                return list(self._call(src, "get_cash_dividends", lambda: src.get_cash_dividends(symbol)))
+            except NotImplementedError:
+                continue
+            except Exception as e:
+                last_err = e
+                continue
+        if last_err is not None:
+            raise last_err
+        raise NotImplementedError("No source provides cash dividends")
+
     def get_dividend_yield(self, symbol: str) -> Optional[float]:
         last_err: Optional[Exception] = None
-        for src in self._sources:
+        for src in self.health.order(self._sources, "get_dividend_yield"):
             fn = getattr(src, "get_dividend_yield", None)
             if fn is None:
                 continue
             try:
-                y = fn(symbol)
+                y = self._call(src, "get_dividend_yield", lambda: fn(symbol))
                 if y is not None:
                     return y
             except Exception as e:
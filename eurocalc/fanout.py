@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, TypeVar
+
+import os
+import threading
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide bounded pool (FB_FANOUT_WORKERS threads) shared by all per-symbol fetches."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv("FB_FANOUT_WORKERS", "16"))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="md-fanout")
+        return _executor
+
+
+def _collect(
+    pool: ThreadPoolExecutor,
+    calls: Dict[K, Callable[[], V]],
+    deadline_s: Optional[float],
+) -> Tuple[Dict[K, V], Dict[K, Exception]]:
+    # Shared by fan_out and run_calls; they differ only in the pool used.
+    futures = {pool.submit(fn): key for key, fn in calls.items()}
+    results: Dict[K, V] = {}
+    errors: Dict[K, Exception] = {}
+    if not futures:
+        return results, errors
+
+    done, pending = wait(futures, timeout=deadline_s)
+    for fut in done:
+        key = futures[fut]
+        try:
+            results[key] = fut.result()
+        except Exception as exc:
+            errors[key] = exc
+    for fut in pending:
+        fut.cancel()
+        errors[futures[fut]] = TimeoutError(f"deadline of {deadline_s}s exceeded")
+    return results, errors
+
+
+def fan_out(
+    fn: Callable[[K], V],
+    keys: Iterable[K],
+    deadline_s: Optional[float] = None,
+) -> Tuple[Dict[K, V], Dict[K, Exception]]:
+    """
+    Run ``fn(key)`` for every key on the shared pool.
+
+    Returns ``(results, errors)``. Keys still running when ``deadline_s``
+    elapses get a TimeoutError in ``errors``; their threads finish in the
+    background and the results are discarded.
+    """
+    return _collect(get_executor(), {key: partial(fn, key) for key in keys}, deadline_s)
+
+
+_assembly_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_assembly_executor() -> ThreadPoolExecutor:
+    # Its own pool: the calls it runs may fan out or hedge themselves.
+    global _assembly_executor
+    with _executor_lock:
+        if _assembly_executor is None:
+            workers = int(os.getenv("FB_ASSEMBLY_WORKERS", "32"))
+            _assembly_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="md-assemble")
+        return _assembly_executor
+
+
+def run_calls(
+    calls: Dict[K, Callable[[], V]],
+    deadline_s: Optional[float] = None,
+) -> Tuple[Dict[K, V], Dict[K, Exception]]:
+    """
+    Run independent zero-argument calls concurrently; ``fan_out`` for
+    heterogeneous work such as the inputs of one pricing request.
+
+    Returns ``(results, errors)`` keyed like ``calls``, with the same
+    deadline semantics as ``fan_out``.
+    """
+    return _collect(_get_assembly_executor(), calls, deadline_s)
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    # Separate from the fan-out pool so a hedged call made from a fan-out
+    # worker can never wait on tasks queued behind itself.
+    global _hedge_executor
+    with _executor_lock:
+        if _hedge_executor is None:
+            workers = int(os.getenv("FB_HEDGE_WORKERS", "16"))
+            _hedge_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="md-hedge")
+        return _hedge_executor
+
+
+def hedged(calls: Sequence[Callable[[], V]], delay_s: float) -> V:
+    """
+    Return the first successful result of ``calls``, tried in order.
+
+    ``calls[0]`` starts immediately. Whenever ``delay_s`` passes without an
+    answer, or an in-flight call fails, the next call is started alongside
+    the ones still running. Losing calls are left to finish in the
+    background. Raises the last error if every call fails.
+    """
+    if not calls:
+        raise RuntimeError("No calls to hedge")
+    pool = _get_hedge_executor()
+    pending = set()
+    started = 0
+    last_err: Optional[Exception] = None
+
+    while True:
+        if started < len(calls):
+            pending.add(pool.submit(calls[started]))
+            started += 1
+        if not pending:
+            break
+        timeout = delay_s if started < len(calls) else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for fut in done:
+            try:
+                return fut.result()
+            except Exception as exc:
+                last_err = exc
+
+    if last_err is not None:
+        raise last_err
+    raise RuntimeError("No calls to hedge")
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# Monotonic deadline of the http_get call running on this thread, if any.
+_deadline = threading.local()
+
+
+def _max_retry_after() -> float:
+    return float(os.getenv("FB_HTTP_MAX_RETRY_AFTER_S", "5"))
+
+
+class _BoundedRetry(Retry):
+    """
+    Retry that caps an upstream Retry-After at FB_HTTP_MAX_RETRY_AFTER_S and
+    gives up, returning the last response, when the wait before the next
+    attempt would run past the calling http_get's deadline.
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, _max_retry_after())
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new = super().increment(method, url, response, error, _pool, _stacktrace)
+        deadline = getattr(_deadline, "at", None)
+        if deadline is not None:
+            wait = new.get_retry_after(response) if response is not None else None
+            if wait is None:
+                wait = new.get_backoff_time()
+            if time.monotonic() + wait >= deadline:
+                raise MaxRetryError(_pool, url, error or ResponseError("retry deadline exceeded"))
+        return new
+
+
+def _build_session() -> requests.Session:
+    pool_size = int(os.getenv("FB_HTTP_POOL_SIZE", "10"))
+    retry = _BoundedRetry(
+        total=int(os.getenv("FB_HTTP_RETRIES", "3")),
+        backoff_factor=float(os.getenv("FB_HTTP_BACKOFF_S", "0.3")),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Return the process-wide keep-alive session for ``url``'s host.
+
+    Each host gets its own session and connection pool (FB_HTTP_POOL_SIZE
+    connections) with GET retries and exponential backoff on 429/5xx. An
+    upstream Retry-After is honoured up to FB_HTTP_MAX_RETRY_AFTER_S.
+    Credentials are passed per request rather than stored on the session, so
+    one session can safely be shared by every thread and data source.
+    """
+    parts = urlsplit(url)
+    host_key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(host_key)
+        if session is None:
+            session = _build_session()
+            _sessions[host_key] = session
+        return session
+
+
+def http_get(
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 10.0,
+    deadline_s: Optional[float] = None,
+) -> requests.Response:
+    """
+    GET through the shared session. No retry is started whose wait would end
+    after ``deadline_s`` (default ``timeout``), so retries cannot multiply
+    the caller's timeout; the last response or error is returned instead.
+    """
+    _deadline.at = time.monotonic() + (deadline_s if deadline_s is not None else timeout)
+    try:
+        return get_session(url).get(url, params=params, headers=headers, timeout=timeout)
+    finally:
+        _deadline.at = None
+
+
+def reset_sessions() -> None:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+@dataclass
+class AsyncResponse:
+    status_code: int
+    text: str
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_session(url: str) -> aiohttp.ClientSession:
+    """
+    Keep-alive aiohttp session for ``url``'s host on the running event loop.
+
+    aiohttp sessions are bound to the loop they were created on, so the pool
+    is per loop and per host; under an ASGI server that is one pool per
+    worker, shared by every request it serves.
+    """
+    loop = asyncio.get_running_loop()
+    parts = urlsplit(url)
+    host_key = f"{parts.scheme}://{parts.netloc}"
+    per_loop = _async_sessions.setdefault(loop, {})
+    session = per_loop.get(host_key)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit_per_host=int(os.getenv("FB_HTTP_POOL_SIZE", "10")))
+        session = aiohttp.ClientSession(connector=connector)
+        per_loop[host_key] = session
+    return session
+
+
+async def async_http_get(
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    timeout: float = 10.0,
+    deadline_s: Optional[float] = None,
+) -> AsyncResponse:
+    """
+    GET with the same retry policy as ``http_get``: backoff on 429/5xx and
+    connection errors, Retry-After capped at FB_HTTP_MAX_RETRY_AFTER_S, and
+    every attempt and wait kept within ``deadline_s`` (default ``timeout``).
+    """
+    retries = int(os.getenv("FB_HTTP_RETRIES", "3"))
+    backoff = float(os.getenv("FB_HTTP_BACKOFF_S", "0.3"))
+    query = {k: str(v) for k, v in (params or {}).items() if v is not None}
+    session = get_async_session(url)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (deadline_s if deadline_s is not None else timeout)
+    attempt = 0
+    while True:
+        remaining = max(deadline - loop.time(), 0.0)
+        try:
+            async with session.get(
+                url, params=query, headers=headers, timeout=aiohttp.ClientTimeout(total=min(timeout, remaining))
+            ) as resp:
+                text = await resp.text()
+                last = AsyncResponse(status_code=resp.status, text=text)
+                if resp.status not in RETRY_STATUSES or attempt >= retries:
+                    return last
+                retry_after = resp.headers.get("Retry-After")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= retries:
+                raise
+            last = None
+            retry_after = None
+        delay = backoff * (2 ** attempt)
+        if retry_after is not None:
+            try:
+                delay = max(delay, min(float(retry_after), _max_retry_after()))
+            except ValueError:
+                pass
+        if loop.time() + delay >= deadline:
+            if last is None:
+                raise asyncio.TimeoutError(f"GET {url} gave up: retry deadline exceeded")
+            return last
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def close_async_sessions() -> None:
+    """Close the running loop's sessions (call on shutdown, or at the end of an asyncio.run in tests)."""
+    per_loop = _async_sessions.pop(asyncio.get_running_loop(), {})
+    for session in per_loop.values():
+        await session.close()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import threading
+
+from .data_sources import MarketDataSource, normalize_symbols, trailing_dividend_yield
+from .single_flight import SingleFlight
+
+
+class MarketContext(MarketDataSource):
+    """
+    Request-scoped view of a MarketDataSource.
+
+    Build one per pricing request and hand it to every calculator: each value
+    is fetched at most once and then shared, so the spot read by
+    SpotPriceCalculator is the one the dividend yield is computed against.
+    Where the source has a corporate-actions ledger (``get_cash_dividends``,
+    cached for a day by CachedMarketDataSource) the trailing yield is derived
+    locally from it and that spot; otherwise ``get_dividend_yield`` is asked.
+
+    Safe to share between the threads of one request: concurrent lookups of
+    the same value wait for a single fetch. Failures are not remembered. Do
+    not keep a context beyond one request: nothing in it expires.
+    """
+
+    def __init__(self, source: MarketDataSource):
+        self.source = source
+        self._values: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def __getattr__(self, name: str):
+        return getattr(self.source, name)
+
+    def remember(self, key: Tuple, value: Any) -> None:
+        """Record a value obtained elsewhere (e.g. a streamed spot) for the rest of the request."""
+        with self._lock:
+            self._values.setdefault(key, value)
+
+    def _memo(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+
+        def fetch_and_remember() -> Any:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            self.remember(key, fetch())
+            return self._values[key]
+
+        value, _shared = self._flight.do(key, fetch_and_remember)
+        return value
+
+    def get_spot(self, symbol: str) -> float:
+        sym = (symbol or "").strip().upper()
+        return self._memo(("spot", sym), lambda: float(self.source.get_spot(sym)))
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        with self._lock:
+            out = {sym: self._values[("spot", sym)] for sym in syms if ("spot", sym) in self._values}
+        missing = [sym for sym in syms if sym not in out]
+        if missing:
+            for sym, px in self.source.get_spots(missing, deadline_s).items():
+                self.remember(("spot", sym), float(px))
+                out[sym] = float(px)
+        return out
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        sym = (symbol or "").strip().upper()
+        with self._lock:
+            have = self._values.get(("closes", sym))
+        if have is not None and len(have) >= need:
+            return list(have[-int(need):])
+        closes = list(self.source.get_daily_closes(sym, need=need))
+        with self._lock:
+            if len(closes) >= len(self._values.get(("closes", sym), ())):
+                self._values[("closes", sym)] = closes
+        return list(closes)
+
+    def get_daily_bars(self, symbol: str, start: date) -> List[Tuple[date, float]]:
+        return self.source.get_daily_bars(symbol, start)
+
+    def get_cash_dividends(self, symbol: str) -> List[Tuple[date, float]]:
+        sym = (symbol or "").strip().upper()
+        return list(self._memo(("cash_dividends", sym), lambda: list(self.source.get_cash_dividends(sym))))
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        sym = (symbol or "").strip().upper()
+        return self._memo(("dividend_yield", sym), lambda: self._dividend_yield(sym))
+
+    def _dividend_yield(self, sym: str) -> Optional[float]:
+        try:
+            ledger = self.get_cash_dividends(sym)
+        except Exception:
+            return self.source.get_dividend_yield(sym)
+        return trailing_dividend_yield(ledger, self.get_spot(sym))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+import time
+
+from .calculator import BAWAmericanOptionCalculator, BSTerms, GreeksCalculator, VariablesAssembler
+
+
+class PricingPipeline:
+    """
+    One pricing request, run as stages that each execute at most once:
+
+        inputs -> terms (d1/d2, discount factors, N(d1), n(d1)) -> european
+               -> american (BAW, reusing the European price) -> greeks
+
+    Stages are evaluated lazily, so the European endpoint never runs the
+    American one, and both share the same terms instead of re-deriving them.
+    Wall time per stage is kept in ``timings_ms``.
+    """
+
+    def __init__(
+        self,
+        assembler: VariablesAssembler,
+        *,
+        symbol: str,
+        side: str,
+        strike: float,
+        expiry: date,
+        as_of: Optional[date] = None,
+        market_option_price: Optional[float] = None,
+        american_calc: Optional[BAWAmericanOptionCalculator] = None,
+    ):
+        self.assembler = assembler
+        self.params: Dict[str, Any] = {"symbol": symbol, "side": side, "strike": strike, "expiry": expiry}
+        if as_of is not None:
+            self.params["as_of"] = as_of
+        if market_option_price is not None:
+            self.params["market_option_price"] = market_option_price
+        self.american_calc = american_calc or BAWAmericanOptionCalculator()
+        self.timings_ms: Dict[str, float] = {}
+        self._results: Dict[str, Any] = {}
+
+    def _stage(self, name: str, fn: Callable[[], Any]) -> Any:
+        if name not in self._results:
+            t0 = time.perf_counter()
+            self._results[name] = fn()
+            self.timings_ms[name] = round((time.perf_counter() - t0) * 1000.0, 3)
+        return self._results[name]
+
+    def inputs(self) -> dict:
+        return self._stage("inputs", lambda: self.assembler.build(**self.params))
+
+    def terms(self) -> BSTerms:
+        def run() -> BSTerms:
+            v = self.inputs()
+            return BSTerms.compute(v["S"], v["K"], v["r"], v["q"], v["sigma"], v["T"], d1=v["d1"], d2=v["d2"])
+
+        return self._stage("terms", run)
+
+    def european(self) -> float:
+        return self._stage("european", lambda: self.terms().fair_value(self.inputs()["side"]))
+
+    def american(self) -> dict:
+        def run() -> dict:
+            t, side = self.terms(), self.inputs()["side"]
+            return self.american_calc.compute(
+                S=t.S, K=t.K, r=t.r, q=t.q, sigma=t.sigma, T=t.T, side=side, european_price=self.european()
+            )
+
+        return self._stage("american", run)
+
+    def greeks(self) -> dict:
+        return self._stage(
+            "greeks",
+            lambda: GreeksCalculator().from_terms(self.terms(), self.inputs()["side"], fair_value=self.european()),
+        )
+
+    def _run_in_order(self) -> None:
+        # Evaluate upstream stages first so each timing covers only its own stage.
+        self.inputs()
+        self.terms()
+        self.european()
+
+    def european_payload(self) -> dict:
+        self._run_in_order()
+        return {"inputs": self.inputs(), "price_and_greeks": self.greeks(), "timings_ms": dict(self.timings_ms)}
+
+    def american_payload(self) -> dict:
+        self._run_in_order()
+        american = self.american()
+        return {
+            "inputs": self.inputs(),
+            "american_result": american,
+            "greeks": self.greeks(),
+            "timings_ms": dict(self.timings_ms),
+        }
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import asyncio
+import os
+import threading
+import time
+
+import aiohttp
+import numpy as np
+import requests
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider is skipped because its half-open probe is already in flight."""
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Raised by a provider that is not configured (e.g. no API key) and so never ran."""
+
+
+class SymbolError(RuntimeError):
+    """
+    Raised when a provider answered but has nothing usable for the symbol
+    (unknown ticker, no latest price, an invalid price). The request was at
+    fault, not the provider, so it never counts against its breaker.
+    """
+
+
+class UpstreamHTTPError(RuntimeError):
+    """Non-2xx reply from a provider. Only 429 and 5xx count as provider failures."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = int(status_code)
+
+
+_TRANSPORT_ERRORS = (OSError, TimeoutError, asyncio.TimeoutError, requests.RequestException, aiohttp.ClientError)
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """True for transport errors, timeouts and 429/5xx replies; everything else is the request's problem."""
+    if isinstance(exc, SymbolError):
+        return False
+    if isinstance(exc, UpstreamHTTPError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, _TRANSPORT_ERRORS)
+
+
+class LatencySketch:
+    """Fixed-size ring of the most recent latency samples, for cheap percentile reads."""
+
+    def __init__(self, size: int = 128):
+        self._samples = np.zeros(int(size), dtype=np.float64)
+        self._count = 0
+
+    def add(self, value: float) -> None:
+        self._samples[self._count % len(self._samples)] = value
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, len(self._samples))
+
+    def quantile(self, q: float) -> Optional[float]:
+        n = len(self)
+        if n == 0:
+            return None
+        return float(np.quantile(self._samples[:n], q))
+
+
+@dataclass
+class ProviderStats:
+    """
+    Live statistics and circuit breaker for one (provider, method) pair.
+
+    Latency and success rate are EWMAs seeded with an optimistic prior, so a
+    provider nobody has called yet ranks by its configured position until it
+    has been measured. The breaker opens after ``failure_threshold``
+    consecutive failures, stays open for ``cooldown_s`` and then lets a single
+    half-open probe through; the probe's outcome closes or re-opens it.
+    An open breaker only refuses calls through ``ProviderHealth.order``; if
+    every provider is open the caller may still go through.
+    """
+
+    alpha: float
+    failure_threshold: int
+    cooldown_s: float
+    prior_latency_s: float
+    latency_ewma: float = 0.0
+    success_ewma: float = 1.0
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    probing: bool = False
+    sketch: LatencySketch = field(default_factory=LatencySketch)
+
+    def __post_init__(self):
+        self.latency_ewma = self.prior_latency_s
+
+    def available(self, now: float) -> bool:
+        if self.state == OPEN:
+            return now - self.opened_at >= self.cooldown_s
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return True
+
+    def begin(self, now: float) -> bool:
+        """Claim a call slot; False only while another half-open probe is in flight."""
+        if self.state == OPEN and now - self.opened_at >= self.cooldown_s:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == HALF_OPEN:
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    def record(self, latency_s: float, ok: bool, now: float) -> None:
+        self.calls += 1
+        self.latency_ewma += self.alpha * (latency_s - self.latency_ewma)
+        self.success_ewma += self.alpha * ((1.0 if ok else 0.0) - self.success_ewma)
+        self.sketch.add(latency_s)
+        if ok:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = now
+        self.probing = False
+
+    def release(self) -> None:
+        """Hand back a half-open probe that ended without a verdict."""
+        self.probing = False
+
+    def score(self) -> float:
+        # Expected time to a successful answer if retried until it works.
+        return self.latency_ewma / max(self.success_ewma, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_ewma_s": round(self.latency_ewma, 6),
+            "success_rate": round(self.success_ewma, 4),
+            "p50_s": self.sketch.quantile(0.5),
+            "p95_s": self.sketch.quantile(0.95),
+        }
+
+
+class ProviderHealth:
+    """
+    Per-provider, per-method statistics shared by every CombinedDataSource.
+
+    ``order`` ranks providers by expected latency to a good answer and drops
+    the ones whose breaker is open; ``call`` runs one provider call and
+    records its latency and outcome. Only errors for which
+    ``is_provider_failure`` holds count as failures; others (bad symbols,
+    4xx replies) are re-raised without touching the breaker.
+    """
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown_s: Optional[float] = None,
+        prior_latency_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.alpha = alpha if alpha is not None else float(os.getenv("FB_PROVIDER_EWMA_ALPHA", "0.2"))
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else int(os.getenv("FB_BREAKER_FAILURES", "3"))
+        )
+        self.cooldown_s = cooldown_s if cooldown_s is not None else float(os.getenv("FB_BREAKER_COOLDOWN_S", "30"))
+        self.prior_latency_s = (
+            prior_latency_s if prior_latency_s is not None else float(os.getenv("FB_PROVIDER_PRIOR_LATENCY_S", "1.0"))
+        )
+        self.clock = clock
+        self._stats: Dict[Tuple[str, str], ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def provider_name(src: Any) -> str:
+        return getattr(src, "provider_name", None) or type(src).__name__
+
+    def _get(self, src: Any, method: str) -> ProviderStats:
+        key = (self.provider_name(src), method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = ProviderStats(
+                alpha=self.alpha,
+                failure_threshold=self.failure_threshold,
+                cooldown_s=self.cooldown_s,
+                prior_latency_s=self.prior_latency_s,
+            )
+            self._stats[key] = stats
+        return stats
+
+    def order(self, sources: Sequence[T], method: str) -> List[T]:
+        """
+        Sources to try for ``method``, best first, skipping open breakers.
+
+        If every breaker is open the full list is returned in score order so
+        a request still gets a chance rather than failing outright.
+        """
+        now = self.clock()
+        with self._lock:
+            ranked = sorted(
+                enumerate(sources),
+                key=lambda item: (self._get(item[1], method).score(), item[0]),
+            )
+            allowed = [src for _, src in ranked if self._get(src, method).available(now)]
+        return allowed or [src for _, src in ranked]
+
+    def p95(self, src: Any, method: str, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            stats = self._get(src, method)
+            if len(stats.sketch) < min_samples:
+                return None
+            return stats.sketch.quantile(0.95)
+
+    def call(self, src: Any, method: str, fn: Callable[[], T]) -> T:
+        self._begin(src, method)
+        start = self.clock()
+        try:
+            result = fn()
+        except (NotImplementedError, ProviderUnavailableError):
+            self._release(src, method)
+            raise
+        except Exception as exc:
+            if not is_provider_failure(exc):
+                self._release(src, method)
+                raise
+            self.record(src, method, self.clock() - start, ok=False)
+            raise
+        self.record(src, method, self.clock() - start, ok=True)
+        return result
+
+    async def acall(self, src: Any, method: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """``call`` for coroutine functions."""
+        self._begin(src, method)
+        start = self.clock()
+        try:
+            result = await fn()
+        except (NotImplementedError, ProviderUnavailableError):
+            self._release(src, method)
+            raise
+        except asyncio.CancelledError:
+            self._release(src, method)
+            raise
+        except Exception as exc:
+            if not is_provider_failure(exc):
+                self._release(src, method)
+                raise
+            self.record(src, method, self.clock() - start, ok=False)
+            raise
+        self.record(src, method, self.clock() - start, ok=True)
+        return result
+
+    def _begin(self, src: Any, method: str) -> None:
+        with self._lock:
+            if not self._get(src, method).begin(self.clock()):
+                raise CircuitOpenError(f"{self.provider_name(src)}.{method} circuit is open")
+
+    def _release(self, src: Any, method: str) -> None:
+        with self._lock:
+            self._get(src, method).release()
+
+    def record(self, src: Any, method: str, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self._get(src, method).record(latency_s, ok, self.clock())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{name}.{method}": stats.snapshot() for (name, method), stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_default_health = ProviderHealth()
+
+
+def get_provider_health() -> ProviderHealth:
+    return _default_health
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import aiohttp
+
+from .data_sources import normalize_symbols
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BookEntry:
+    last: Optional[float] = None
+    last_at: float = 0.0
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    quote_at: float = 0.0
+
+
+def _positive(value: Any) -> Optional[float]:
+    try:
+        px = float(value)
+    except (TypeError, ValueError):
+        return None
+    return px if math.isfinite(px) and px > 0 else None
+
+
+class QuoteBook:
+    """
+    In-memory last-trade / NBBO book fed by a streaming quote feed.
+
+    Entries are stamped with the local receipt time; ``price`` only answers
+    while an entry is younger than ``max_age_s`` (FB_STREAM_MAX_AGE_S), so a
+    stalled feed degrades to the REST path instead of serving stale prices.
+    Thread-safe: the feed thread writes while request threads read.
+    """
+
+    def __init__(self, max_age_s: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.max_age_s = float(max_age_s if max_age_s is not None else os.getenv("FB_STREAM_MAX_AGE_S", "10"))
+        self.clock = clock
+        self._entries: Dict[str, BookEntry] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, msg: Dict[str, Any]) -> bool:
+        """Apply one Alpaca-format stream message ("t" trade or "q" quote); returns whether it was used."""
+        kind = msg.get("T")
+        sym = str(msg.get("S") or "").strip().upper()
+        if kind not in ("t", "q") or not sym:
+            return False
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.setdefault(sym, BookEntry())
+            if kind == "t":
+                px = _positive(msg.get("p"))
+                if px is None:
+                    return False
+                entry.last, entry.last_at = px, now
+            else:
+                entry.bid, entry.ask, entry.quote_at = _positive(msg.get("bp")), _positive(msg.get("ap")), now
+        return True
+
+    def price(self, symbol: str, max_age_s: Optional[float] = None) -> Optional[float]:
+        """Fresh last trade, else fresh NBBO mid, else None."""
+        age = self.max_age_s if max_age_s is None else float(max_age_s)
+        sym = (symbol or "").strip().upper()
+        with self._lock:
+            entry = self._entries.get(sym)
+            if entry is None:
+                return None
+            now = self.clock()
+            if entry.last is not None and now - entry.last_at <= age:
+                return entry.last
+            if entry.bid is not None and entry.ask is not None and now - entry.quote_at <= age:
+                return (entry.bid + entry.ask) / 2.0
+        return None
+
+    def prices(self, symbols: Iterable[str], max_age_s: Optional[float] = None) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for sym in normalize_symbols(symbols):
+            px = self.price(sym, max_age_s)
+            if px is not None:
+                out[sym] = px
+        return out
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {sym: vars(entry).copy() for sym, entry in self._entries.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class QuoteStream:
+    """
+    Websocket client for the Alpaca market data stream (trades + quotes).
+
+    Runs its own event loop on a daemon thread: connects, authenticates,
+    subscribes to the active symbol set and applies every message to the
+    book. On any disconnect it logs the cause and reconnects with capped
+    exponential backoff, which resets once a connection authenticates, and
+    re-subscribes. ``subscribe`` may be called from any thread to grow the
+    symbol set, including while a connection is still being set up.
+
+    Symbols passed to the constructor (or subscribed with ``pin=True``) stay
+    subscribed. Symbols added on demand are kept least-recently-requested
+    first and capped at ``max_symbols`` (FB_STREAM_MAX_SYMBOLS) in total; the
+    oldest are unsubscribed to make room.
+    """
+
+    def __init__(
+        self,
+        book: QuoteBook,
+        symbols: Iterable[str] = (),
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        reconnect_s: Optional[float] = None,
+        max_symbols: Optional[int] = None,
+    ):
+        feed = os.getenv("APCA_DATA_FEED") or "iex"
+        self.book = book
+        self.url = url or os.getenv("FB_STREAM_URL") or f"wss://stream.data.alpaca.markets/v2/{feed}"
+        self.api_key = api_key or os.getenv("APCA_API_KEY_ID") or os.getenv("APCA_API_KEY") or ""
+        self.api_secret = api_secret or os.getenv("APCA_API_SECRET_KEY") or os.getenv("APCA_API_SECRET") or ""
+        self.reconnect_s = float(reconnect_s if reconnect_s is not None else os.getenv("FB_STREAM_RECONNECT_S", "1"))
+        self.messages = 0
+        self.connects = 0
+        self.connected = threading.Event()
+        self.max_symbols = int(max_symbols if max_symbols is not None else os.getenv("FB_STREAM_MAX_SYMBOLS", "200"))
+        self._pinned: Set[str] = set(normalize_symbols(symbols))
+        self._on_demand: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._backoff = self.reconnect_s
+
+    @property
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._pinned.union(self._on_demand))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="quote-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        self._stop.set()
+        loop, ws = self._loop, self._ws
+        if loop is not None and ws is not None and not loop.is_closed():
+            try:
+                asyncio.run_coroutine_threadsafe(ws.close(), loop)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+
+    def subscribe(self, symbols: Iterable[str], pin: bool = False) -> List[str]:
+        """Add symbols to the active set; returns the ones that were new."""
+        new: List[str] = []
+        evicted: List[str] = []
+        with self._lock:
+            for sym in normalize_symbols(symbols):
+                if pin:
+                    if sym not in self._pinned and sym not in self._on_demand:
+                        new.append(sym)
+                    self._on_demand.pop(sym, None)
+                    self._pinned.add(sym)
+                elif sym in self._on_demand:
+                    self._on_demand.move_to_end(sym)
+                elif sym not in self._pinned:
+                    if len(self._pinned) >= self.max_symbols:
+                        continue
+                    self._on_demand[sym] = None
+                    new.append(sym)
+            while self._on_demand and len(self._pinned) + len(self._on_demand) > self.max_symbols:
+                sym, _ = self._on_demand.popitem(last=False)
+                evicted.append(sym)
+            new = [sym for sym in new if sym not in evicted]
+        self._send(self._unsubscribe_msg(evicted) if evicted else None)
+        self._send(self._subscribe_msg(new) if new else None)
+        return new
+
+    def _send(self, msg: Optional[Dict[str, Any]]) -> None:
+        loop, ws = self._loop, self._ws
+        if msg is not None and loop is not None and ws is not None and self.connected.is_set():
+            try:
+                asyncio.run_coroutine_threadsafe(ws.send_json(msg), loop)
+            except RuntimeError:
+                pass
+
+    @staticmethod
+    def _unsubscribe_msg(symbols: List[str]) -> Dict[str, Any]:
+        return {"action": "unsubscribe", "trades": symbols, "quotes": symbols}
+
+    @staticmethod
+    def _subscribe_msg(symbols: List[str]) -> Dict[str, Any]:
+        return {"action": "subscribe", "trades": symbols, "quotes": symbols}
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._backoff = self.reconnect_s
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                try:
+                    await self._session(session)
+                except Exception:
+                    if not self._stop.is_set():
+                        logger.warning("quote stream %s disconnected", self.url, exc_info=True)
+                finally:
+                    self.connected.clear()
+                    self._ws = None
+                if self._stop.is_set():
+                    break
+                await asyncio.sleep(self._backoff)
+                self._backoff = min(self._backoff * 2, 30.0)
+
+    async def _session(self, session: aiohttp.ClientSession) -> None:
+        async with session.ws_connect(self.url, heartbeat=30) as ws:
+            self._ws = ws
+            await ws.receive_json(timeout=10)  # [{"T": "success", "msg": "connected"}]
+            await ws.send_json({"action": "auth", "key": self.api_key, "secret": self.api_secret})
+            reply = await ws.receive_json(timeout=10)
+            if not any(m.get("T") == "success" and m.get("msg") == "authenticated" for m in reply):
+                raise RuntimeError(f"Quote stream authentication failed: {reply}")
+            self._backoff = self.reconnect_s
+            self.connects += 1
+            # Connected before the snapshot: a subscribe() from now on sends
+            # its own message, and one that finished earlier is in the snapshot.
+            self.connected.set()
+            symbols = self.symbols
+            if symbols:
+                await ws.send_json(self._subscribe_msg(symbols))
+            # CLOSE/CLOSING/CLOSED end the iteration; PING/PONG are answered by aiohttp.
+            async for frame in ws:
+                if frame.type == aiohttp.WSMsgType.ERROR:
+                    raise ConnectionError(f"Quote stream error: {ws.exception()}")
+                if frame.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                for msg in json.loads(frame.data):
+                    if not isinstance(msg, dict):
+                        continue
+                    if msg.get("T") == "error":
+                        logger.warning("quote stream error message: %s", msg)
+                    elif self.book.apply(msg):
+                        self.messages += 1
+
+
+_book = QuoteBook()
+_stream_lock = threading.Lock()
+_stream: Optional[QuoteStream] = None
+
+
+def get_quote_book() -> QuoteBook:
+    """Process-wide quote book read by SpotPriceCalculator and get_current_prices."""
+    return _book
+
+
+def start_quote_stream(symbols: Iterable[str] = (), url: Optional[str] = None) -> QuoteStream:
+    """Start (at most one) background QuoteStream feeding the process-wide book."""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = QuoteStream(_book, symbols, url=url)
+        else:
+            _stream.subscribe(symbols, pin=True)
+        _stream.start()
+        return _stream
+
+
+def stop_quote_stream() -> None:
+    global _stream
+    with _stream_lock:
+        stream, _stream = _stream, None
+    if stream is not None:
+        stream.stop()
+
+
+def subscribe_quotes(symbols: Iterable[str]) -> None:
+    """Ask the running stream to carry symbols on demand (bounded, see QuoteStream); a no-op when no stream runs."""
+    stream = _stream
+    if stream is not None:
+        stream.subscribe(symbols)
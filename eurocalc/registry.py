@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import os
+import threading
+
+from .async_data_sources import (
+    AsyncAlpacaDataSource,
+    AsyncCombinedDataSource,
+    AsyncMarketDataSource,
+    AsyncTwelveDataDataSource,
+    ThreadedAsyncDataSource,
+)
+from .bar_store import BarStoreDataSource
+from .data_sources import (
+    AlphaVantageDataSource,
+    CombinedDataSource,
+    LazyDataSource,
+    MarketDataSource,
+    YFinanceDataSource,
+)
+from .replay_source import ReplayDataSource
+
+_lock = threading.Lock()
+_market_data_source: Optional[MarketDataSource] = None
+_async_market_data_source: Optional[AsyncCombinedDataSource] = None
+
+
+def get_market_data_source() -> MarketDataSource:
+    """
+    The process-wide CombinedDataSource.
+
+    Built on first call and reused by every request, so provider clients and
+    their pooled HTTP connections survive between requests. Providers inside
+    it are themselves constructed lazily on first use.
+
+    When FB_REPLAY_FIXTURE names a recorded fixture, a ReplayDataSource over
+    it is used instead, so the whole app runs offline and reproducibly.
+    """
+    global _market_data_source
+    if _market_data_source is None:
+        with _lock:
+            if _market_data_source is None:
+                if os.getenv("FB_REPLAY_FIXTURE"):
+                    _market_data_source = ReplayDataSource.from_env()
+                else:
+                    _market_data_source = CombinedDataSource()
+    return _market_data_source
+
+
+def get_async_market_data_source() -> AsyncCombinedDataSource:
+    """
+    The process-wide AsyncCombinedDataSource used by the async views.
+
+    Alpaca and TwelveData quotes go over aiohttp when configured. Quotes
+    from the providers without an async client (AlphaVantage, yfinance) run
+    on worker threads, as do daily closes and dividends, which go through
+    the bar store and the shared synchronous source. Alpaca and TwelveData
+    are never asked for a quote a second time over the sync clients.
+    """
+    global _async_market_data_source
+    if _async_market_data_source is None:
+        # Resolved before taking _lock, which get_market_data_source takes too.
+        base = get_market_data_source()
+        with _lock:
+            if _async_market_data_source is None:
+                sources: List[AsyncMarketDataSource] = []
+                quote_source: Optional[MarketDataSource] = None
+                if not os.getenv("FB_REPLAY_FIXTURE"):
+                    for factory in (AsyncAlpacaDataSource, AsyncTwelveDataDataSource):
+                        try:
+                            sources.append(factory())
+                        except Exception:
+                            pass
+                    quote_source = CombinedDataSource(
+                        [LazyDataSource(AlphaVantageDataSource), LazyDataSource(YFinanceDataSource)]
+                    )
+                sources.append(ThreadedAsyncDataSource(BarStoreDataSource(base), quote_source=quote_source))
+                _async_market_data_source = AsyncCombinedDataSource(sources)
+    return _async_market_data_source
+
+
+def reset_market_data_source() -> None:
+    """Drop the shared instances; the next getter call builds fresh ones. For tests."""
+    global _market_data_source, _async_market_data_source
+    with _lock:
+        _market_data_source = None
+        _async_market_data_source = None
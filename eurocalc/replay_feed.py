@@ -0,0 +1,167 @@
+"""
+Local stand-in for the Alpaca market data websocket, for tests and offline dev.
+
+Speaks the same handshake as the real stream (connected -> auth ->
+subscribe) and replays recorded frames, filtered to each client's
+subscribed symbols. Run standalone and point the app at it with
+FB_STREAM_URL:
+
+    python -m eurocalc.replay_feed --port 8765 --file frames.jsonl
+    FB_STREAM_URL=ws://127.0.0.1:8765/stream FB_QUOTE_STREAM_IN_PROCESS=1 python manage.py runserver
+
+Each line of the frames file is one message object or a list of them.
+Without a file, a synthetic random walk over a few tickers is played.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+
+from aiohttp import web
+
+
+def load_frames(path: str) -> List[List[Dict[str, Any]]]:
+    frames: List[List[Dict[str, Any]]] = []
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            frames.append(item if isinstance(item, list) else [item])
+    return frames
+
+
+def synthetic_frames(symbols: Sequence[str], n: int = 500, seed: int = 0) -> List[List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    px = {sym: 100.0 + 50.0 * i for i, sym in enumerate(symbols)}
+    frames = []
+    for _ in range(n):
+        frame = []
+        for sym in symbols:
+            px[sym] *= 1.0 + rng.gauss(0.0, 0.0005)
+            spread = px[sym] * 0.0002
+            frame.append({"T": "q", "S": sym, "bp": round(px[sym] - spread, 2), "ap": round(px[sym] + spread, 2)})
+            frame.append({"T": "t", "S": sym, "p": round(px[sym], 2)})
+        frames.append(frame)
+    return frames
+
+
+class ReplayFeedServer:
+    """
+    Replays ``frames`` every ``interval_s`` to each authenticated client,
+    looping when ``loop`` is set. ``start()`` serves from a background thread
+    and returns the ws:// URL.
+    """
+
+    def __init__(
+        self,
+        frames: List[List[Dict[str, Any]]],
+        interval_s: float = 0.05,
+        loop: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.frames = frames
+        self.interval_s = float(interval_s)
+        self.loop = loop
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        await ws.send_json([{"T": "success", "msg": "connected"}])
+        subscribed: set = set()
+        authed = False
+        player: Optional[asyncio.Task] = None
+        try:
+            async for frame in ws:
+                msg = json.loads(frame.data)
+                action = msg.get("action")
+                if action == "auth":
+                    authed = True
+                    await ws.send_json([{"T": "success", "msg": "authenticated"}])
+                elif action == "subscribe" and authed:
+                    subscribed.update(s.upper() for s in list(msg.get("trades") or []) + list(msg.get("quotes") or []))
+                    await ws.send_json([{"T": "subscription", "trades": sorted(subscribed), "quotes": sorted(subscribed)}])
+                    if player is None:
+                        player = asyncio.ensure_future(self._play(ws, subscribed))
+                else:
+                    await ws.send_json([{"T": "error", "code": 401, "msg": "not authenticated"}])
+        finally:
+            if player is not None:
+                player.cancel()
+        return ws
+
+    async def _play(self, ws: web.WebSocketResponse, subscribed: set) -> None:
+        while True:
+            for frame in self.frames:
+                out = [m for m in frame if str(m.get("S", "")).upper() in subscribed]
+                if out:
+                    await ws.send_json(out)
+                await asyncio.sleep(self.interval_s)
+            if not self.loop:
+                return
+
+    async def _serve(self) -> None:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> str:
+        self._event_loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._event_loop.run_forever, name="replay-feed", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._event_loop).result(10)
+        return self.url
+
+    def stop(self) -> None:
+        if self._event_loop is None:
+            return
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._event_loop).result(10)
+        self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+        self._event_loop.close()
+        self._event_loop = None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded quote feed over a local websocket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", help="JSON-lines file of stream frames")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between frames")
+    parser.add_argument("--symbols", default="AAPL,MSFT,NVDA,SPY", help="tickers for the synthetic feed")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.file) if args.file else synthetic_frames(args.symbols.upper().split(","))
+    server = ReplayFeedServer(frames, interval_s=args.interval)
+    web.run_app(server.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import json
+import math
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from .data_sources import MarketDataSource, normalize_symbols
+
+SECTIONS = ("spots", "dividend_yields", "daily_closes", "crypto_spots", "crypto_daily_closes")
+
+
+@dataclass
+class MarketFixture:
+    """
+    Recorded provider responses, keyed by section then upper-cased symbol.
+
+    Stored as JSON (everything in one readable file) or NPZ (one array per
+    ``"<section>:<SYMBOL>"`` key, so long close histories load without
+    parsing). A missing dividend yield is null in JSON and NaN in NPZ.
+    """
+
+    spots: Dict[str, float] = field(default_factory=dict)
+    dividend_yields: Dict[str, Optional[float]] = field(default_factory=dict)
+    daily_closes: Dict[str, List[float]] = field(default_factory=dict)
+    crypto_spots: Dict[str, float] = field(default_factory=dict)
+    crypto_daily_closes: Dict[str, List[float]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "MarketFixture":
+        path = Path(path)
+        fixture = cls()
+        if path.suffix == ".npz":
+            with np.load(path) as npz:
+                for key in npz.files:
+                    section, _, sym = key.partition(":")
+                    if section not in SECTIONS or not sym:
+                        continue
+                    arr = npz[key]
+                    if section.endswith("daily_closes"):
+                        value: Any = arr.astype(float).tolist()
+                    else:
+                        value = float(arr)
+                        if section == "dividend_yields" and math.isnan(value):
+                            value = None
+                    getattr(fixture, section)[sym] = value
+            return fixture
+        with open(path) as fh:
+            raw = json.load(fh)
+        if not isinstance(raw, dict):
+            raise ValueError(f"{path}: fixture must be a JSON object")
+        for section in SECTIONS:
+            values = raw.get(section) or {}
+            getattr(fixture, section).update({str(k).upper(): v for k, v in values.items()})
+        return fixture
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".npz":
+            arrays: Dict[str, np.ndarray] = {}
+            for section in SECTIONS:
+                for sym, value in getattr(self, section).items():
+                    if value is None:
+                        value = math.nan
+                    arrays[f"{section}:{sym}"] = np.asarray(value, dtype=float)
+            np.savez_compressed(path, **arrays)
+        else:
+            with open(path, "w") as fh:
+                json.dump({section: getattr(self, section) for section in SECTIONS}, fh, indent=1, sort_keys=True)
+        return path
+
+
+class ReplayDataSource(MarketDataSource):
+    """
+    Serves a MarketFixture, for offline tests and reproducible benchmarks.
+
+    Every call sleeps ``latency_s`` plus up to ``jitter_s`` and then fails
+    with probability ``error_rate`` (RuntimeError, like an upstream error);
+    both are drawn from a ``seed``-ed RNG so runs repeat. A batch get_spots
+    is one call, as with a multi-symbol endpoint, and returns nothing if its
+    latency exceeds ``deadline_s``. Symbols that were not recorded raise
+    RuntimeError.
+
+    With ``crypto=True`` get_spot/get_daily_closes read the crypto sections,
+    so the source can stand in for AlpacaCryptoDataSource;
+    get_crypto_spot/get_crypto_daily_closes always do.
+    """
+
+    def __init__(
+        self,
+        fixture: Union[MarketFixture, str, Path],
+        latency_s: float = 0.0,
+        jitter_s: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = 0,
+        crypto: bool = False,
+        sleep=time.sleep,
+    ):
+        self.fixture = fixture if isinstance(fixture, MarketFixture) else MarketFixture.load(fixture)
+        self.latency_s = float(latency_s)
+        self.jitter_s = float(jitter_s)
+        self.error_rate = float(error_rate)
+        self.crypto = crypto
+        self.provider_name = "replay-crypto" if crypto else "replay"
+        self.calls = 0
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ReplayDataSource":
+        """Built from FB_REPLAY_FIXTURE, FB_REPLAY_LATENCY_MS, FB_REPLAY_JITTER_MS, FB_REPLAY_ERROR_RATE, FB_REPLAY_SEED."""
+        path = os.getenv("FB_REPLAY_FIXTURE")
+        if not path:
+            raise RuntimeError("FB_REPLAY_FIXTURE is not set")
+        return cls(
+            path,
+            latency_s=float(os.getenv("FB_REPLAY_LATENCY_MS", "0")) / 1000.0,
+            jitter_s=float(os.getenv("FB_REPLAY_JITTER_MS", "0")) / 1000.0,
+            error_rate=float(os.getenv("FB_REPLAY_ERROR_RATE", "0")),
+            seed=int(os.getenv("FB_REPLAY_SEED", "0")),
+        )
+
+    def _call(self, what: str, deadline_s: Optional[float] = None) -> bool:
+        """Inject latency and errors for one call; False when the deadline ran out first."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_s + (self._rng.uniform(0.0, self.jitter_s) if self.jitter_s > 0 else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if deadline_s is not None and delay > deadline_s:
+            self._sleep(max(0.0, deadline_s))
+            return False
+        if delay > 0:
+            self._sleep(delay)
+        if fail:
+            raise RuntimeError(f"Replay injected error for {what}")
+        return True
+
+    @staticmethod
+    def _lookup(values: Dict[str, Any], symbol: str, what: str) -> Any:
+        sym = (symbol or "").strip().upper()
+        if not sym:
+            raise ValueError("symbol is required")
+        if sym not in values:
+            raise RuntimeError(f"No recorded {what} for {sym}")
+        return values[sym]
+
+    def _spots(self, crypto: bool) -> Dict[str, float]:
+        return self.fixture.crypto_spots if crypto else self.fixture.spots
+
+    def _closes(self, crypto: bool) -> Dict[str, List[float]]:
+        return self.fixture.crypto_daily_closes if crypto else self.fixture.daily_closes
+
+    def get_spot(self, symbol: str) -> float:
+        self._call(f"get_spot {symbol}")
+        return float(self._lookup(self._spots(self.crypto), symbol, "spot"))
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        syms = normalize_symbols(symbols)
+        if not syms or not self._call("get_spots", deadline_s):
+            return {}
+        spots = self._spots(self.crypto)
+        return {sym: float(spots[sym]) for sym in syms if sym in spots}
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        self._call(f"get_daily_closes {symbol}")
+        closes = self._lookup(self._closes(self.crypto), symbol, "daily closes")
+        return [float(c) for c in closes][-int(need):]
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        self._call(f"get_dividend_yield {symbol}")
+        return self.fixture.dividend_yields.get((symbol or "").strip().upper())
+
+    def get_crypto_spot(self, symbol: str) -> float:
+        self._call(f"get_crypto_spot {symbol}")
+        return float(self._lookup(self.fixture.crypto_spots, symbol, "crypto spot"))
+
+    def get_crypto_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        self._call(f"get_crypto_daily_closes {symbol}")
+        closes = self._lookup(self.fixture.crypto_daily_closes, symbol, "crypto daily closes")
+        return [float(c) for c in closes][-int(need):]
+
+
+class RecordingDataSource(MarketDataSource):
+    """
+    Passes calls through to a live source and records every successful
+    response into ``fixture`` (the longest close history seen per symbol is
+    kept). With ``crypto=True`` responses go to the crypto sections. Save the
+    result with ``fixture.save(path)`` and replay it with ReplayDataSource.
+    """
+
+    def __init__(self, source: MarketDataSource, fixture: Optional[MarketFixture] = None, crypto: bool = False):
+        self.source = source
+        self.fixture = fixture if fixture is not None else MarketFixture()
+        self.crypto = crypto
+        self.provider_name = getattr(source, "provider_name", None) or type(source).__name__
+        self._lock = threading.Lock()
+
+    def _record_spots(self, prices: Dict[str, float]) -> None:
+        target = self.fixture.crypto_spots if self.crypto else self.fixture.spots
+        with self._lock:
+            target.update({sym.upper(): float(px) for sym, px in prices.items()})
+
+    def _record_closes(self, symbol: str, closes: List[float]) -> None:
+        target = self.fixture.crypto_daily_closes if self.crypto else self.fixture.daily_closes
+        sym = symbol.strip().upper()
+        with self._lock:
+            if len(closes) >= len(target.get(sym, ())):
+                target[sym] = [float(c) for c in closes]
+
+    def get_spot(self, symbol: str) -> float:
+        px = float(self.source.get_spot(symbol))
+        self._record_spots({symbol: px})
+        return px
+
+    def get_spots(self, symbols: Iterable[str], deadline_s: Optional[float] = None) -> Dict[str, float]:
+        prices = self.source.get_spots(symbols, deadline_s)
+        self._record_spots(prices)
+        return prices
+
+    def get_daily_closes(self, symbol: str, need: int = 252) -> List[float]:
+        closes = list(self.source.get_daily_closes(symbol, need=need))
+        self._record_closes(symbol, closes)
+        return closes
+
+    def get_dividend_yield(self, symbol: str) -> Optional[float]:
+        y = self.source.get_dividend_yield(symbol)
+        with self._lock:
+            self.fixture.dividend_yields[symbol.strip().upper()] = None if y is None else float(y)
+        return y
@@ -1,3 +1,1564 @@
-from django.test import TestCase
+import asyncio
+import json
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+import numpy as np
+
+from .async_data_sources import AsyncCombinedDataSource, AsyncMarketDataSource, ThreadedAsyncDataSource, gather_with_deadline
+from . import bar_store, calculator, monte_carlo, views
+from .bar_store import BarStoreDataSource, DailyBarStore
+from .cache import (
+    AsyncCachedMarketDataSource,
+    CacheEntry,
+    CacheStats,
+    CachedMarketDataSource,
+    DjangoCacheBackend,
+    InMemoryCacheBackend,
+    clear_market_data_cache,
+    decode_entry,
+    encode_entry,
+    seconds_until_market_close,
+)
+from .calculator import (
+    BAWAmericanOptionCalculator,
+    BatchImpliedVolatilityCalculator,
+    BinomialTreeAmericanOptionCalculator,
+    BSTerms,
+    GreeksCalculator,
+    ConstantVolatilityCalculator,
+    CrankNicolsonAmericanOptionCalculator,
+    FundamentalsDividendYieldCalculator,
+    HistoricalVolatilityCalculator,
+    RiskFreeRateCalculator,
+    SpotPriceCalculator,
+    VariablesAssembler,
+    YearFractionCalculator,
+    american_calculator,
+)
+from .data_sources import AlpacaDataSource, CombinedDataSource, LazyDataSource, MarketDataSource
+from .fanout import fan_out
+from .http_client import async_http_get, close_async_sessions, get_session, http_get, reset_sessions
+from .market_context import MarketContext
+from .monte_carlo import LongstaffSchwartzCalculator
+from .pipeline import PricingPipeline
+from .provider_health import (
+    CircuitOpenError,
+    ProviderHealth,
+    ProviderUnavailableError,
+    SymbolError,
+    UpstreamHTTPError,
+)
+from .quote_stream import QuoteBook, QuoteStream
+from .registry import get_async_market_data_source, get_market_data_source, reset_market_data_source
+from .replay_feed import ReplayFeedServer
+from .replay_source import MarketFixture, RecordingDataSource, ReplayDataSource
+from .single_flight import SingleFlight
+from .views import american_chain_api, american_price_api, american_price_api_async, euro_chain_api, euro_price_api, euro_price_api_async, greeks_surface_api
+
+
+class FakeDataSource(MarketDataSource):
+    def __init__(self, spot: float = 100.0, dividend_yield: float = 0.01):
+        self.spot = spot
+        self.dividend_yield = dividend_yield
+        self.calls = []
+
+    def get_spot(self, symbol: str) -> float:
+        self.calls.append(("get_spot", symbol))
+        return self.spot
+
+    def get_daily_closes(self, symbol: str, need: int = 252):
+        self.calls.append(("get_daily_closes", symbol))
+        return [self.spot * (1.0 + 0.01 * ((i % 5) - 2)) for i in range(need)]
+
+    def get_dividend_yield(self, symbol: str):
+        self.calls.append(("get_dividend_yield", symbol))
+        return self.dividend_yield
+
+
+class GreeksBatchTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 200
+        self.S = rng.uniform(20.0, 300.0, n)
+        self.K = self.S * rng.uniform(0.5, 1.5, n)
+        self.r = rng.uniform(0.0, 0.08, n)
+        self.q = rng.uniform(0.0, 0.05, n)
+        self.sigma = rng.uniform(0.05, 1.5, n)
+        self.T = rng.uniform(1.0 / 365.0, 3.0, n)
+        self.side = np.where(rng.random(n) < 0.5, "CALL", "PUT")
+
+    def test_batch_matches_scalar(self):
+        calc = GreeksCalculator()
+        batch = calc.compute_batch(self.S, self.K, self.r, self.q, self.sigma, self.T, self.side)
+        for i in range(len(self.S)):
+            scalar = calc.compute(
+                self.S[i], self.K[i], self.r[i], self.q[i], self.sigma[i], self.T[i], str(self.side[i])
+            )
+            for key, val in scalar.items():
+                self.assertAlmostEqual(batch[key][i], val, delta=1e-10, msg=f"{key}[{i}]")
+
+    def test_batch_broadcasts_scalar_side(self):
+        out = GreeksCalculator().compute_batch(100.0, np.array([90.0, 100.0, 110.0]), 0.05, 0.0, 0.2, 0.5, "call")
+        self.assertEqual(out["fair_value"].shape, (3,))
+        self.assertTrue(np.all(np.diff(out["fair_value"]) < 0))
+
+    def test_batch_rejects_bad_inputs(self):
+        calc = GreeksCalculator()
+        with self.assertRaises(ValueError):
+            calc.compute_batch([100.0, -1.0], 100.0, 0.05, 0.0, 0.2, 0.5, "CALL")
+        with self.assertRaises(ValueError):
+            calc.compute_batch(100.0, 100.0, 0.05, 0.0, 0.2, 0.5, "STRADDLE")
+
+
+class BAWBatchTests(SimpleTestCase):
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(11)
+        n = 300
+        S = rng.uniform(20.0, 300.0, n)
+        K = S * rng.uniform(0.5, 1.5, n)
+        r = rng.uniform(0.0, 0.1, n)
+        q = rng.choice([0.0, 0.01, 0.03, 0.08], n)
+        sigma = rng.uniform(0.05, 1.0, n)
+        T = rng.uniform(1.0 / 365.0, 3.0, n)
+        side = np.where(rng.random(n) < 0.5, "CALL", "PUT")
+
+        calc = BAWAmericanOptionCalculator()
+        batch = calc.compute_batch(S, K, r, q, sigma, T, side)
+        for i in range(n):
+            scalar = calc.compute(S[i], K[i], r[i], q[i], sigma[i], T[i], str(side[i]))
+            for key, val in scalar.items():
+                if val is None:
+                    self.assertTrue(math.isnan(batch[key][i]), f"{key}[{i}]")
+                else:
+                    self.assertAlmostEqual(batch[key][i], val, delta=1e-8, msg=f"{key}[{i}]")
+
+    def test_zero_dividend_call_has_no_premium(self):
+        out = BAWAmericanOptionCalculator().compute_batch(100.0, [90.0, 110.0], 0.05, 0.0, 0.3, 1.0, "CALL")
+        np.testing.assert_array_equal(out["american_price"], out["european_price"])
+        self.assertTrue(np.all(np.isnan(out["critical_price"])))
+
+
+class BinomialTreeTests(SimpleTestCase):
+    def reference(self, S, K, r, q, sigma, T, side):
+        import QuantLib as ql
+
+        today = ql.Date(2, 1, 2024)
+        ql.Settings.instance().evaluationDate = today
+        expiry = today + int(round(T * 365))
+        dc = ql.Actual365Fixed()
+        process = ql.BlackScholesMertonProcess(
+            ql.QuoteHandle(ql.SimpleQuote(S)),
+            ql.YieldTermStructureHandle(ql.FlatForward(today, q, dc)),
+            ql.YieldTermStructureHandle(ql.FlatForward(today, r, dc)),
+            ql.BlackVolTermStructureHandle(ql.BlackConstantVol(today, ql.NullCalendar(), sigma, dc)),
+        )
+        payoff = ql.PlainVanillaPayoff(ql.Option.Call if side == "CALL" else ql.Option.Put, K)
+        option = ql.VanillaOption(payoff, ql.AmericanExercise(today, expiry))
+        option.setPricingEngine(ql.BinomialVanillaEngine(process, "lr", 4001))
+        return option.NPV()
+
+    def test_matches_fine_quantlib_tree(self):
+        # Long-dated and high-rate puts are where BAW drifts furthest.
+        for S, K, r, q, sigma, T, side in [
+            (100.0, 110.0, 0.08, 0.0, 0.2, 3.0, "PUT"),
+            (100.0, 100.0, 0.05, 0.02, 0.3, 1.0, "PUT"),
+            (100.0, 90.0, 0.03, 0.05, 0.25, 2.0, "CALL"),
+        ]:
+            out = BinomialTreeAmericanOptionCalculator().compute(S, K, r, q, sigma, T, side)
+            self.assertAlmostEqual(out["american_price"], self.reference(S, K, r, q, sigma, T, side), delta=5e-3)
+            self.assertGreaterEqual(out["early_exercise_premium"], 0.0)
+            self.assertIsNone(out["critical_price"])
+
+    def test_richardson_beats_single_run(self):
+        args = (100.0, 110.0, 0.08, 0.0, 0.2, 3.0, "PUT")
+        ref = self.reference(*args)
+        plain = BinomialTreeAmericanOptionCalculator(steps=101, richardson=False).tree_price(*args)
+        extrapolated = BinomialTreeAmericanOptionCalculator(steps=101).tree_price(*args)
+        self.assertLess(abs(extrapolated - ref), abs(plain - ref))
+
+    def test_zero_dividend_call_is_european(self):
+        out = BinomialTreeAmericanOptionCalculator().compute(100.0, 95.0, 0.05, 0.0, 0.3, 1.0, "CALL")
+        self.assertEqual(out["american_price"], out["european_price"])
+        self.assertEqual(out["early_exercise_premium"], 0.0)
+
+    def test_crr_and_lr_agree(self):
+        args = (50.0, 55.0, 0.06, 0.01, 0.35, 0.75, "PUT")
+        lr = american_calculator("lr").compute(*args)["american_price"]
+        crr = american_calculator("crr").compute(*args)["american_price"]
+        self.assertAlmostEqual(lr, crr, delta=5e-3)
+
+    def test_engine_registry(self):
+        self.assertIsInstance(american_calculator("baw"), BAWAmericanOptionCalculator)
+        self.assertEqual(american_calculator(" LR ").method, "LR")
+        with self.assertRaises(ValueError):
+            american_calculator("trinomial")
+        with self.assertRaises(ValueError):
+            BinomialTreeAmericanOptionCalculator(steps=1, method="CRR").compute(100.0, 100.0, 0.9, 0.0, 0.05, 5.0, "PUT")
+
+    def test_price_view_selects_engine(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        params = {"symbol": "AAPL", "strike": "100", "side": "PUT", "expiry": (date.today() + timedelta(days=60)).isoformat()}
+        with mock.patch("eurocalc.views.get_market_data_source", return_value=FakeDataSource()):
+            resp = american_price_api(RequestFactory().get("/api/american/price/", dict(params, engine="lr")))
+            bad = american_price_api(RequestFactory().get("/api/american/price/", dict(params, engine="nope")))
+        self.assertEqual(resp.status_code, 200)
+        body = json.loads(resp.content)
+        self.assertEqual(body["engine"], "lr")
+        v = body["inputs"]
+        tree = BinomialTreeAmericanOptionCalculator().compute(v["S"], v["K"], v["r"], v["q"], v["sigma"], v["T"], "PUT")
+        self.assertAlmostEqual(body["american_result"]["american_price"], tree["american_price"], places=10)
+        self.assertEqual(bad.status_code, 400)
+
+
+class CrankNicolsonTests(SimpleTestCase):
+    CASES = [
+        (100.0, 110.0, 0.08, 0.0, 0.2, 3.0, "PUT"),
+        (100.0, 100.0, 0.05, 0.02, 0.3, 1.0, "PUT"),
+        (100.0, 90.0, 0.03, 0.05, 0.25, 2.0, "CALL"),
+    ]
+
+    def test_matches_tree(self):
+        for args in self.CASES:
+            fd = CrankNicolsonAmericanOptionCalculator().compute(*args)
+            tree = BinomialTreeAmericanOptionCalculator().compute(*args)
+            self.assertAlmostEqual(fd["american_price"], tree["american_price"], delta=1e-2)
+            self.assertGreater(fd["early_exercise_premium"], 0.0)
+
+    def test_greeks_match_black_scholes_without_early_exercise(self):
+        args = (100.0, 95.0, 0.05, 0.0, 0.3, 1.0, "CALL")
+        fd = CrankNicolsonAmericanOptionCalculator().compute(*args)
+        bs = GreeksCalculator().compute(*args)
+        self.assertAlmostEqual(fd["american_price"], bs["fair_value"], delta=1e-3)
+        self.assertAlmostEqual(fd["delta"], bs["delta"], delta=1e-3)
+        self.assertAlmostEqual(fd["gamma"], bs["gamma"], delta=1e-4)
+        self.assertAlmostEqual(fd["theta"], bs["theta"], delta=5e-2)
+        self.assertIsNone(fd["critical_price"])
+
+    def test_put_delta_and_boundary(self):
+        S, K, r, q, sigma, T, side = self.CASES[0]
+        fd = CrankNicolsonAmericanOptionCalculator().compute(S, K, r, q, sigma, T, side)
+        bump = 0.5
+        up = BinomialTreeAmericanOptionCalculator().tree_price(S + bump, K, r, q, sigma, T, side)
+        down = BinomialTreeAmericanOptionCalculator().tree_price(S - bump, K, r, q, sigma, T, side)
+        self.assertAlmostEqual(fd["delta"], (up - down) / (2.0 * bump), delta=5e-3)
+        self.assertLess(fd["critical_price"], K)
+        # Deep below the boundary the put is worth exactly its intrinsic value.
+        solution = CrankNicolsonAmericanOptionCalculator().solve(S, K, r, q, sigma, T, side)
+        deep = solution.spots < 0.9 * fd["critical_price"]
+        np.testing.assert_allclose(solution.values[-1, deep], K - solution.spots[deep])
+
+    def test_layers_are_shorter_expiries(self):
+        args = self.CASES[1]
+        solution = CrankNicolsonAmericanOptionCalculator(time_steps=120).solve(*args, layers=4)
+        np.testing.assert_allclose(solution.taus, [0.25, 0.5, 0.75, 1.0])
+        S, K, r, q, sigma, _T, side = args
+        half = solution.on(S)["fair_value"][1, 0]
+        tree = BinomialTreeAmericanOptionCalculator().compute(S, K, r, q, sigma, 0.5, side)
+        self.assertAlmostEqual(half, tree["american_price"], delta=1e-2)
+
+    def test_factored_solver_matches_dense_solve(self):
+        n = 120
+        rng = np.random.default_rng(3)
+        rhs = rng.uniform(0.0, 10.0, n)
+        for sub, diag, sup in ((-0.9, 2.9, -1.1), (-20.0, 41.0, -20.5)):
+            A = np.diag(np.full(n, diag)) + np.diag(np.full(n - 1, sub), -1) + np.diag(np.full(n - 1, sup), 1)
+            solver = calculator._BrennanSchwartz(sub, diag, sup, n)
+            np.testing.assert_allclose(solver.solve(rhs, np.full(n, -np.inf)), np.linalg.solve(A, rhs), rtol=1e-10)
+            floor = np.linalg.solve(A, rhs) + np.linspace(-1.0, 1.0, n)
+            self.assertTrue(np.all(solver.solve(rhs, floor) >= floor))
+
+    def test_price_view_engine(self):
+        self.assertIsInstance(american_calculator("cn"), CrankNicolsonAmericanOptionCalculator)
+        with self.assertRaises(ValueError):
+            CrankNicolsonAmericanOptionCalculator().solve(100.0, 100.0, 0.05, 0.0, 0.2, 1.0, "STRADDLE")
+
+
+class LongstaffSchwartzTests(SimpleTestCase):
+    ARGS = (100.0, 100.0, 0.05, 0.02, 0.3, 1.0, "PUT")
+
+    def calc(self, **kwargs):
+        kwargs = {"paths": 40_000, "chunk_paths": 10_000, "pilot_paths": 10_000, "workers": 1, **kwargs}
+        return LongstaffSchwartzCalculator(**kwargs)
+
+    def test_american_put_near_tree(self):
+        out = self.calc().compute(*self.ARGS)
+        tree = BinomialTreeAmericanOptionCalculator().compute(*self.ARGS)
+        # Discrete exercise dates and a fitted rule price slightly low.
+        self.assertAlmostEqual(out["american_price"], tree["american_price"], delta=0.1)
+        self.assertEqual(out["european_price"], GreeksCalculator().compute(*self.ARGS)["fair_value"])
+        self.assertGreater(out["standard_error"], 0.0)
+        self.assertEqual(out["paths"], 40_000)
+
+    def test_european_within_standard_errors(self):
+        out = self.calc(exercise="european").compute(*self.ARGS)
+        exact = GreeksCalculator().compute(*self.ARGS)["fair_value"]
+        self.assertLess(abs(out["european_price"] - exact), 4.0 * out["standard_error"])
+        self.assertEqual(out["american_price"], out["european_price"])
+        self.assertEqual(out["early_exercise_premium"], 0.0)
+        self.assertEqual(out["exercise_dates"], 0)
+        american = self.calc().compute(*self.ARGS)
+        self.assertEqual(sorted(out), sorted(american))
+        self.assertLessEqual(set(BinomialTreeAmericanOptionCalculator().compute(*self.ARGS)), set(out))
+
+    def test_variance_reduction(self):
+        plain = self.calc(antithetic=False, control_variate=False).compute(*self.ARGS)
+        reduced = self.calc().compute(*self.ARGS)
+        self.assertLess(reduced["standard_error"], 0.6 * plain["standard_error"])
+
+    def test_seeded_and_independent_of_workers(self):
+        one = self.calc(paths=8_000, chunk_paths=2_000, pilot_paths=2_000).compute(*self.ARGS)
+        again = self.calc(paths=8_000, chunk_paths=2_000, pilot_paths=2_000).compute(*self.ARGS)
+        pooled = self.calc(paths=8_000, chunk_paths=2_000, pilot_paths=2_000, workers=2).compute(*self.ARGS)
+        other = self.calc(paths=8_000, chunk_paths=2_000, pilot_paths=2_000, seed=1).compute(*self.ARGS)
+        self.assertEqual(one, again)
+        self.assertEqual(one, pooled)
+        self.assertNotEqual(one["american_price"], other["american_price"])
+        # Pooled runs reuse the one process-wide pool rather than their own.
+        pool = monte_carlo.get_process_pool()
+        self.calc(paths=8_000, chunk_paths=2_000, pilot_paths=2_000, workers=2).compute(*self.ARGS)
+        self.assertIs(monte_carlo.get_process_pool(), pool)
+        self.assertGreaterEqual(monte_carlo.warm_process_pool(), 1)
+
+    def test_chunks_bound_memory(self):
+        calc = self.calc(paths=1_000_001, chunk_paths=25_000)
+        sizes = calc._chunk_sizes()
+        self.assertLessEqual(max(sizes), 25_000)
+        self.assertGreaterEqual(sum(sizes), 1_000_001)
+        self.assertTrue(all(n % 2 == 0 for n in sizes))
+
+    def test_engine_and_validation(self):
+        self.assertIsInstance(american_calculator("lsm"), LongstaffSchwartzCalculator)
+        with self.assertRaises(ValueError):
+            LongstaffSchwartzCalculator(exercise="bermudan")
+        with self.assertRaises(ValueError):
+            self.calc().compute(100.0, 100.0, 0.05, 0.0, -0.2, 1.0, "PUT")
+
+
+class BatchImpliedVolatilityTests(SimpleTestCase):
+    def test_round_trip(self):
+        rng = np.random.default_rng(5)
+        n = 500
+        S = rng.uniform(20.0, 300.0, n)
+        K = S * rng.uniform(0.7, 1.3, n)
+        r = rng.uniform(0.0, 0.08, n)
+        q = rng.uniform(0.0, 0.04, n)
+        sigma = rng.uniform(0.1, 1.5, n)
+        T = rng.integers(7, 730, n) / 365.0
+        side = np.where(rng.random(n) < 0.5, "CALL", "PUT")
+        prices = GreeksCalculator().compute_batch(S, K, r, q, sigma, T, side)["fair_value"]
+
+        out = BatchImpliedVolatilityCalculator(use_fallback=False).compute_batch(prices, S, K, r, q, T, side)
+        self.assertTrue(out["converged"].all())
+        self.assertFalse(out["used_fallback"].any())
+        repriced = GreeksCalculator().compute_batch(S, K, r, q, out["sigma"], T, side)["fair_value"]
+        np.testing.assert_allclose(repriced, prices, atol=1e-8)
+        atm = np.abs(np.log(S / K)) < 0.1
+        np.testing.assert_allclose(out["sigma"][atm], sigma[atm], atol=1e-8)
+
+    def test_unattainable_price_is_flagged(self):
+        out = BatchImpliedVolatilityCalculator(use_fallback=False).compute_batch(
+            [5.0, 150.0], 100.0, 100.0, 0.03, 0.0, 0.5, "CALL"
+        )
+        np.testing.assert_array_equal(out["converged"], [True, False])
+        self.assertTrue(np.isnan(out["sigma"][1]))
+
+
+class ChainApiTests(SimpleTestCase):
+    def setUp(self):
+        clear_market_data_cache()
+        self.ds = FakeDataSource()
+        patcher = mock.patch("eurocalc.views.get_market_data_source", return_value=self.ds)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.expiries = [date.today() + timedelta(days=30), date.today() + timedelta(days=90)]
+        self.params = {
+            "symbol": "aapl",
+            "strikes": "90,100,110",
+            "expiries": ",".join(e.isoformat() for e in self.expiries),
+            "constant_vol": "0.25",
+        }
+
+    def test_euro_chain_fetches_inputs_once(self):
+        resp = euro_chain_api(RequestFactory().get("/api/euro/chain/", self.params))
+        self.assertEqual(resp.status_code, 200)
+        body = json.loads(resp.content)
+        self.assertEqual(len(body["contracts"]), 12)
+        self.assertEqual([c for c, _ in self.ds.calls], ["get_spot", "get_dividend_yield"])
+
+        row = body["contracts"][-1]
+        scalar = GreeksCalculator().compute(100.0, row["strike"], row["r"], 0.01, 0.25, row["T"], row["side"])
+        self.assertAlmostEqual(row["fair_value"], scalar["fair_value"], places=10)
+
+    def test_american_chain_reports_baw_columns(self):
+        params = dict(self.params, side="PUT")
+        resp = american_chain_api(RequestFactory().get("/api/american/chain/", params))
+        self.assertEqual(resp.status_code, 200)
+        contracts = json.loads(resp.content)["contracts"]
+        self.assertEqual(len(contracts), 6)
+        for row in contracts:
+            self.assertEqual(row["side"], "PUT")
+            self.assertGreaterEqual(row["american_price"], row["european_price"])
+
+    def test_bad_parameters(self):
+        resp = euro_chain_api(RequestFactory().get("/api/euro/chain/", {"symbol": "AAPL", "strikes": "100"}))
+        self.assertEqual(resp.status_code, 400)
+
+
+class GreeksSurfaceApiTests(SimpleTestCase):
+    def test_surface_grid(self):
+        inputs = {"S": 100.0, "K": 105.0, "r": 0.04, "q": 0.01, "sigma": 0.3, "T": 0.5, "side": "CALL"}
+        body = json.dumps({"inputs": inputs, "spot_steps": 11, "day_steps": 4, "max_days": 120})
+        resp = greeks_surface_api(RequestFactory().post("/api/euro/surface/", body, content_type="application/json"))
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content)
+        self.assertEqual(len(data["spots"]), 11)
+        self.assertEqual(data["days"], [30.0, 60.0, 90.0, 120.0])
+        gamma = data["surfaces"]["gamma"]
+        self.assertEqual((len(gamma), len(gamma[0])), (4, 11))
+
+        scalar = GreeksCalculator().compute(data["spots"][3], 105.0, 0.04, 0.01, 0.3, 90.0 / 365.0, "CALL")
+        self.assertAlmostEqual(data["surfaces"]["delta"][2][3], scalar["delta"], places=10)
+
+    def test_american_surface_from_one_solve(self):
+        inputs = {"S": 100.0, "K": 105.0, "r": 0.06, "q": 0.0, "sigma": 0.3, "T": 0.5, "side": "PUT"}
+        body = {"inputs": inputs, "spot_steps": 11, "day_steps": 4, "max_days": 120}
+        post = lambda b: greeks_surface_api(
+            RequestFactory().post("/api/euro/surface/", json.dumps(b), content_type="application/json")
+        )
+        with mock.patch.object(
+            CrankNicolsonAmericanOptionCalculator, "solve", autospec=True, side_effect=CrankNicolsonAmericanOptionCalculator.solve
+        ) as solve:
+            american = json.loads(post(dict(body, exercise="american")).content)
+        self.assertEqual(solve.call_count, 1)
+        european = json.loads(post(body).content)
+        self.assertEqual(sorted(american["surfaces"]), ["delta", "fair_value", "gamma", "theta"])
+
+        am, eu = np.array(american["surfaces"]["fair_value"]), np.array(european["surfaces"]["fair_value"])
+        self.assertEqual(am.shape, (4, 11))
+        self.assertTrue(np.all(am >= eu - 1e-2))
+        tree = BinomialTreeAmericanOptionCalculator().compute(american["spots"][3], 105.0, 0.06, 0.0, 0.3, 90.0 / 365.0, "PUT")
+        self.assertAlmostEqual(am[2, 3], tree["american_price"], delta=2e-2)
+        self.assertEqual(post(dict(body, exercise="bermudan")).status_code, 400)
+
+    def test_missing_inputs(self):
+        resp = greeks_surface_api(RequestFactory().post("/api/euro/surface/", "{}", content_type="application/json"))
+        self.assertEqual(resp.status_code, 400)
+
+
+class CachedMarketDataSourceTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.ds = FakeDataSource()
+        self.stats = CacheStats()
+        self.cached = CachedMarketDataSource(
+            self.ds,
+            backend=InMemoryCacheBackend(),
+            stats=self.stats,
+            spot_ttl_s=5,
+            spot_grace_s=30,
+            clock=lambda: self.now,
+        )
+
+    def test_spot_ttl_and_counters(self):
+        self.assertEqual(self.cached.get_spot("aapl"), 100.0)
+        self.assertEqual(self.cached.get_spot("AAPL"), 100.0)
+        self.assertEqual(len(self.ds.calls), 1)
+        self.now += 60
+        self.cached.get_spot("AAPL")
+        self.assertEqual(len(self.ds.calls), 2)
+        self.assertEqual(self.stats.snapshot()["get_spot"]["hits"], 1)
+        self.assertEqual(self.stats.snapshot()["get_spot"]["misses"], 2)
+
+    def test_stale_value_served_while_refreshing(self):
+        self.cached.get_spot("AAPL")
+        self.ds.spot = 101.0
+        self.now += 10
+        with mock.patch("eurocalc.cache._get_refresh_pool") as pool:
+            pool.return_value.submit.side_effect = lambda fn: fn()
+            self.assertEqual(self.cached.get_spot("AAPL"), 100.0)
+        self.assertEqual(self.cached.get_spot("AAPL"), 101.0)
+        counts = self.stats.snapshot()["get_spot"]
+        self.assertEqual((counts["stale_hits"], counts["refreshes"], counts["hits"]), (1, 1, 1))
+
+    def test_errors_are_not_cached(self):
+        with mock.patch.object(self.ds, "get_dividend_yield", side_effect=RuntimeError("down")):
+            with self.assertRaises(RuntimeError):
+                self.cached.get_dividend_yield("AAPL")
+        self.assertEqual(self.cached.get_dividend_yield("AAPL"), 0.01)
+        self.assertEqual(self.stats.snapshot()["get_dividend_yield"]["errors"], 1)
+
+    def test_seconds_until_market_close(self):
+        from datetime import datetime
+        from zoneinfo import ZoneInfo
+
+        et = ZoneInfo("America/New_York")
+        self.assertEqual(seconds_until_market_close(datetime(2026, 10, 16, 15, 0, tzinfo=et)), 3600.0)
+        friday_after_close = datetime(2026, 10, 16, 17, 0, tzinfo=et)
+        self.assertEqual(seconds_until_market_close(friday_after_close), (2 * 24 + 23) * 3600.0)
+
+
+class DatedFakeDataSource(FakeDataSource):
+    def __init__(self, bars):
+        super().__init__()
+        self.bars = list(bars)
+
+    def get_daily_bars(self, symbol: str, start: date):
+        self.calls.append(("get_daily_bars", start))
+        return [(d, c) for d, c in self.bars if d >= start]
+
+
+class BarStoreDataSourceTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = DailyBarStore(tmp.name)
+        start = date(2025, 1, 1)
+        self.days = [start + timedelta(days=i) for i in range(400)]
+        self.ds = DatedFakeDataSource((d, 100.0 + i) for i, d in enumerate(self.days[:300]))
+        bar_store._checked_sessions.clear()
+
+    def closes(self, session_index: int, need: int = 50):
+        with mock.patch("eurocalc.bar_store.last_completed_session", return_value=self.days[session_index]):
+            return BarStoreDataSource(self.ds, self.store).get_daily_closes("AAPL", need=need)
+
+    def test_initial_load_then_served_from_disk(self):
+        closes = self.closes(299)
+        self.assertEqual(closes[-1], 399.0)
+        self.assertEqual(len(closes), 50)
+        self.assertEqual(len(self.ds.calls), 1)
+
+        self.assertEqual(self.closes(299), closes)
+        self.assertEqual(len(self.ds.calls), 1)
+
+    def test_incremental_backfill(self):
+        self.closes(299)
+        self.ds.bars.extend((d, 400.0 + i) for i, d in enumerate(self.days[300:305]))
+        closes = self.closes(304)
+        self.assertEqual(self.ds.calls[-1], ("get_daily_bars", self.days[299]))
+        self.assertEqual(closes[-5:], [400.0, 401.0, 402.0, 403.0, 404.0])
+        self.assertEqual(self.store.last_date("AAPL"), self.days[304])
+
+    def test_readjusted_history_is_rebuilt(self):
+        self.closes(299)
+        self.ds.bars = [(d, c / 2.0) for d, c in self.ds.bars] + [(self.days[300], 200.0)]
+        self.assertEqual(self.closes(300)[-2:], [199.5, 200.0])
+
+    def test_partial_session_is_not_stored(self):
+        # Mid-session the provider already returns today's (moving) bar.
+        self.ds.bars.append((self.days[300], 248.7))
+        self.closes(299)
+        self.assertEqual(self.store.last_date("AAPL"), self.days[299])
+
+        self.ds.bars[-1] = (self.days[300], 250.0)
+        self.assertEqual(self.closes(300)[-1], 250.0)
+        self.assertEqual(self.ds.calls[-1], ("get_daily_bars", self.days[299]))
+        self.assertEqual(len(self.ds.calls), 2)
+
+    def test_session_check_is_shared_across_instances(self):
+        self.closes(299)
+        self.ds.bars.append((self.days[300], 400.0))
+        self.closes(301)
+        self.closes(301)
+        self.assertEqual(len(self.ds.calls), 2)
+
+    def test_concurrent_backfills_fetch_once(self):
+        fetch = self.ds.get_daily_bars
+        self.ds.get_daily_bars = lambda symbol, start: (time.sleep(0.1), fetch(symbol, start))[1]
+        results = []
+        with mock.patch("eurocalc.bar_store.last_completed_session", return_value=self.days[299]):
+            threads = [
+                threading.Thread(target=lambda: results.append(
+                    BarStoreDataSource(self.ds, DailyBarStore(self.store.root)).get_daily_closes("AAPL", need=50)
+                ))
+                for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(self.ds.calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertNotIsInstance(self.store.read("AAPL"), np.memmap)
+
+    def test_failed_backfill_is_logged_and_stored_bars_served(self):
+        stored = self.closes(299)
+        self.ds.get_daily_bars = mock.Mock(side_effect=UpstreamHTTPError("unavailable", 503))
+        with self.assertLogs("eurocalc.bar_store", "WARNING"):
+            self.assertEqual(self.closes(301), stored)
+
+    def test_falls_back_to_closes_without_bar_support(self):
+        combined = CombinedDataSource(sources=[FakeDataSource()], hedge_delay_s=0, health=ProviderHealth())
+        closes = BarStoreDataSource(combined, self.store).get_daily_closes("AAPL", need=5)
+        self.assertEqual(closes, FakeDataSource().get_daily_closes("AAPL", need=5))
+
+        short = DatedFakeDataSource(self.ds.bars[:10])
+        with mock.patch("eurocalc.bar_store.last_completed_session", return_value=self.days[9]):
+            self.assertEqual(len(BarStoreDataSource(short, self.store).get_daily_closes("MSFT", need=50)), 50)
+
+
+class FlakyUpstream(BaseHTTPRequestHandler):
+    failures_left = 0
+    hits = 0
+    retry_after = None
+
+    def do_GET(self):
+        type(self).hits += 1
+        if type(self).failures_left > 0:
+            type(self).failures_left -= 1
+            self.send_response(503)
+            if type(self).retry_after is not None:
+                self.send_header("Retry-After", type(self).retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'{"price": "1.5"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpClientTests(SimpleTestCase):
+    def setUp(self):
+        reset_sessions()
+        self.addCleanup(reset_sessions)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyUpstream)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/price"
+        FlakyUpstream.hits = 0
+        FlakyUpstream.retry_after = None
+        self.addCleanup(setattr, FlakyUpstream, "retry_after", None)
+
+    def test_sessions_are_shared_per_host(self):
+        self.assertIs(get_session("https://api.example.com/a"), get_session("https://api.example.com/b?x=1"))
+        self.assertIsNot(get_session("https://api.example.com/a"), get_session("https://data.example.com/a"))
+
+    def test_retries_on_5xx(self):
+        FlakyUpstream.failures_left = 2
+        with mock.patch.dict(os.environ, {"FB_HTTP_BACKOFF_S": "0"}):
+            resp = http_get(self.url, timeout=5)
+        self.assertEqual(resp.json(), {"price": "1.5"})
+        self.assertEqual(FlakyUpstream.hits, 3)
+
+    def test_gives_up_after_retry_budget(self):
+        FlakyUpstream.failures_left = 10
+        with mock.patch.dict(os.environ, {"FB_HTTP_BACKOFF_S": "0", "FB_HTTP_RETRIES": "1"}):
+            resp = http_get(self.url, timeout=5)
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(FlakyUpstream.hits, 2)
+
+    def test_retry_after_is_capped(self):
+        FlakyUpstream.failures_left = 1
+        FlakyUpstream.retry_after = "60"
+        t0 = time.monotonic()
+        with mock.patch.dict(os.environ, {"FB_HTTP_BACKOFF_S": "0", "FB_HTTP_MAX_RETRY_AFTER_S": "0.1"}):
+            resp = http_get(self.url, timeout=5)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(FlakyUpstream.hits, 2)
+
+            FlakyUpstream.failures_left = 1
+            async_resp = asyncio.run(self._async_get())
+        self.assertEqual(async_resp.status_code, 200)
+        self.assertLess(time.monotonic() - t0, 3.0)
+
+    def test_retries_stay_within_deadline(self):
+        FlakyUpstream.failures_left = 10
+        FlakyUpstream.retry_after = "2"
+        t0 = time.monotonic()
+        with mock.patch.dict(os.environ, {"FB_HTTP_BACKOFF_S": "0"}):
+            resp = http_get(self.url, timeout=5, deadline_s=0.5)
+            async_resp = asyncio.run(self._async_get(deadline_s=0.5))
+        self.assertEqual((resp.status_code, async_resp.status_code), (503, 503))
+        self.assertEqual(FlakyUpstream.hits, 2)
+        self.assertLess(time.monotonic() - t0, 2.0)
+
+    async def _async_get(self, **kwargs):
+        try:
+            return await async_http_get(self.url, timeout=5, **kwargs)
+        finally:
+            await close_async_sessions()
+
+
+class GetSpotsTests(SimpleTestCase):
+    def test_default_fans_out_and_drops_failures(self):
+        class Partial(FakeDataSource):
+            def get_spot(self, symbol):
+                if symbol == "BAD":
+                    raise RuntimeError("nope")
+                return 10.0
+
+        self.assertEqual(Partial().get_spots(["a", "bad", "A", "b"]), {"A": 10.0, "B": 10.0})
+
+    def test_default_fan_out_is_concurrent_and_honours_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        class Slow(FakeDataSource):
+            def get_spot(self, symbol):
+                if symbol == "HANG":
+                    release.wait(5)
+                else:
+                    time.sleep(0.05)
+                return 10.0
+
+        t0 = time.monotonic()
+        out = Slow().get_spots(["A", "B", "C", "D", "HANG"], deadline_s=0.5)
+        elapsed = time.monotonic() - t0
+        self.assertEqual(out, {"A": 10.0, "B": 10.0, "C": 10.0, "D": 10.0})
+        self.assertLess(elapsed, 1.0)
+
+    def test_fan_out_reports_timeouts_and_errors(self):
+        def fetch(key):
+            if key == "slow":
+                time.sleep(0.5)
+            if key == "bad":
+                raise RuntimeError("nope")
+            return key.upper()
+
+        results, errors = fan_out(fetch, ["ok", "bad", "slow"], deadline_s=0.1)
+        self.assertEqual(results, {"ok": "OK"})
+        self.assertIsInstance(errors["bad"], RuntimeError)
+        self.assertIsInstance(errors["slow"], TimeoutError)
+
+    def test_alpaca_batches_trades_then_quotes(self):
+        src = AlpacaDataSource(api_key="k", api_secret="s")
+        responses = {
+            "/v2/stocks/trades/latest": {"trades": {"AAPL": {"p": 190.5}}},
+            "/v2/stocks/quotes/latest": {"quotes": {"MSFT": {"bp": 400.0, "ap": 401.0}}},
+        }
+        calls = []
+
+        def fake_get_json(path, params=None):
+            calls.append((path, params["symbols"]))
+            return responses[path]
+
+        with mock.patch.object(src, "_get_json", side_effect=fake_get_json):
+            out = src.get_spots(["AAPL", "MSFT"])
+        self.assertEqual(out, {"AAPL": 190.5, "MSFT": 400.5})
+        self.assertEqual(calls, [("/v2/stocks/trades/latest", "AAPL,MSFT"), ("/v2/stocks/quotes/latest", "MSFT")])
+
+
+class SlowFakeDataSource(FakeDataSource):
+    _ids = iter(range(1_000_000))
+
+    def __init__(self, spot=100.0, delay_s=0.0, error=None):
+        super().__init__(spot=spot)
+        self.delay_s = delay_s
+        self.error = error
+        self.provider_name = f"slow-{next(self._ids)}"
+
+    def get_spot(self, symbol):
+        self.calls.append(("get_spot", symbol))
+        time.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        return self.spot
+
+
+class HedgedCombinedDataSourceTests(SimpleTestCase):
+    def test_fast_primary_is_not_hedged(self):
+        primary, backup = SlowFakeDataSource(spot=101.0), SlowFakeDataSource(spot=202.0)
+        combined = CombinedDataSource(sources=[primary, backup], hedge_delay_s=0.2, health=ProviderHealth())
+        self.assertEqual(combined.get_spot("SPY"), 101.0)
+        self.assertEqual(backup.calls, [])
+
+    def test_slow_primary_is_hedged_by_next_provider(self):
+        primary = SlowFakeDataSource(spot=101.0, delay_s=1.0)
+        backup = SlowFakeDataSource(spot=202.0)
+        combined = CombinedDataSource(sources=[primary, backup], hedge_delay_s=0.05, health=ProviderHealth())
+        t0 = time.monotonic()
+        self.assertEqual(combined.get_spot("SPY"), 202.0)
+        self.assertLess(time.monotonic() - t0, 0.5)
+
+    def test_failure_starts_next_provider_without_waiting(self):
+        primary = SlowFakeDataSource(error=RuntimeError("rate limited"))
+        bad_price = SlowFakeDataSource(spot=float("nan"))
+        backup = SlowFakeDataSource(spot=202.0)
+        combined = CombinedDataSource(sources=[primary, bad_price, backup], hedge_delay_s=5.0, health=ProviderHealth())
+        t0 = time.monotonic()
+        self.assertEqual(combined.get_spot("SPY"), 202.0)
+        self.assertLess(time.monotonic() - t0, 1.0)
+
+    def test_all_failures_raise_last_error(self):
+        combined = CombinedDataSource(
+            sources=[SlowFakeDataSource(error=RuntimeError("a")), SlowFakeDataSource(error=RuntimeError("b"))],
+            hedge_delay_s=0.05,
+            health=ProviderHealth(),
+        )
+        with self.assertRaises(RuntimeError):
+            combined.get_spot("SPY")
+
+
+class ProviderHealthTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.health = ProviderHealth(alpha=0.5, failure_threshold=2, cooldown_s=10.0, clock=lambda: self.now)
+
+    def _fail(self, src, method="get_spot"):
+        with self.assertRaises(RuntimeError):
+            self.health.call(src, method, lambda: (_ for _ in ()).throw(UpstreamHTTPError("rate limited", 429)))
+
+    def test_orders_by_measured_latency(self):
+        slow, fast = SlowFakeDataSource(), SlowFakeDataSource()
+        self.assertEqual(self.health.order([slow, fast], "get_spot"), [slow, fast])
+
+        def timed(src, latency):
+            def fn():
+                self.now += latency
+                return 1.0
+            self.health.call(src, "get_spot", fn)
+
+        timed(slow, 2.0)
+        timed(fast, 0.1)
+        self.assertEqual(self.health.order([slow, fast], "get_spot"), [fast, slow])
+        self.assertEqual(self.health.order([slow, fast], "get_dividend_yield"), [slow, fast])
+
+    def test_breaker_opens_then_half_open_probe_closes_it(self):
+        flaky, backup = SlowFakeDataSource(), SlowFakeDataSource()
+        self._fail(flaky)
+        self._fail(flaky)
+        self.assertEqual(self.health.order([flaky, backup], "get_spot"), [backup])
+
+        self.now += 10.0
+        self.assertIn(flaky, self.health.order([flaky, backup], "get_spot"))
+        started = threading.Event()
+        finish = threading.Event()
+
+        def probe():
+            started.set()
+            finish.wait(5)
+            return 5.0
+
+        worker = threading.Thread(target=lambda: self.health.call(flaky, "get_spot", probe))
+        worker.start()
+        started.wait(5)
+        self.assertEqual(self.health.order([flaky, backup], "get_spot"), [backup])
+        with self.assertRaises(CircuitOpenError):
+            self.health.call(flaky, "get_spot", lambda: 1.0)
+        finish.set()
+        worker.join(5)
+        self.assertEqual(self.health.snapshot()[f"{flaky.provider_name}.get_spot"]["state"], "closed")
+
+    def test_failed_probe_reopens_breaker(self):
+        flaky = SlowFakeDataSource()
+        self._fail(flaky)
+        self._fail(flaky)
+        self.now += 10.0
+        self._fail(flaky)
+        self.assertEqual(self.health.snapshot()[f"{flaky.provider_name}.get_spot"]["state"], "open")
+
+    def test_combined_demotes_failing_provider(self):
+        broken = SlowFakeDataSource(error=UpstreamHTTPError("rate limited", 429))
+        backup = SlowFakeDataSource(spot=202.0)
+        combined = CombinedDataSource(sources=[broken, backup], hedge_delay_s=0, health=self.health)
+        for _ in range(3):
+            self.assertEqual(combined.get_spot("SPY"), 202.0)
+        self.assertEqual(len(broken.calls), 1)
+
+    def test_bad_symbols_do_not_trip_the_breaker(self):
+        src = SlowFakeDataSource()
+        for exc in (SymbolError("no latest price for ZZZZ"), UpstreamHTTPError("not found", 404), ValueError("bad")):
+            for _ in range(3):
+                with self.assertRaises(type(exc)):
+                    self.health.call(src, "get_spot", lambda: (_ for _ in ()).throw(exc))
+        stats = self.health.snapshot()[f"{src.provider_name}.get_spot"]
+        self.assertEqual((stats["state"], stats["failures"]), ("closed", 0))
+
+        combined = CombinedDataSource(sources=[src], hedge_delay_s=0, health=self.health)
+        src.spot = float("nan")
+        for _ in range(3):
+            with self.assertRaises(SymbolError):
+                combined.get_spot("ZZZZ")
+        self.assertEqual(self.health.order([src], "get_spot"), [src])
+        self.assertEqual(self.health.snapshot()[f"{src.provider_name}.get_spot"]["state"], "closed")
+
+    def test_transport_errors_and_5xx_count(self):
+        for exc in (TimeoutError("slow"), ConnectionError("reset"), UpstreamHTTPError("bad gateway", 502)):
+            src = SlowFakeDataSource()
+            for _ in range(2):
+                with self.assertRaises(type(exc)):
+                    self.health.call(src, "get_spot", lambda: (_ for _ in ()).throw(exc))
+            self.assertEqual(self.health.snapshot()[f"{src.provider_name}.get_spot"]["state"], "open")
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        reset_market_data_source()
+        self.addCleanup(reset_market_data_source)
+
+    def test_shared_instance_is_built_once_across_threads(self):
+        seen = []
+        with mock.patch("eurocalc.registry.CombinedDataSource", side_effect=lambda: object()) as ctor:
+            threads = [threading.Thread(target=lambda: seen.append(get_market_data_source())) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(ctor.call_count, 1)
+        self.assertEqual(len({id(ds) for ds in seen}), 1)
+
+        reset_market_data_source()
+        with mock.patch("eurocalc.registry.CombinedDataSource", side_effect=lambda: object()):
+            self.assertIsNot(get_market_data_source(), seen[0])
+
+    def test_async_source_builds_from_a_reset_registry(self):
+        built = []
+        # A private lock, so a deadlocked worker cannot hang the cleanup too.
+        with mock.patch.dict(os.environ, {"FB_REPLAY_FIXTURE": ""}), \
+                mock.patch("eurocalc.registry._lock", threading.Lock()), \
+                mock.patch("eurocalc.registry.CombinedDataSource", side_effect=lambda *a: FakeDataSource()):
+            worker = threading.Thread(target=lambda: built.append(get_async_market_data_source()), daemon=True)
+            worker.start()
+            worker.join(5.0)
+            self.assertFalse(worker.is_alive(), "get_async_market_data_source deadlocked")
+            self.assertIs(get_async_market_data_source(), built[0])
+
+    def test_lazy_provider_builds_on_first_use_only(self):
+        built = []
+
+        def factory():
+            built.append(1)
+            return FakeDataSource(spot=42.0)
+
+        lazy = LazyDataSource(factory, "fake")
+        self.assertEqual(built, [])
+        self.assertEqual(lazy.get_spot("SPY"), 42.0)
+        self.assertEqual(lazy.get_spot("QQQ"), 42.0)
+        self.assertEqual(built, [1])
+
+    def test_unconfigured_provider_is_skipped_without_penalty(self):
+        def no_key():
+            raise ValueError("KEY not set")
+
+        health = ProviderHealth()
+        missing = LazyDataSource(no_key, "missing")
+        combined = CombinedDataSource(
+            sources=[missing, SlowFakeDataSource(spot=7.0)], hedge_delay_s=0, health=health
+        )
+        self.assertEqual(combined.get_spot("SPY"), 7.0)
+        with self.assertRaises(ProviderUnavailableError):
+            missing.get_spot("SPY")
+        self.assertEqual(health.snapshot()["missing.get_spot"]["calls"], 0)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def _burst(self, fn, n=10):
+        barrier = threading.Barrier(n)
+        results = []
+
+        def worker():
+            barrier.wait()
+            try:
+                results.append(fn())
+            except Exception as exc:
+                results.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        return results
+
+    def test_concurrent_identical_calls_share_one_fetch(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return 42
+
+        results = self._burst(lambda: flight.do(("get_spot", "AAPL"), fetch))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 9)
+        self.assertTrue(all(value == 42 for value, _ in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_is_shared_and_not_remembered(self):
+        flight = SingleFlight()
+
+        def fetch():
+            time.sleep(0.2)
+            raise RuntimeError("429")
+
+        results = self._burst(lambda: flight.do("k", fetch))
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flight.do("k", lambda: 7), (7, False))
+
+    def test_cache_misses_coalesce_upstream(self):
+        class SlowSpot(FakeDataSource):
+            def get_spot(self, symbol):
+                time.sleep(0.2)
+                return super().get_spot(symbol)
+
+        ds = SlowSpot()
+        stats = CacheStats()
+        cached = CachedMarketDataSource(ds, backend=InMemoryCacheBackend(), stats=stats, flight=SingleFlight())
+        results = self._burst(lambda: cached.get_spot("AAPL"), n=20)
+        self.assertEqual(results, [100.0] * 20)
+        self.assertEqual(ds.calls, [("get_spot", "AAPL")])
+        self.assertEqual(stats.snapshot()["get_spot"]["coalesced"], 19)
+
+
+class FakeAsyncDataSource(AsyncMarketDataSource):
+    def __init__(self, spot: float = 100.0, delay_s: float = 0.0, error: Exception = None):
+        self.spot = spot
+        self.delay_s = delay_s
+        self.error = error
+        self.calls = []
+        self.provider_name = f"fake-async-{id(self)}"
+
+    async def get_spot(self, symbol: str) -> float:
+        self.calls.append(("get_spot", symbol))
+        await asyncio.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        return self.spot
+
+    async def get_daily_closes(self, symbol: str, need: int = 252):
+        self.calls.append(("get_daily_closes", symbol))
+        return [self.spot * (1.0 + 0.01 * ((i % 5) - 2)) for i in range(need)]
+
+    async def get_dividend_yield(self, symbol: str):
+        self.calls.append(("get_dividend_yield", symbol))
+        return 0.01
+
+
+class AsyncMarketDataTests(SimpleTestCase):
+    def test_gather_with_deadline_drops_slow_and_failing_keys(self):
+        async def fn(key):
+            if key == "SLOW":
+                await asyncio.sleep(5)
+            if key == "BAD":
+                raise RuntimeError("boom")
+            return key.lower()
+
+        start = time.perf_counter()
+        out = asyncio.run(gather_with_deadline(fn, ["A", "SLOW", "BAD"], deadline_s=0.2))
+        self.assertEqual(out, {"A": "a"})
+        self.assertLess(time.perf_counter() - start, 2.0)
+
+    def test_cache_coalesces_concurrent_misses_and_serves_hits(self):
+        src = FakeAsyncDataSource(delay_s=0.1)
+        stats = CacheStats()
+        cached = AsyncCachedMarketDataSource(src, backend=InMemoryCacheBackend(), stats=stats)
+
+        async def run():
+            first = await asyncio.gather(*(cached.get_spot("aapl") for _ in range(10)))
+            return first + [await cached.get_spot("AAPL")]
+
+        self.assertEqual(asyncio.run(run()), [100.0] * 11)
+        self.assertEqual(src.calls, [("get_spot", "AAPL")])
+        snap = stats.snapshot()["get_spot"]
+        self.assertEqual(snap["coalesced"], 9)
+        self.assertEqual(snap["hits"], 1)
+
+    def test_async_and_sync_caches_share_entries(self):
+        backend = InMemoryCacheBackend()
+        src = FakeAsyncDataSource(spot=42.0)
+        asyncio.run(AsyncCachedMarketDataSource(src, backend=backend).get_spot("AAPL"))
+        sync_src = FakeDataSource()
+        self.assertEqual(CachedMarketDataSource(sync_src, backend=backend).get_spot("AAPL"), 42.0)
+        self.assertEqual(sync_src.calls, [])
+
+    def test_combined_falls_back_past_failing_provider(self):
+        bad = FakeAsyncDataSource(error=RuntimeError("down"))
+        good = FakeAsyncDataSource(spot=7.0)
+        combined = AsyncCombinedDataSource([bad, good], health=ProviderHealth())
+        self.assertEqual(asyncio.run(combined.get_spot("SPY")), 7.0)
+        self.assertEqual(asyncio.run(combined.get_spots(["SPY", "QQQ"])), {"SPY": 7.0, "QQQ": 7.0})
+
+    def test_combined_hedges_slow_provider(self):
+        slow = FakeAsyncDataSource(spot=1.0, delay_s=2.0)
+        fast = FakeAsyncDataSource(spot=7.0)
+        combined = AsyncCombinedDataSource([slow, fast], health=ProviderHealth(), hedge_delay_s=0.05)
+
+        async def run():
+            t0 = time.monotonic()
+            price = await combined.get_spot("SPY")
+            return price, time.monotonic() - t0
+
+        price, elapsed = asyncio.run(run())
+        self.assertEqual(price, 7.0)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(fast.calls, [("get_spot", "SPY")])
+
+    def test_threaded_quotes_use_only_the_quote_source(self):
+        history, quotes = FakeDataSource(spot=1.0), FakeDataSource(spot=2.0)
+        threaded = ThreadedAsyncDataSource(history, quote_source=quotes)
+        self.assertEqual(asyncio.run(threaded.get_spot("SPY")), 2.0)
+        self.assertEqual(asyncio.run(threaded.get_spots(["SPY"])), {"SPY": 2.0})
+        asyncio.run(threaded.get_daily_closes("SPY", need=5))
+        self.assertEqual([name for name, _ in history.calls], ["get_daily_closes"])
+
+    def test_async_http_get_retries_on_5xx(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyUpstream)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/price"
+        FlakyUpstream.hits = 0
+        FlakyUpstream.failures_left = 2
+
+        async def run():
+            try:
+                return await async_http_get(url, timeout=5)
+            finally:
+                await close_async_sessions()
+
+        with mock.patch.dict(os.environ, {"FB_HTTP_BACKOFF_S": "0"}):
+            resp = asyncio.run(run())
+        self.assertEqual(resp.json(), {"price": "1.5"})
+        self.assertEqual(FlakyUpstream.hits, 3)
+
+    def test_async_price_view_matches_sync(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        params = {"symbol": "AAPL", "strike": "100", "expiry": (date.today() + timedelta(days=60)).isoformat()}
+        request = RequestFactory().get("/api/euro/price/", params)
+        with mock.patch("eurocalc.views.get_market_data_source", return_value=FakeDataSource()):
+            sync_body = json.loads(euro_price_api(request).content)
+        clear_market_data_cache()
+        with mock.patch("eurocalc.views.get_async_market_data_source", return_value=FakeAsyncDataSource()), \
+                mock.patch("eurocalc.views.get_market_data_source", return_value=FakeDataSource()):
+            response = asyncio.run(euro_price_api_async(request))
+        self.assertEqual(response.status_code, 200)
+        async_body = json.loads(response.content)
+        for body in (sync_body, async_body):
+            body.pop("timings_ms")
+            body["inputs"].pop("timings_ms")
+        self.assertEqual(async_body, sync_body)
+
+    def test_async_price_views_price_off_the_event_loop(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        params = {"symbol": "AAPL", "strike": "100", "expiry": (date.today() + timedelta(days=60)).isoformat()}
+        request = RequestFactory().get("/api/american/price/", params)
+        on_loop = []
+        price_response = views._price_response
+
+        def record(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return price_response(*args, **kwargs)
+
+        with mock.patch("eurocalc.views.get_async_market_data_source", return_value=FakeAsyncDataSource()), \
+                mock.patch("eurocalc.views.get_market_data_source", return_value=FakeDataSource()), \
+                mock.patch("eurocalc.views._price_response", side_effect=record):
+            for view in (euro_price_api_async, american_price_api_async):
+                self.assertEqual(asyncio.run(view(request)).status_code, 200)
+        self.assertEqual(on_loop, [False, False])
+
+
+class QuoteStreamTests(SimpleTestCase):
+    def test_book_prefers_fresh_trade_then_mid(self):
+        now = [1000.0]
+        book = QuoteBook(max_age_s=5, clock=lambda: now[0])
+        book.apply({"T": "q", "S": "aapl", "bp": 99.0, "ap": 101.0})
+        self.assertEqual(book.price("AAPL"), 100.0)
+        book.apply({"T": "t", "S": "AAPL", "p": 100.5})
+        self.assertEqual(book.price("AAPL"), 100.5)
+        now[0] += 6
+        self.assertIsNone(book.price("AAPL"))
+        self.assertFalse(book.apply({"T": "t", "S": "AAPL", "p": "nan"}))
+
+    def test_spot_calculator_reads_book_before_source(self):
+        book = QuoteBook()
+        book.apply({"T": "t", "S": "AAPL", "p": 123.0})
+        ds = FakeDataSource()
+        calc = SpotPriceCalculator(data_source=ds, book=book)
+        self.assertEqual(calc.compute("AAPL"), 123.0)
+        self.assertEqual(calc.compute("MSFT"), 100.0)
+        self.assertEqual(ds.calls, [("get_spot", "MSFT")])
+
+    def test_stream_fills_book_from_replay_server(self):
+        frames = [
+            [{"T": "q", "S": "AAPL", "bp": 189.9, "ap": 190.1}, {"T": "t", "S": "MSFT", "p": 410.0}],
+            [{"T": "t", "S": "AAPL", "p": 190.0}],
+        ]
+        server = ReplayFeedServer(frames, interval_s=0.01)
+        url = server.start()
+        self.addCleanup(server.stop)
+        book = QuoteBook()
+        stream = QuoteStream(book, ["AAPL"], url=url, api_key="k", api_secret="s", reconnect_s=0.05)
+        stream.start()
+        self.addCleanup(stream.stop)
+        self.assertTrue(stream.connected.wait(5))
+
+        deadline = time.time() + 5
+        while book.price("AAPL") != 190.0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(book.price("AAPL"), 190.0)
+        self.assertIsNone(book.price("MSFT"))
+
+        stream.subscribe(["MSFT"])
+        while book.price("MSFT") is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(book.price("MSFT"), 410.0)
+
+    def test_subscribe_while_connecting_is_not_dropped(self):
+        class RacingStream(QuoteStream):
+            raced = False
+
+            @property
+            def symbols(self):
+                current = QuoteStream.symbols.fget(self)
+                if not self.raced:
+                    # Another thread subscribes right as the session snapshots its symbols.
+                    self.raced = True
+                    self.subscribe(["MSFT"])
+                return current
+
+        server = ReplayFeedServer([[{"T": "t", "S": "MSFT", "p": 410.0}]], interval_s=0.01)
+        url = server.start()
+        self.addCleanup(server.stop)
+        book = QuoteBook()
+        stream = RacingStream(book, ["AAPL"], url=url, api_key="k", api_secret="s", reconnect_s=0.05)
+        stream.start()
+        self.addCleanup(stream.stop)
+        deadline = time.time() + 5
+        while book.price("MSFT") is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(book.price("MSFT"), 410.0)
+        self.assertEqual(stream.connects, 1)
+
+    def test_disconnects_are_logged(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        stream = QuoteStream(QuoteBook(), ["AAPL"], url=f"ws://127.0.0.1:{port}/stream", reconnect_s=0.05)
+        with self.assertLogs("eurocalc.quote_stream", "WARNING") as logs:
+            stream.start()
+            deadline = time.time() + 5
+            while not logs.records and time.time() < deadline:
+                time.sleep(0.01)
+            stream.stop()
+        self.assertIn("disconnected", logs.output[0])
+
+    def test_on_demand_subscriptions_are_capped(self):
+        stream = QuoteStream(QuoteBook(), ["AAPL"], url="ws://unused", max_symbols=3)
+        self.assertEqual(stream.subscribe(["MSFT", "NVDA"]), ["MSFT", "NVDA"])
+        self.assertEqual(stream.subscribe(["TSLA"]), ["TSLA"])
+        self.assertEqual(stream.symbols, ["AAPL", "NVDA", "TSLA"])
+
+        stream.subscribe(["NVDA"])  # recently requested again, so TSLA is now the oldest
+        stream.subscribe(["AMD"])
+        self.assertEqual(stream.symbols, ["AAPL", "AMD", "NVDA"])
+
+        stream.subscribe(["SPY", "QQQ"], pin=True)
+        self.assertEqual(stream.symbols, ["AAPL", "QQQ", "SPY"])
+        self.assertEqual(stream.subscribe(["IWM"]), [])
+
+
+class ReplayDataSourceTests(SimpleTestCase):
+    def fixture(self):
+        return MarketFixture(
+            spots={"AAPL": 190.0, "MSFT": 410.0},
+            dividend_yields={"AAPL": 0.005, "TSLA": None},
+            daily_closes={"AAPL": [float(i) for i in range(1, 301)]},
+            crypto_spots={"BTC/USD": 60000.0},
+            crypto_daily_closes={"BTC/USD": [1.0, 2.0, 3.0]},
+        )
+
+    def test_json_and_npz_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("fx.json", "fx.npz"):
+                loaded = MarketFixture.load(self.fixture().save(os.path.join(tmp, name)))
+                self.assertEqual(loaded, self.fixture(), name)
+
+    def test_serves_recorded_data(self):
+        ds = ReplayDataSource(self.fixture())
+        self.assertEqual(ds.get_spot("aapl"), 190.0)
+        self.assertEqual(ds.get_spots(["AAPL", "ZZZ", "MSFT"]), {"AAPL": 190.0, "MSFT": 410.0})
+        self.assertEqual(ds.get_daily_closes("AAPL", need=3), [298.0, 299.0, 300.0])
+        self.assertIsNone(ds.get_dividend_yield("TSLA"))
+        self.assertEqual(ds.get_crypto_spot("BTC/USD"), 60000.0)
+        self.assertEqual(ReplayDataSource(self.fixture(), crypto=True).get_spot("BTC/USD"), 60000.0)
+        with self.assertRaises(RuntimeError):
+            ds.get_spot("ZZZ")
+
+    def test_injected_latency_and_errors_are_seeded(self):
+        def outcomes(seed):
+            slept = []
+            ds = ReplayDataSource(self.fixture(), latency_s=0.05, jitter_s=0.05, error_rate=0.3, seed=seed, sleep=slept.append)
+            results = []
+            for _ in range(50):
+                try:
+                    results.append(ds.get_spot("AAPL"))
+                except RuntimeError:
+                    results.append(None)
+            return results, slept
+
+        first, slept = outcomes(1)
+        self.assertEqual(outcomes(1), (first, slept))
+        self.assertTrue(0 < first.count(None) < 50)
+        self.assertTrue(all(0.05 <= d <= 0.1 for d in slept))
+
+    def test_batch_past_deadline_returns_nothing(self):
+        slept = []
+        ds = ReplayDataSource(self.fixture(), latency_s=1.0, sleep=slept.append)
+        self.assertEqual(ds.get_spots(["AAPL"], deadline_s=0.2), {})
+        self.assertEqual(slept, [0.2])
+
+    def test_recorder_output_replays_identically(self):
+        fixture = MarketFixture()
+        live = RecordingDataSource(FakeDataSource(spot=50.0), fixture)
+        spot = live.get_spot("AAPL")
+        closes = live.get_daily_closes("AAPL", need=30)
+        live.get_dividend_yield("AAPL")
+        with tempfile.TemporaryDirectory() as tmp:
+            replay = ReplayDataSource(fixture.save(os.path.join(tmp, "rec.npz")))
+        self.assertEqual(replay.get_spot("AAPL"), spot)
+        self.assertEqual(replay.get_daily_closes("AAPL", need=30), closes)
+        self.assertEqual(replay.get_dividend_yield("AAPL"), 0.01)
+
+    def test_registry_uses_fixture_from_env(self):
+        reset_market_data_source()
+        self.addCleanup(reset_market_data_source)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.fixture().save(os.path.join(tmp, "fx.json"))
+            with mock.patch.dict(os.environ, {"FB_REPLAY_FIXTURE": str(path)}):
+                ds = get_market_data_source()
+        self.assertIsInstance(ds, ReplayDataSource)
+        self.assertEqual(ds.get_spot("MSFT"), 410.0)
+
+
+class DjangoCacheBackendTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "market_data": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tmp.name},
+        }
+        settings = override_settings(CACHES=caches)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_entries_round_trip_in_binary(self):
+        closes = [100.0 + i * 0.25 for i in range(252)]
+        for value in (101.5, None, closes, {"div": 0.5}):
+            entry = CacheEntry(value=value, expires_at=10.0, stale_until=20.0)
+            self.assertEqual(decode_entry(encode_entry(entry)), entry)
+        self.assertEqual(len(encode_entry(CacheEntry(closes, 0.0, 0.0))), 17 + 8 * 252)
+
+    def test_workers_share_entries(self):
+        first, second = FakeDataSource(spot=42.0), FakeDataSource()
+        CachedMarketDataSource(first, backend=DjangoCacheBackend()).get_spot("AAPL")
+        CachedMarketDataSource(first, backend=DjangoCacheBackend()).get_daily_closes("AAPL", need=30)
+
+        other_worker = CachedMarketDataSource(second, backend=DjangoCacheBackend(), stats=CacheStats())
+        self.assertEqual(other_worker.get_spots(["AAPL"]), {"AAPL": 42.0})
+        self.assertEqual(len(other_worker.get_daily_closes("AAPL", need=30)), 30)
+        self.assertEqual(second.calls, [])
+        self.assertEqual(other_worker.stats.snapshot()["get_spot"]["hits"], 1)
+
+    def test_cache_timeout_is_ttl_plus_grace(self):
+        backend = DjangoCacheBackend()
+        cached = CachedMarketDataSource(FakeDataSource(), backend=backend, spot_ttl_s=5, spot_grace_s=30)
+        with mock.patch.object(backend.cache, "set", wraps=backend.cache.set) as cache_set:
+            cached.get_spot("AAPL")
+        self.assertEqual(cache_set.call_args.kwargs["timeout"], 35)
+
+    def test_async_cache_keeps_backend_io_off_the_event_loop(self):
+        backend = DjangoCacheBackend()
+        on_loop = []
+
+        def record(fn):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(fn.__name__)
+                except RuntimeError:
+                    pass
+                return fn(*args, **kwargs)
+
+            return wrapper
+
+        for name in ("get", "get_many", "set"):
+            setattr(backend.cache, name, record(getattr(backend.cache, name)))
+        cached = AsyncCachedMarketDataSource(FakeAsyncDataSource(spot=42.0), backend=backend)
+
+        async def run():
+            await cached.get_spot("AAPL")
+            await cached.get_spot("AAPL")
+            return await cached.get_spots(["AAPL", "MSFT"])
+
+        with mock.patch("asgiref.sync.sync_to_async", wraps=sync_to_async) as offload:
+            self.assertEqual(asyncio.run(run()), {"AAPL": 42.0, "MSFT": 42.0})
+        self.assertEqual(on_loop, [])
+        self.assertTrue(offload.call_args_list)
+        self.assertTrue(all(c.kwargs["thread_sensitive"] is False for c in offload.call_args_list))
+
+
+class LedgerDataSource(FakeDataSource):
+    def __init__(self, spot: float = 100.0):
+        super().__init__(spot=spot)
+        today = date.today()
+        self.ledger = [(today - timedelta(days=400), 9.0), (today - timedelta(days=100), 1.0), (today - timedelta(days=10), 1.0)]
+
+    def get_cash_dividends(self, symbol: str):
+        self.calls.append(("get_cash_dividends", symbol))
+        return self.ledger
+
+    def get_dividend_yield(self, symbol: str):
+        raise AssertionError("the yield should come from the ledger")
+
+
+class MarketContextTests(SimpleTestCase):
+    def test_dividend_yield_reuses_spot_and_ledger(self):
+        ds = LedgerDataSource(spot=50.0)
+        ctx = MarketContext(ds)
+        self.assertEqual(ctx.get_spot("aapl"), 50.0)
+        self.assertAlmostEqual(ctx.get_dividend_yield("AAPL"), 2.0 / 50.0)
+        self.assertAlmostEqual(ctx.get_dividend_yield("AAPL"), 2.0 / 50.0)
+        self.assertEqual(ds.calls, [("get_spot", "AAPL"), ("get_cash_dividends", "AAPL")])
+
+    def test_falls_back_to_source_yield_without_ledger(self):
+        ctx = MarketContext(FakeDataSource(dividend_yield=0.03))
+        self.assertEqual(ctx.get_dividend_yield("AAPL"), 0.03)
+
+    def test_ledger_is_cached_across_requests(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        ds = LedgerDataSource()
+        for _ in range(3):
+            MarketContext(CachedMarketDataSource(ds)).get_dividend_yield("AAPL")
+        self.assertEqual([c for c in ds.calls if c[0] == "get_cash_dividends"], [("get_cash_dividends", "AAPL")])
+
+    def test_price_request_fetches_each_input_once(self):
+        clear_market_data_cache()
+        self.addCleanup(clear_market_data_cache)
+        ds = LedgerDataSource()
+        params = {"symbol": "AAPL", "strike": "100", "expiry": (date.today() + timedelta(days=60)).isoformat()}
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {"FB_BAR_STORE_DIR": tmp}), \
+                mock.patch("eurocalc.views.get_market_data_source", return_value=ds):
+            response = euro_price_api(RequestFactory().get("/api/euro/price/", params))
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(json.loads(response.content)["inputs"]["q"], 0.02)
+        self.assertEqual(sorted(ds.calls), [("get_cash_dividends", "AAPL"), ("get_daily_closes", "AAPL"), ("get_spot", "AAPL")])
+
+
+class ConcurrentAssemblyTests(SimpleTestCase):
+    class SlowLedgerSource(LedgerDataSource):
+        def __init__(self, delay_s: float):
+            super().__init__()
+            self.delay_s = delay_s
+
+        def get_spot(self, symbol):
+            time.sleep(self.delay_s)
+            return super().get_spot(symbol)
+
+        def get_daily_closes(self, symbol, need=252):
+            time.sleep(self.delay_s)
+            return super().get_daily_closes(symbol, need)
+
+        def get_cash_dividends(self, symbol):
+            time.sleep(self.delay_s)
+            return super().get_cash_dividends(symbol)
+
+    def assembler(self, ds, concurrent, deadline_s=None):
+        ctx = MarketContext(ds)
+        return VariablesAssembler(
+            SpotPriceCalculator(data_source=ctx, book=QuoteBook()),
+            RiskFreeRateCalculator(),
+            FundamentalsDividendYieldCalculator(data_source=ctx),
+            HistoricalVolatilityCalculator(data_source=ctx),
+            YearFractionCalculator(),
+            concurrent=concurrent,
+            deadline_s=deadline_s,
+        )
+
+    def build(self, assembler):
+        return assembler.build(symbol="AAPL", side="call", strike=100.0, expiry=date.today() + timedelta(days=30))
+
+    def test_concurrent_matches_sequential_in_about_the_slowest_fetch(self):
+        sequential = self.build(self.assembler(FakeDataSource(), concurrent=False))
+        ds = self.SlowLedgerSource(delay_s=0.2)
+        start = time.perf_counter()
+        concurrent = self.build(self.assembler(ds, concurrent=True))
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(ds.calls.count(("get_spot", "AAPL")), 1)
+        self.assertAlmostEqual(concurrent["q"], 0.02)
+        self.assertEqual(set(concurrent["timings_ms"]), {"spot", "rate", "dividend_yield", "volatility", "total"})
+        self.assertGreaterEqual(concurrent["timings_ms"]["volatility"], 200.0)
+        for key in ("S", "sigma", "T"):
+            self.assertAlmostEqual(concurrent[key], sequential[key])
+
+    def test_deadline_names_the_slow_inputs(self):
+        with self.assertRaisesRegex(RuntimeError, "spot"):
+            self.build(self.assembler(self.SlowLedgerSource(delay_s=0.5), concurrent=True, deadline_s=0.1))
+
+    def test_errors_surface_in_input_order(self):
+        class Broken(FakeDataSource):
+            def get_spot(self, symbol):
+                raise RuntimeError("spot down")
+
+        assembler = self.assembler(Broken(), concurrent=True)
+        assembler.vol_calc = ConstantVolatilityCalculator(0.2)
+        with self.assertRaisesRegex(RuntimeError, "spot down"):
+            self.build(assembler)
+
+
+class PricingPipelineTests(SimpleTestCase):
+    def pipeline(self, side="PUT"):
+        ds = FakeDataSource()
+        assembler = VariablesAssembler(
+            SpotPriceCalculator(data_source=ds, book=QuoteBook()),
+            RiskFreeRateCalculator(),
+            FundamentalsDividendYieldCalculator(data_source=ds),
+            ConstantVolatilityCalculator(0.3),
+            YearFractionCalculator(),
+        )
+        return PricingPipeline(assembler, symbol="AAPL", side=side, strike=105.0, expiry=date.today() + timedelta(days=90))
+
+    def test_matches_standalone_calculators(self):
+        for side in ("CALL", "PUT"):
+            pipe = self.pipeline(side)
+            out = pipe.american_payload()
+            v = out["inputs"]
+            args = (v["S"], v["K"], v["r"], v["q"], v["sigma"], v["T"], side)
+            self.assertEqual(out["greeks"], GreeksCalculator().compute(*args))
+            self.assertEqual(out["american_result"], BAWAmericanOptionCalculator().compute(*args))
+
+    def test_each_stage_runs_once(self):
+        pipe = self.pipeline()
+        with mock.patch.object(BSTerms, "compute", wraps=BSTerms.compute) as terms, \
+                mock.patch.object(pipe.assembler, "build", wraps=pipe.assembler.build) as build:
+            out = pipe.american_payload()
+            pipe.european_payload()
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(terms.call_count, 1)
+        self.assertEqual(terms.call_args.kwargs["d1"], out["inputs"]["d1"])
+        self.assertEqual(list(out["timings_ms"]), ["inputs", "terms", "european", "american", "greeks"])
+
+    def test_european_endpoint_skips_american_stage(self):
+        out = self.pipeline().european_payload()
+        self.assertNotIn("american", out["timings_ms"])
+        self.assertAlmostEqual(out["price_and_greeks"]["fair_value"], BSTerms.compute(
+            out["inputs"]["S"], 105.0, out["inputs"]["r"], out["inputs"]["q"], 0.3, out["inputs"]["T"]
+        ).fair_value("PUT"))
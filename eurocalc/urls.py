@@ -1,8 +1,17 @@
 from django.urls import path
-from .views import euro_price_api, american_price_api
+from .views import (
+    american_price_api,
+    euro_chain_api,
+    euro_price_api,
+    euro_price_api_async,
+    greeks_surface_api,
+)
 
 app_name = "eurocalc"
 
 urlpatterns = [
     path("price/", euro_price_api, name="price"),
-]
\ No newline at end of file
+    path("async/price/", euro_price_api_async, name="price_async"),
+    path("chain/", euro_chain_api, name="chain"),
+    path("surface/", greeks_surface_api, name="surface"),
+]
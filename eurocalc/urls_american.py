@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import american_price_api
+from .views import american_chain_api, american_price_api, american_price_api_async
 
 app_name = "eurocalc_american"
 
 urlpatterns = [
     path("price/", american_price_api, name="american_price"),
+    path("async/price/", american_price_api_async, name="american_price_async"),
+    path("chain/", american_chain_api, name="american_chain"),
 ]
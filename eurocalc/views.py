@@ -1,6 +1,14 @@
 from __future__ import annotations
 from datetime import date
+import asyncio
+import json
+import math
+
+import numpy as np
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse, HttpRequest
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 from .calculator import (
     SpotPriceCalculator,
@@ -8,64 +16,84 @@ from .calculator import (
     FundamentalsDividendYieldCalculator,
     HistoricalVolatilityCalculator,
     ConstantVolatilityCalculator,
-    ImpliedVolatilityCalculator,
+    BatchImpliedVolatilityCalculator,
     YearFractionCalculator,
     GreeksCalculator,
     BAWAmericanOptionCalculator,
+    CrankNicolsonAmericanOptionCalculator,
     VariablesAssembler,
+    american_calculator,
 )
-from .data_sources import CombinedDataSource
+from .bar_store import BarStoreDataSource
+from .cache import AsyncCachedMarketDataSource, CachedMarketDataSource
+from .data_sources import SnapshotDataSource, trailing_dividend_yield
+from .market_context import MarketContext
+from .pipeline import PricingPipeline
+from .registry import get_async_market_data_source, get_market_data_source
 
 
-def euro_price_api(request: HttpRequest) -> JsonResponse:
-    q = request.GET
-    try:
-        symbol = str(q.get("symbol", "AAPL")).upper().strip()
-        side = str(q.get("side", "CALL")).upper()
-        strike = float(q["strike"])
-        expiry = date.fromisoformat(q["expiry"])
-        vol_mode = str(q.get("vol_mode", "HIST")).upper()
-        market_option_price = q.get("market_option_price")
-        constant_vol = q.get("constant_vol")
-        use_ql = str(q.get("use_quantlib_daycount", "false")).lower() in ("1", "true", "yes")
-    except Exception as e:
-        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+def _market_data_source() -> CachedMarketDataSource:
+    return CachedMarketDataSource(BarStoreDataSource(get_market_data_source()))
+
+
+def _request_context() -> MarketContext:
+    """Fresh per-request MarketContext over the cached source, shared by all of a request's calculators."""
+    return MarketContext(_market_data_source())
+
+
+HIST_VOL_LOOKBACK = 252
+
+
+def _parse_price_params(q) -> dict:
+    return {
+        "symbol": str(q.get("symbol", "AAPL")).upper().strip(),
+        "side": str(q.get("side", "CALL")).upper(),
+        "strike": float(q["strike"]),
+        "expiry": date.fromisoformat(q["expiry"]),
+        "vol_mode": str(q.get("vol_mode", "HIST")).upper(),
+        "market_option_price": q.get("market_option_price"),
+        "constant_vol": q.get("constant_vol"),
+        "use_ql": str(q.get("use_quantlib_daycount", "false")).lower() in ("1", "true", "yes"),
+        "engine": str(q.get("engine", "baw")).lower().strip(),
+    }
+
 
-    ds = CombinedDataSource()
+def _uses_historical_vol(p: dict) -> bool:
+    return not p["constant_vol"] and p["vol_mode"] != "IV"
+
+
+def _price_pipeline(ds, p: dict, concurrent: bool = False, american_calc=None) -> PricingPipeline:
     spot_calc = SpotPriceCalculator(data_source=ds)
     rate_calc = RiskFreeRateCalculator()
     div_calc = FundamentalsDividendYieldCalculator(data_source=ds)
 
-    if constant_vol:
-        vol_calc = ConstantVolatilityCalculator(float(constant_vol))
-    elif vol_mode == "IV":
-        vol_calc = ImpliedVolatilityCalculator()
+    if p["constant_vol"]:
+        vol_calc = ConstantVolatilityCalculator(float(p["constant_vol"]))
+    elif p["vol_mode"] == "IV":
+        vol_calc = BatchImpliedVolatilityCalculator()
     else:
-        vol_calc = HistoricalVolatilityCalculator(data_source=ds)
+        vol_calc = HistoricalVolatilityCalculator(data_source=ds, lookback_days=HIST_VOL_LOOKBACK)
 
-    T_calc = YearFractionCalculator(use_quantlib=use_ql)
-    assembler = VariablesAssembler(spot_calc, rate_calc, div_calc, vol_calc, T_calc)
+    T_calc = YearFractionCalculator(use_quantlib=p["use_ql"])
+    assembler = VariablesAssembler(spot_calc, rate_calc, div_calc, vol_calc, T_calc, concurrent=concurrent)
 
+    params = {"symbol": p["symbol"], "side": p["side"], "strike": p["strike"], "expiry": p["expiry"]}
+    if p["vol_mode"] == "IV" and p["market_option_price"]:
+        params["market_option_price"] = float(p["market_option_price"])
+    return PricingPipeline(assembler, american_calc=american_calc, **params)
+
+
+def _price_response(ds, p: dict, american: bool, concurrent: bool = False) -> JsonResponse:
     try:
-        params = {"symbol": symbol, "side": side, "strike": strike, "expiry": expiry}
-        if vol_mode == "IV" and market_option_price:
-            params["market_option_price"] = float(market_option_price)
-        vars_ = assembler.build(**params)
-
-        greeks_calc = GreeksCalculator()
-        greeks = greeks_calc.compute(
-            S=vars_["S"],
-            K=vars_["K"],
-            r=vars_["r"],
-            q=vars_["q"],
-            sigma=vars_["sigma"],
-            T=vars_["T"],
-            side=vars_["side"],
-        )
+        if american:
+            pipeline = _price_pipeline(ds, p, concurrent=concurrent, american_calc=american_calculator(p["engine"]))
+            out = pipeline.american_payload()
+            out["engine"] = p["engine"]
+        else:
+            out = _price_pipeline(ds, p, concurrent=concurrent).european_payload()
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
-    out = {"inputs": vars_, "price_and_greeks": greeks}
     if isinstance(out["inputs"].get("as_of"), date):
         out["inputs"]["as_of"] = out["inputs"]["as_of"].isoformat()
     if isinstance(out["inputs"].get("expiry"), date):
@@ -73,68 +101,261 @@ def euro_price_api(request: HttpRequest) -> JsonResponse:
     return JsonResponse(out, status=200)
 
 
+async def _prefetched_source(p: dict) -> SnapshotDataSource:
+    """Fetch everything the price views read, concurrently, into an in-memory source."""
+    ds = AsyncCachedMarketDataSource(get_async_market_data_source())
+    symbol = p["symbol"]
+    lookups = {
+        "spot": ds.get_spot(symbol),
+        "ledger": sync_to_async(_market_data_source().get_cash_dividends, thread_sensitive=False)(symbol),
+    }
+    if _uses_historical_vol(p):
+        lookups["closes"] = ds.get_daily_closes(symbol, need=HIST_VOL_LOOKBACK)
+    values = dict(zip(lookups, await asyncio.gather(*lookups.values(), return_exceptions=True)))
+
+    # Trailing yield from the cached corporate-actions ledger and the spot
+    # just fetched; only sources without a ledger are asked for the yield.
+    spot, ledger = values["spot"], values["ledger"]
+    if isinstance(ledger, BaseException):
+        dividend_yield = (await asyncio.gather(ds.get_dividend_yield(symbol), return_exceptions=True))[0]
+    elif isinstance(spot, BaseException):
+        dividend_yield = spot
+    else:
+        dividend_yield = trailing_dividend_yield(ledger, spot)
+    return SnapshotDataSource(
+        spots={symbol: spot},
+        dividend_yields={symbol: dividend_yield},
+        daily_closes={symbol: values["closes"]} if "closes" in values else None,
+    )
+
+
+async def _price_off_loop(ds: SnapshotDataSource, p: dict, american: bool) -> JsonResponse:
+    """Run the CPU-bound pricing on a worker thread so the ASGI loop keeps serving."""
+    return await sync_to_async(_price_response, thread_sensitive=False)(ds, p, american=american)
+
+
+def euro_price_api(request: HttpRequest) -> JsonResponse:
+    try:
+        p = _parse_price_params(request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+    return _price_response(_request_context(), p, american=False, concurrent=True)
+
+
+async def euro_price_api_async(request: HttpRequest) -> JsonResponse:
+    """euro_price_api for ASGI: market data is fetched concurrently without holding a thread."""
+    try:
+        p = _parse_price_params(request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+    return await _price_off_loop(await _prefetched_source(p), p, american=False)
+
+
 def american_price_api(request: HttpRequest) -> JsonResponse:
-    q = request.GET
     try:
-        symbol = str(q.get("symbol", "AAPL")).upper().strip()
-        side = str(q.get("side", "CALL")).upper()
-        strike = float(q["strike"])
-        expiry = date.fromisoformat(q["expiry"])
-        vol_mode = str(q.get("vol_mode", "HIST")).upper()
-        market_option_price = q.get("market_option_price")
-        constant_vol = q.get("constant_vol")
-        use_ql = str(q.get("use_quantlib_daycount", "false")).lower() in ("1", "true", "yes")
+        p = _parse_price_params(request.GET)
     except Exception as e:
         return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+    return _price_response(_request_context(), p, american=True, concurrent=True)
+
+
+async def american_price_api_async(request: HttpRequest) -> JsonResponse:
+    """american_price_api for ASGI: market data is fetched concurrently without holding a thread."""
+    try:
+        p = _parse_price_params(request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+    return await _price_off_loop(await _prefetched_source(p), p, american=True)
+
+
+MAX_CHAIN_CONTRACTS = 5000
 
-    ds = CombinedDataSource()
-    spot_calc = SpotPriceCalculator(data_source=ds)
-    rate_calc = RiskFreeRateCalculator()
-    div_calc = FundamentalsDividendYieldCalculator(data_source=ds)
 
-    if constant_vol:
-        vol_calc = ConstantVolatilityCalculator(float(constant_vol))
-    elif vol_mode == "IV":
-        vol_calc = ImpliedVolatilityCalculator()
+def _parse_chain_params(q) -> dict:
+    symbol = str(q.get("symbol", "AAPL")).upper().strip()
+    side = str(q.get("side", "BOTH")).upper().strip()
+    sides = ["CALL", "PUT"] if side == "BOTH" else [side]
+    strikes = [float(s) for s in str(q["strikes"]).split(",") if s.strip()]
+    expiries = sorted({date.fromisoformat(e.strip()) for e in str(q["expiries"]).split(",") if e.strip()})
+    if len(sides) * len(strikes) * len(expiries) > MAX_CHAIN_CONTRACTS:
+        raise ValueError(f"chain is limited to {MAX_CHAIN_CONTRACTS} contracts")
+    return {
+        "symbol": symbol,
+        "sides": sides,
+        "strikes": strikes,
+        "expiries": expiries,
+        "constant_vol": q.get("constant_vol"),
+        "use_ql": str(q.get("use_quantlib_daycount", "false")).lower() in ("1", "true", "yes"),
+    }
+
+
+def _chain_assembler(params: dict) -> VariablesAssembler:
+    ds = _request_context()
+    if params["constant_vol"]:
+        vol_calc = ConstantVolatilityCalculator(float(params["constant_vol"]))
     else:
         vol_calc = HistoricalVolatilityCalculator(data_source=ds)
+    return VariablesAssembler(
+        SpotPriceCalculator(data_source=ds),
+        RiskFreeRateCalculator(),
+        FundamentalsDividendYieldCalculator(data_source=ds),
+        vol_calc,
+        YearFractionCalculator(use_quantlib=params["use_ql"]),
+    )
+
+
+def _chain_rows(grid: dict, columns: dict) -> list:
+    rows = []
+    for i in range(len(grid["K"])):
+        row = {
+            "expiry": grid["expiry"][i].isoformat(),
+            "strike": float(grid["K"][i]),
+            "side": str(grid["side"][i]),
+            "T": float(grid["T"][i]),
+            "r": float(grid["r"][i]),
+        }
+        for key, arr in columns.items():
+            val = float(arr[i])
+            row[key] = val if math.isfinite(val) else None
+        rows.append(row)
+    return rows
+
+
+def _chain_inputs(grid: dict) -> dict:
+    return {
+        "symbol": grid["symbol"],
+        "S": grid["S"],
+        "q": grid["q"],
+        "sigma": grid["sigma"],
+        "as_of": grid["as_of"].isoformat(),
+    }
 
-    T_calc = YearFractionCalculator(use_quantlib=use_ql)
-    assembler = VariablesAssembler(spot_calc, rate_calc, div_calc, vol_calc, T_calc)
 
+def euro_chain_api(request: HttpRequest) -> JsonResponse:
     try:
-        params = {"symbol": symbol, "side": side, "strike": strike, "expiry": expiry}
-        if vol_mode == "IV" and market_option_price:
-            params["market_option_price"] = float(market_option_price)
-        vars_ = assembler.build(**params)
-
-        baw_calc = BAWAmericanOptionCalculator()
-        am_result = baw_calc.compute(
-            S=vars_["S"],
-            K=vars_["K"],
-            r=vars_["r"],
-            q=vars_["q"],
-            sigma=vars_["sigma"],
-            T=vars_["T"],
-            side=vars_["side"],
+        params = _parse_chain_params(request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+
+    try:
+        grid = _chain_assembler(params).build_chain(
+            symbol=params["symbol"],
+            sides=params["sides"],
+            strikes=params["strikes"],
+            expiries=params["expiries"],
+        )
+        greeks = GreeksCalculator().compute_batch(
+            grid["S"], grid["K"], grid["r"], grid["q"], grid["sigma"], grid["T"], grid["side"]
         )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"inputs": _chain_inputs(grid), "contracts": _chain_rows(grid, greeks)}, status=200)
+
 
-        greeks_calc = GreeksCalculator()
-        greeks = greeks_calc.compute(
-            S=vars_["S"],
-            K=vars_["K"],
-            r=vars_["r"],
-            q=vars_["q"],
-            sigma=vars_["sigma"],
-            T=vars_["T"],
-            side=vars_["side"],
+def american_chain_api(request: HttpRequest) -> JsonResponse:
+    try:
+        params = _parse_chain_params(request.GET)
+    except Exception as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+
+    try:
+        grid = _chain_assembler(params).build_chain(
+            symbol=params["symbol"],
+            sides=params["sides"],
+            strikes=params["strikes"],
+            expiries=params["expiries"],
         )
+        args = (grid["S"], grid["K"], grid["r"], grid["q"], grid["sigma"], grid["T"], grid["side"])
+        am_result = BAWAmericanOptionCalculator().compute_batch(*args)
+        greeks = GreeksCalculator().compute_batch(*args)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
 
-    out = {"inputs": vars_, "american_result": am_result, "greeks": greeks}
-    if isinstance(out["inputs"].get("as_of"), date):
-        out["inputs"]["as_of"] = out["inputs"]["as_of"].isoformat()
-    if isinstance(out["inputs"].get("expiry"), date):
-        out["inputs"]["expiry"] = out["inputs"]["expiry"].isoformat()
-    return JsonResponse(out, status=200)
+    columns = dict(am_result)
+    columns.update(greeks)
+    return JsonResponse({"inputs": _chain_inputs(grid), "contracts": _chain_rows(grid, columns)}, status=200)
+
+
+MAX_SURFACE_POINTS = 200_000
+
+
+def _finite_or_none(arr: np.ndarray) -> list:
+    return [[float(v) if math.isfinite(v) else None for v in row] for row in arr]
+
+
+@csrf_exempt
+@require_POST
+def greeks_surface_api(request: HttpRequest) -> JsonResponse:
+    """
+    POST /api/euro/surface/
+
+    Body:
+      - inputs: the ``inputs`` block returned by /api/euro/price/
+      - spot_steps: optional int (default 101)
+      - day_steps: optional int (default 60)
+      - spot_range: optional fraction around S (default 0.5, i.e. 0.5*S..1.5*S)
+      - max_days: optional int (default: days to the contract's expiry)
+      - exercise: optional "european" (default) or "american"
+
+    Returns fair value and every Greek on a day x spot grid. American
+    surfaces come from one Crank-Nicolson solve out to max_days, whose time
+    layers give every day row at once; they carry fair_value, delta, gamma
+    and theta only.
+    """
+    try:
+        payload = json.loads(request.body.decode("utf-8") or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON payload"}, status=400)
+
+    inputs = payload.get("inputs")
+    if not isinstance(inputs, dict):
+        return JsonResponse({"error": "Missing or invalid 'inputs' object"}, status=400)
+
+    try:
+        S = float(inputs["S"])
+        K = float(inputs["K"])
+        r = float(inputs["r"])
+        q = float(inputs["q"])
+        sigma = float(inputs["sigma"])
+        T = float(inputs["T"])
+        side = str(inputs.get("side", "CALL")).upper()
+        spot_steps = int(payload.get("spot_steps", 101))
+        day_steps = int(payload.get("day_steps", 60))
+        spot_range = float(payload.get("spot_range", 0.5))
+        max_days = float(payload.get("max_days") or max(1.0, round(T * 365.0)))
+        exercise = str(payload.get("exercise", "european")).lower()
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({"error": f"bad parameters: {e}"}, status=400)
+
+    if spot_steps < 2 or day_steps < 1 or spot_steps * day_steps > MAX_SURFACE_POINTS:
+        return JsonResponse({"error": f"grid must have between 2 and {MAX_SURFACE_POINTS} points"}, status=400)
+    if not 0.0 < spot_range < 1.0 or max_days <= 0:
+        return JsonResponse({"error": "spot_range must be in (0, 1) and max_days positive"}, status=400)
+    if exercise not in ("european", "american"):
+        return JsonResponse({"error": "exercise must be 'european' or 'american'"}, status=400)
+
+    spots = np.linspace(S * (1.0 - spot_range), S * (1.0 + spot_range), spot_steps)
+    days = np.linspace(max_days / day_steps, max_days, day_steps)
+
+    try:
+        if exercise == "american":
+            solution = CrankNicolsonAmericanOptionCalculator().solve(
+                S, K, r, q, sigma, max_days / 365.0, side, layers=day_steps, cover=(spots[0], spots[-1])
+            )
+            surfaces = solution.on(spots)
+        else:
+            surfaces = GreeksCalculator().compute_batch(
+                spots[np.newaxis, :], K, r, q, sigma, days[:, np.newaxis] / 365.0, side
+            )
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {
+            "spots": spots.tolist(),
+            "days": days.tolist(),
+            "surfaces": {key: _finite_or_none(arr) for key, arr in surfaces.items()},
+        },
+        status=200,
+    )